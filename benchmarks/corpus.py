@@ -0,0 +1,179 @@
+"""
+Fixed micro-benchmark corpus.
+
+Pages are generated deterministically (seeded) instead of being checked in, so
+the repo stays small; `CORPUS_VERSION` is bumped whenever a generator changes
+and every page's sha256 is written into benchmark reports, so two reports are
+only compared when they timed identical inputs.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+from dataclasses import dataclass
+from typing import Any
+
+CORPUS_VERSION = 1
+
+_WORDS = (
+    "data personal information cookies partners services processing consent rights controller "
+    "customers products offers delivery account newsletter security retention transfer analytics "
+    "advertising contact support legal request access delete device browser location purposes"
+).split()
+_POLICY_SENTENCES = (
+    "We process personal data in accordance with the General Data Protection Regulation (GDPR).",
+    "You have the right to access, rectify and erase your personal data and to object to processing.",
+    "We use cookies and similar technologies for analytics and advertising purposes with your consent.",
+    "Personal data may be shared with third parties such as payment providers and advertising partners.",
+    "The controller can be contacted through our data protection officer at the address below.",
+    "We retain personal data for as long as necessary to fulfil the purposes described in this policy.",
+)
+
+
+@dataclass
+class CorpusPage:
+    name: str
+    url: str
+    html: str
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.html.encode("utf-8")).hexdigest()
+
+
+def _sentence(rng: random.Random, n: int = 14) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _doc(title: str, body: str, lang: str = "en") -> str:
+    return (
+        f'<!doctype html><html lang="{lang}"><head><meta charset="utf-8"><title>{title}</title>'
+        '<link rel="stylesheet" href="/static/site.css"></head>'
+        f"<body>{body}</body></html>"
+    )
+
+
+def _footer(links: list[tuple[str, str]]) -> str:
+    return "<footer><ul>" + "".join(f'<li><a href="{h}">{t}</a></li>' for h, t in links) + "</ul></footer>"
+
+
+def small_page(rng: random.Random) -> CorpusPage:
+    body = (
+        "<header><a href='/'>Shop</a></header><main><h1>Welcome</h1>"
+        + "".join(f"<p>{_sentence(rng)}</p>" for _ in range(5))
+        + "</main>"
+        + _footer([("/about", "About"), ("/contact", "Contact"), ("/privacy", "Privacy Policy")])
+    )
+    return CorpusPage("small", "https://www.small-shop.com/", _doc("Small shop", body))
+
+
+def huge_policy_page(rng: random.Random, paragraphs: int = 6000) -> CorpusPage:
+    parts = ["<main><article><h1>Privacy Policy</h1>"]
+    for i in range(paragraphs):
+        if i % 200 == 0:
+            parts.append(f"<h2>Section {i // 200 + 1}: How we use personal data</h2>")
+        if i % 500 == 250:
+            rows = "".join(
+                f"<tr><td>cookie_{i}_{r}</td><td>{rng.choice(_WORDS)}</td><td>{rng.randint(1, 24)} months</td></tr>"
+                for r in range(20)
+            )
+            parts.append(f"<table><tr><th>Name</th><th>Purpose</th><th>Retention</th></tr>{rows}</table>")
+        parts.append(f"<p>{rng.choice(_POLICY_SENTENCES)} {_sentence(rng, 30)}</p>")
+    parts.append("</article></main>")
+    parts.append(_footer([("/", "Home"), ("/terms", "Terms")]))
+    return CorpusPage("huge_policy", "https://www.big-corp.com/legal/privacy", _doc("Privacy Policy", "".join(parts)))
+
+
+def link_heavy_page(rng: random.Random, links: int = 4000) -> CorpusPage:
+    items = []
+    for i in range(links):
+        if i % 997 == 0:
+            items.append(f'<a href="/legal/privacy-{i}">Privacy notice {i}</a>')
+        elif i % 3 == 0:
+            items.append(f'<a href="https://partner{i % 150}.net/p/{i}">{rng.choice(_WORDS)} partner</a>')
+        else:
+            items.append(f'<a href="/category/{rng.choice(_WORDS)}/{i}">{rng.choice(_WORDS).title()} {i}</a>')
+    body = (
+        "<main><h1>Sitemap</h1><div class='links'>" + " ".join(items) + "</div></main>"
+        + _footer([("/imprint", "Impressum"), ("/datenschutz", "Datenschutzerklärung"), ("/agb", "AGB")])
+    )
+    return CorpusPage("link_heavy", "https://www.linkfarm.de/sitemap", _doc("Sitemap", body, "de"))
+
+
+def onetrust_page(rng: random.Random) -> CorpusPage:
+    notice = "".join(
+        f"<div class='otnotice-section'><h3>{rng.choice(_WORDS).title()}</h3><p>{rng.choice(_POLICY_SENTENCES)} {_sentence(rng, 25)}</p></div>"
+        for _ in range(120)
+    )
+    pc = "".join(
+        f"<div class='ot-cat-item'><h4>{c}</h4><p>{_sentence(rng, 20)}</p><ul>"
+        + "".join(f"<li>cookie_{c[:3]}_{k}</li>" for k in range(30))
+        + "</ul></div>"
+        for c in ("Strictly Necessary Cookies", "Performance Cookies", "Functional Cookies", "Targeting Cookies")
+    )
+    body = (
+        "<main><div id='otnotice-1a2b3c' class='otnotice'><div class='otnotice-content'>"
+        "<h1>This Privacy Notice</h1><p>Personal information we collect and how we use your personal information.</p>"
+        f"{notice}</div></div></main>"
+        "<div id='onetrust-consent-sdk'><div id='onetrust-banner-sdk'><p>We use cookies.</p>"
+        "<button id='onetrust-accept-btn-handler'>Accept</button></div>"
+        f"<div id='onetrust-pc-sdk'><h2>Why we use cookies and other tracking technologies?</h2>{pc}</div></div>"
+        "<script src='https://cdn.cookielaw.org/scripttemplates/otSDKStub.js'></script>"
+    )
+    return CorpusPage("onetrust", "https://privacyportal.onetrust.com/notice/abc", _doc("Privacy Notice", body))
+
+
+def marketplace_page(rng: random.Random, menu_items: int = 1500, products: int = 400) -> CorpusPage:
+    menu = "".join(
+        f"<li class='mega'><a href='/c/{i}'>{rng.choice(_WORDS).title()}</a><ul>"
+        + "".join(f"<li><a href='/c/{i}/{j}'>{rng.choice(_WORDS)}</a></li>" for j in range(10))
+        + "</ul></li>"
+        for i in range(menu_items // 10)
+    )
+    grid = "".join(
+        f"<div class='product'><a href='/p/{i}'><img src='https://img{i % 8}.cdn-market.net/{i}.jpg' alt=''>"
+        f"<span>{rng.choice(_WORDS).title()} {rng.choice(_WORDS)}</span></a><b>{rng.randint(5, 500)},99 €</b>"
+        f"<button>In den Warenkorb</button></div>"
+        for i in range(products)
+    )
+    body = (
+        f"<header><nav><ul class='menu'>{menu}</ul></nav></header><main><h1>Angebote</h1>{grid}</main>"
+        + _footer([
+            ("/hilfe", "Hilfe"), ("/impressum", "Impressum"), ("/agb", "AGB"),
+            ("/datenschutz", "Datenschutzhinweise"), ("/cookies", "Cookie-Einstellungen"),
+        ])
+    )
+    return CorpusPage("marketplace", "https://www.marktplatz.de/", _doc("Marktplatz", body, "de"))
+
+
+def error_page(rng: random.Random) -> CorpusPage:
+    body = "<h1>404 Not Found</h1><p>The requested URL was not found on this server.</p><hr><address>nginx</address>"
+    return CorpusPage("error_404", "https://gone.example.net/", _doc("404 Not Found", body))
+
+
+def network_log(rng: random.Random, requests: int = 3000, hosts: int = 250) -> list[dict[str, Any]]:
+    weights = [1.0 / (k + 1) for k in range(hosts)]
+    out = []
+    for i in range(requests):
+        k = rng.choices(range(hosts), weights=weights)[0]
+        sub = rng.choice(("", "cdn.", "static.", "px.", "api."))
+        tld = ("com", "net", "co.uk", "io", "de")[k % 5]
+        if i % 10 == 0:
+            url = f"https://{sub}www.marktplatz.de/assets/{i}.js"
+        else:
+            url = f"https://{sub}vendor{k}.{tld}/collect?id={i}"
+        out.append({"event_type": "request" if i % 17 else "request_failed", "url": url})
+    return out
+
+
+def build_corpus(seed: int = 0) -> tuple[list[CorpusPage], list[dict[str, Any]]]:
+    rng = random.Random(seed)
+    pages = [
+        small_page(rng),
+        huge_policy_page(rng),
+        link_heavy_page(rng),
+        onetrust_page(rng),
+        marketplace_page(rng),
+        error_page(rng),
+    ]
+    return pages, network_log(rng)
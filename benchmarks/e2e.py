@@ -0,0 +1,174 @@
+"""
+Offline end-to-end crawl benchmark.
+
+    python -m benchmarks.e2e --sites 200 --concurrency 8 --out bench.json
+
+Starts the synthetic web (benchmarks/synthetic_web.py), then drives
+`crawler.process_site` directly and/or the full `cli._run` pipeline against it
+with the browser-free `HttpOnlyClient`. Reports sites/minute, server requests
+per site and p50/p95 site latency. Needs no network access.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from privacy_research_dataset import cli, crawl4ai_client
+from privacy_research_dataset.crawler import process_site
+from privacy_research_dataset.tracker_radar import TrackerRadarIndex
+from privacy_research_dataset.utils.io import iter_jsonl, write_json
+
+from .http_client import HttpOnlyClient
+from .synthetic_web import SyntheticWeb, WebConfig, site_spec, tracker_radar_index
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))
+    return float(s[k])
+
+
+def _report(mode: str, results: list[dict[str, Any]], wall_s: float, server: dict[str, Any], cfg: WebConfig) -> dict[str, Any]:
+    n = len(results)
+    totals = [float(r["total_ms"]) for r in results if isinstance(r.get("total_ms"), (int, float))]
+    found_by_kind: dict[str, Counter] = {}
+    for r in results:
+        url = str(r.get("input") or "")
+        try:
+            kind = site_spec(int(url.split("//", 1)[1].split(".", 1)[0][4:]), cfg).kind
+        except (IndexError, ValueError):
+            kind = "unknown"
+        found_by_kind.setdefault(kind, Counter())[str(r.get("status"))] += 1
+    return {
+        "mode": mode,
+        "sites": n,
+        "wall_s": round(wall_s, 3),
+        "sites_per_min": round(n / wall_s * 60, 1) if wall_s else None,
+        "requests_per_site": round(server["requests"] / n, 2) if n else None,
+        "requests_by_kind": server["by_kind"],
+        "bytes_per_site": int(server["bytes"] / n) if n else None,
+        "total_ms_p50": _percentile(totals, 0.50),
+        "total_ms_p95": _percentile(totals, 0.95),
+        "status_counts": dict(Counter(str(r.get("status")) for r in results)),
+        "status_by_site_kind": {k: dict(v) for k, v in sorted(found_by_kind.items())},
+    }
+
+
+async def _bench_process_site(
+    web: SyntheticWeb,
+    urls: list[str],
+    work: Path,
+    concurrency: int,
+    radar: TrackerRadarIndex,
+) -> list[dict[str, Any]]:
+    sem = asyncio.Semaphore(concurrency)
+    run_id = str(uuid.uuid4())
+    async with HttpOnlyClient(proxy=web.proxy, page_timeout_ms=10_000) as client:
+
+        async def one(rank: int, url: str) -> dict[str, Any]:
+            async with sem:
+                return await process_site(
+                    client,
+                    url,
+                    rank=rank,
+                    artifacts_dir=work / "artifacts_ps",
+                    tracker_radar=radar,
+                    run_id=run_id,
+                )
+
+        return list(await asyncio.gather(*[one(i + 1, u) for i, u in enumerate(urls)]))
+
+
+def _bench_run(web: SyntheticWeb, urls: list[str], work: Path, concurrency: int, radar_path: Path) -> list[dict[str, Any]]:
+    input_path = work / "sites.txt"
+    input_path.write_text("\n".join(urls) + "\n", encoding="utf-8")
+    out = work / "run" / "results.jsonl"
+    args = cli._parse_args([
+        "--input", str(input_path),
+        "--out", str(out),
+        "--artifacts-dir", str(work / "run" / "artifacts"),
+        "--summary-out", str(work / "run" / "results.summary.json"),
+        "--state-file", str(work / "run" / "run_state.json"),
+        "--tracker-radar-index", str(radar_path),
+        "--proxy", web.proxy,
+        "--page-timeout-ms", "10000",
+        "--concurrency", str(concurrency),
+    ])
+    # The CLI opens its own client (imported when the run starts); swap in the
+    # browser-free one for the run.
+    original = crawl4ai_client.Crawl4AIClient
+    crawl4ai_client.Crawl4AIClient = HttpOnlyClient  # type: ignore[misc,assignment]
+    try:
+        asyncio.run(cli._run(args))
+    finally:
+        crawl4ai_client.Crawl4AIClient = original  # type: ignore[misc]
+    return list(iter_jsonl(out))
+
+
+def run_benchmark(
+    *,
+    sites: int,
+    concurrency: int,
+    modes: list[str],
+    cfg: WebConfig,
+    work_dir: Path,
+) -> list[dict[str, Any]]:
+    radar_path = work_dir / "tracker_radar_index.json"
+    write_json(radar_path, tracker_radar_index(cfg))
+    radar = TrackerRadarIndex(radar_path)
+    reports = []
+    with SyntheticWeb(cfg) as web:
+        urls = web.site_urls(sites)
+        for mode in modes:
+            web.reset_stats()
+            t0 = time.perf_counter()
+            if mode == "process_site":
+                results = asyncio.run(_bench_process_site(web, urls, work_dir, concurrency, radar))
+            else:
+                results = _bench_run(web, urls, work_dir, concurrency, radar_path)
+            wall = time.perf_counter() - t0
+            reports.append(_report(mode, results, wall, web.stats(), cfg))
+    return reports
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.e2e", description="Offline end-to-end crawl benchmark against a synthetic local web.")
+    p.add_argument("--sites", type=int, default=200, help="Synthetic sites to crawl. Default: 200")
+    p.add_argument("--concurrency", type=int, default=8, help="Concurrent sites. Default: 8")
+    p.add_argument("--mode", choices=["process_site", "run", "both"], default="both", help="Drive process_site directly, the full CLI run, or both. Default: both")
+    p.add_argument("--seed", type=int, default=1, help="Synthetic web seed. Default: 1")
+    p.add_argument("--slow-ms", type=int, default=1500, help="Delay of 'slow' sites in ms. Default: 1500")
+    p.add_argument("--tracker-pool", type=int, default=300, help="Distinct third-party hosts. Default: 300")
+    p.add_argument("--work-dir", type=str, default=None, help="Keep artifacts here (default: temporary directory).")
+    p.add_argument("--out", type=str, default=None, help="Write the report JSON here.")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    cfg = WebConfig(seed=args.seed, slow_ms=args.slow_ms, tracker_pool=args.tracker_pool)
+    modes = ["process_site", "run"] if args.mode == "both" else [args.mode]
+    if args.work_dir:
+        work = Path(args.work_dir)
+        work.mkdir(parents=True, exist_ok=True)
+        reports = run_benchmark(sites=args.sites, concurrency=args.concurrency, modes=modes, cfg=cfg, work_dir=work)
+    else:
+        with tempfile.TemporaryDirectory(prefix="pds-bench-") as tmp:
+            reports = run_benchmark(sites=args.sites, concurrency=args.concurrency, modes=modes, cfg=cfg, work_dir=Path(tmp))
+    report = {"sites": args.sites, "concurrency": args.concurrency, "seed": args.seed, "results": reports}
+    if args.out:
+        write_json(args.out, report)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Browser-free stand-in for `Crawl4AIClient` used by the offline benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any
+
+import aiohttp
+
+from privacy_research_dataset import budget, host_scheduler
+from privacy_research_dataset.crawl4ai_client import Crawl4AIResult
+from privacy_research_dataset.text_extract import extract_main_text_with_method
+
+_SUBRESOURCE_RE = re.compile(
+    r"""<(?:script|img|iframe|link)\b[^>]*?\b(?:src|href)\s*=\s*["'](https?://[^"']+)["']""",
+    re.I,
+)
+
+
+class HttpOnlyClient:
+    """
+    Same constructor and `fetch()` signature as `Crawl4AIClient`, but pages are
+    fetched with aiohttp through `proxy`. With `capture_network=True` the
+    page's absolute script/img/iframe/link URLs are requested too (like a
+    browser would) and reported as Crawl4AI-style network events, so third
+    party extraction works unchanged. No JS runs, so this measures the
+    pipeline around the browser, not rendering.
+    """
+
+    def __init__(
+        self,
+        browser_type: str = "chromium",
+        headless: bool = True,
+        verbose: bool = False,
+        user_agent: str | None = None,
+        proxy: str | None = None,
+        locale: str | None = None,
+        timezone_id: str | None = None,
+        page_timeout_ms: int = 15000,
+        resource_blocker: Any = None,
+        settle: Any = None,
+        subresource_concurrency: int = 16,
+    ) -> None:
+        self.browser_type = browser_type
+        self.user_agent = user_agent
+        self.proxy = proxy
+        self.locale = locale
+        self.timezone_id = timezone_id
+        self.page_timeout_ms = page_timeout_ms
+        self.subresource_concurrency = subresource_concurrency
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "HttpOnlyClient":
+        headers = {"User-Agent": self.user_agent} if self.user_agent else {}
+        self._session = aiohttp.ClientSession(headers=headers, connector=aiohttp.TCPConnector(limit=0))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def restart(self) -> None:
+        await self.__aexit__(None, None, None)
+        await self.__aenter__()
+
+    async def _get(self, url: str) -> tuple[int, str, str]:
+        assert self._session is not None
+        timeout = aiohttp.ClientTimeout(total=self.page_timeout_ms / 1000)
+        async with self._session.get(url, proxy=self.proxy, timeout=timeout, allow_redirects=True) as resp:
+            body = await resp.read()
+            return resp.status, str(resp.url), body.decode("utf-8", errors="ignore")
+
+    async def _subresources(self, html: str) -> list[dict[str, Any]]:
+        urls = list(dict.fromkeys(_SUBRESOURCE_RE.findall(html)))
+        sem = asyncio.Semaphore(self.subresource_concurrency)
+
+        async def one(u: str) -> dict[str, Any]:
+            async with sem:
+                try:
+                    await self._get(u)
+                    return {"event_type": "request", "url": u}
+                except Exception as e:
+                    return {"event_type": "request_failed", "url": u, "error": str(e)}
+
+        return list(await asyncio.gather(*[one(u) for u in urls]))
+
+    async def fetch(
+        self,
+        url: str,
+        *,
+        capture_network: bool = False,
+        remove_overlays: bool = True,
+        magic: bool = False,
+        scan_full_page: bool = False,
+        wait_for: str | None = None,
+        wait_for_timeout_ms: int | None = None,
+        block_resources: bool | None = None,
+    ) -> Crawl4AIResult:
+        if self._session is None:
+            raise RuntimeError("HttpOnlyClient must be used as an async context manager.")
+        try:
+            async with host_scheduler.slot(url) as permit:
+                status, final_url, html = await self._get(url)
+                permit.record(status_code=status)
+            budget.charge(len(html or ""))
+        except Exception as e:
+            return Crawl4AIResult(
+                url=url,
+                success=False,
+                status_code=None,
+                raw_html=None,
+                cleaned_html=None,
+                text=None,
+                network_requests=None,
+                error_message=str(e) or type(e).__name__,
+            )
+        network = await self._subresources(html) if capture_network else None
+        text, method = extract_main_text_with_method(html, source_url=final_url)
+        return Crawl4AIResult(
+            url=final_url,
+            success=status < 400,
+            status_code=status,
+            raw_html=html,
+            cleaned_html=html,
+            text=text or None,
+            text_extraction_method=method if text else None,
+            network_requests=network,
+            error_message=None if status < 400 else f"http_status_{status}",
+        )
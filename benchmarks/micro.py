@@ -0,0 +1,203 @@
+"""
+Micro-benchmarks for the extraction / policy-finding hot functions.
+
+    python -m benchmarks.micro --out bench/main.json
+    python -m benchmarks.micro --compare bench/main.json --threshold 0.10
+
+Each case is timed in batches sized to take >= --min-batch-ms; the report
+keeps the best and median per-call time. `--compare` exits with status 1 when
+any case's best time regressed by more than --threshold versus the baseline
+(cases whose corpus page changed are skipped).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from privacy_research_dataset.crawl4ai_client import Crawl4AIResult
+from privacy_research_dataset.crawler import _classify_non_browsable, _clean_policy_text
+from privacy_research_dataset.policy_finder import extract_link_candidates, policy_likeliness_score
+from privacy_research_dataset.text_extract import extract_main_text_with_method
+from privacy_research_dataset.third_party import third_parties_from_network_logs
+from privacy_research_dataset.utils.etld import etld1
+from privacy_research_dataset.utils.io import write_json
+
+from .corpus import CORPUS_VERSION, build_corpus
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], Any]
+    input_sha256: str
+
+
+def build_cases() -> list[Case]:
+    pages, netlog = build_corpus()
+    by_name = {p.name: p for p in pages}
+    texts = {p.name: extract_main_text_with_method(p.html, source_url=p.url)[0] or "" for p in pages}
+    cases: list[Case] = []
+
+    def add(func: str, page: str, fn: Callable[[], Any]) -> None:
+        cases.append(Case(f"{func}/{page}", fn, by_name[page].sha256 if page in by_name else page))
+
+    for name in ("small", "link_heavy", "marketplace", "onetrust"):
+        p = by_name[name]
+        add("extract_link_candidates", name, lambda p=p: extract_link_candidates(p.html, p.url, etld1(p.url) or ""))
+    for name in ("small", "huge_policy", "onetrust", "marketplace"):
+        p = by_name[name]
+        add("extract_main_text_with_method", name, lambda p=p: extract_main_text_with_method(p.html, source_url=p.url))
+    for name in ("huge_policy", "onetrust", "marketplace"):
+        t = texts[name]
+        add("_clean_policy_text", name, lambda t=t: _clean_policy_text(t))
+    for name in ("small", "error_404", "marketplace"):
+        p = by_name[name]
+        res = Crawl4AIResult(
+            url=p.url, success=True, status_code=200, raw_html=p.html, cleaned_html=p.html,
+            text=None, network_requests=None, error_message=None,
+        )
+        add("_classify_non_browsable", name, lambda res=res: _classify_non_browsable(res))
+    for name in ("small", "huge_policy", "onetrust"):
+        t = texts[name]
+        add("policy_likeliness_score", name, lambda t=t: policy_likeliness_score(t))
+
+    log_sha = hashlib.sha256(json.dumps(netlog).encode("utf-8")).hexdigest()
+    cases.append(Case(
+        "third_parties_from_network_logs/network_3000",
+        lambda: third_parties_from_network_logs("https://www.marktplatz.de/", netlog),
+        log_sha,
+    ))
+    return cases
+
+
+def time_case(fn: Callable[[], Any], *, repeat: int, min_batch_ms: float) -> dict[str, Any]:
+    fn()  # warm-up (imports, regex compilation, caches)
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed * 1000 >= min_batch_ms or number >= 1_000_000:
+            break
+        number *= 2 if elapsed * 1000 * 4 >= min_batch_ms else 10
+    per_call = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - t0) / number)
+    return {
+        "best_us": round(min(per_call) * 1e6, 2),
+        "median_us": round(statistics.median(per_call) * 1e6, 2),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(*, repeat: int, min_batch_ms: float, pattern: str | None = None) -> dict[str, Any]:
+    rx = re.compile(pattern) if pattern else None
+    results: dict[str, Any] = {}
+    for case in build_cases():
+        if rx and not rx.search(case.name):
+            continue
+        r = time_case(case.fn, repeat=repeat, min_batch_ms=min_batch_ms)
+        r["input_sha256"] = case.input_sha256
+        results[case.name] = r
+        print(f"{case.name:<55} best {r['best_us']:>12.1f} us   median {r['median_us']:>12.1f} us", file=sys.stderr)
+    return {
+        "meta": {
+            "corpus_version": CORPUS_VERSION,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], *, threshold: float) -> tuple[list[dict[str, Any]], bool]:
+    rows = []
+    regressed = False
+    for name, cur in sorted(current["results"].items()):
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append({"case": name, "status": "new"})
+            continue
+        if base.get("input_sha256") != cur.get("input_sha256"):
+            rows.append({"case": name, "status": "corpus_changed"})
+            continue
+        ratio = cur["best_us"] / base["best_us"] if base["best_us"] else float("inf")
+        status = "ok"
+        if ratio > 1 + threshold:
+            status = "regression"
+            regressed = True
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        rows.append({
+            "case": name,
+            "status": status,
+            "baseline_us": base["best_us"],
+            "current_us": cur["best_us"],
+            "ratio": round(ratio, 3),
+        })
+    return rows, regressed
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.micro", description="Time extraction/policy-finding hot functions on a fixed corpus.")
+    p.add_argument("--out", type=str, default=None, help="Write the JSON report here.")
+    p.add_argument("--compare", type=str, default=None, help="Baseline report to compare against.")
+    p.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown of best time before failing (0.10 = 10%%). Default: 0.10")
+    p.add_argument("--repeat", type=int, default=5, help="Timed batches per case. Default: 5")
+    p.add_argument("--min-batch-ms", type=float, default=100.0, help="Minimum duration of one timed batch. Default: 100")
+    p.add_argument("--filter", type=str, default=None, help="Regex: only run matching cases.")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    report = run(repeat=max(1, args.repeat), min_batch_ms=args.min_batch_ms, pattern=args.filter)
+    if args.out:
+        write_json(args.out, report)
+    if not args.compare:
+        print(json.dumps(report, indent=2))
+        return
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    rows, regressed = compare(report, baseline, threshold=args.threshold)
+    for r in rows:
+        if "ratio" in r:
+            print(f"{r['status']:<12} {r['case']:<55} {r['baseline_us']:>12.1f} -> {r['current_us']:>12.1f} us  x{r['ratio']}")
+        else:
+            print(f"{r['status']:<12} {r['case']}")
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
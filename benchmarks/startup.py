@@ -0,0 +1,113 @@
+"""
+CLI startup-time benchmark.
+
+    python -m benchmarks.startup --out startup.json
+
+Runs each entry point (`--help`, subcommand `--help`s) in a fresh interpreter
+under `python -X importtime`, and reports the median wall time, the summed
+import time and the most expensive top-level imports. Exits with status 1 if
+a command that should stay light imported one of the heavy crawl
+dependencies (aiohttp, crawl4ai, playwright, trafilatura, bs4).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+from privacy_research_dataset.utils.io import write_json
+
+HEAVY_MODULES = ("aiohttp", "crawl4ai", "playwright", "trafilatura", "bs4")
+
+# (name, argv after `python -m privacy_research_dataset.cli`)
+COMMANDS: tuple[tuple[str, list[str]], ...] = (
+    ("help", ["--help"]),
+    ("prefilter", ["prefilter", "--help"]),
+    ("export", ["export", "--help"]),
+    ("analytics", ["analytics", "--help"]),
+    ("merge-summaries", ["merge-summaries", "--help"]),
+    ("trace-report", ["trace-report", "--help"]),
+    ("serve", ["serve", "--help"]),
+)
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    """Rows of `-X importtime` output: module, self_us, cumulative_us, depth."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        try:
+            self_us, cum_us, name = int(parts[0]), int(parts[1]), parts[2]
+        except (ValueError, IndexError):
+            continue
+        # Nesting is shown as two extra spaces after the separator's own space.
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append({"module": name.strip(), "self_us": self_us, "cumulative_us": cum_us, "depth": depth})
+    return rows
+
+
+def measure(argv: list[str] | None, *, repeat: int) -> dict[str, Any]:
+    """argv=None measures a bare interpreter (`-c pass`), the floor for every command."""
+    tail = ["-c", "pass"] if argv is None else ["-m", "privacy_research_dataset.cli", *argv]
+    cmd = [sys.executable, "-X", "importtime", *tail]
+    walls = []
+    rows: list[dict[str, Any]] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        walls.append((time.perf_counter() - t0) * 1000)
+        rows = parse_importtime(proc.stderr)
+    imported = {r["module"] for r in rows}
+    top_level = sorted((r for r in rows if r["depth"] <= 1), key=lambda r: r["cumulative_us"], reverse=True)
+    return {
+        "argv": argv,
+        "wall_ms_median": round(statistics.median(walls), 1),
+        "wall_ms_min": round(min(walls), 1),
+        "import_ms_total": round(sum(r["self_us"] for r in rows) / 1000, 1),
+        "modules": len(rows),
+        "heavy_imported": sorted(m for m in HEAVY_MODULES if m in imported),
+        "top_imports": [
+            {"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in top_level[:10]
+        ],
+    }
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Measure CLI startup and import time per entry point.")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per command (median wall time is reported). Default: 5")
+    p.add_argument("--out", type=str, default=None, help="Write the JSON report here.")
+    p.add_argument("--command", action="append", default=None, help="Only measure these command names (repeatable).")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    baseline = measure(None, repeat=max(1, args.repeat))
+    report: dict[str, Any] = {"python": sys.version.split()[0], "interpreter": baseline, "commands": {}}
+    print(f"{'(interpreter)':<18} wall {baseline['wall_ms_median']:>7.1f} ms  imports {baseline['import_ms_total']:>7.1f} ms", file=sys.stderr)
+    failed = False
+    for name, cmd in COMMANDS:
+        if args.command and name not in args.command:
+            continue
+        r = measure(cmd, repeat=max(1, args.repeat))
+        r["wall_ms_over_interpreter"] = round(r["wall_ms_median"] - baseline["wall_ms_median"], 1)
+        report["commands"][name] = r
+        flag = f"  HEAVY: {', '.join(r['heavy_imported'])}" if r["heavy_imported"] else ""
+        failed = failed or bool(r["heavy_imported"])
+        top = ", ".join(f"{t['module']} {t['cumulative_ms']}" for t in r["top_imports"][:3])
+        print(f"{name:<18} wall {r['wall_ms_median']:>7.1f} ms  imports {r['import_ms_total']:>7.1f} ms  [{top}]{flag}", file=sys.stderr)
+    if args.out:
+        write_json(args.out, report)
+    print(json.dumps(report, indent=2))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
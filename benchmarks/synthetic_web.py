@@ -0,0 +1,354 @@
+"""
+Deterministic synthetic web for offline benchmarks.
+
+One local HTTP server answers for every hostname: clients use it as an HTTP
+proxy (`--proxy http://127.0.0.1:<port>`), so no DNS or network access is
+needed. Site `i` is generated from `(seed, i)`:
+
+- footer:      privacy link in the footer, in one of several languages
+- hub:         footer only links a "Legal" hub page which links the policy
+- common_path: no link; the policy sits at one of COMMON_PRIVACY_PATHS
+- onetrust:    OneTrust-style cookie banner + notice link inside the banner
+- missing:     no policy anywhere (every fallback path 404s)
+- slow:        footer site whose pages are delayed
+- failing:     homepage always answers 503
+
+Homepages embed scripts/pixels/iframes from a Zipf-distributed pool of
+third-party hosts (`tracker<k>.test`), each serving a small asset and a
+`/privacy` page. `tracker_radar_index()` maps part of that pool to entities so
+the third-party policy fetch path is exercised too.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import random
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import urlparse
+
+from privacy_research_dataset.policy_finder import COMMON_PRIVACY_PATHS
+
+KIND_WEIGHTS = {
+    "footer": 45,
+    "hub": 15,
+    "common_path": 15,
+    "onetrust": 10,
+    "missing": 7,
+    "slow": 5,
+    "failing": 3,
+}
+FOOTER_LABELS = {
+    "en": "Privacy Policy",
+    "de": "Datenschutzerklärung",
+    "fr": "Politique de confidentialité",
+    "es": "Política de privacidad",
+    "it": "Informativa sulla privacy",
+    "nl": "Privacybeleid",
+    "pl": "Polityka prywatności",
+    "pt": "Política de privacidade",
+}
+_FILLER = (
+    "Our team builds products for customers across Europe. Read the latest news, browse the catalogue, "
+    "compare offers and contact support. Subscribe to the newsletter for weekly updates and events. "
+)
+_POLICY_PARAS = (
+    "This privacy policy explains how {name} processes personal data when you use our website and services.",
+    "The controller responsible for processing is {name}. You can contact our data protection officer at any time.",
+    "We collect personal data such as your name, email address, IP address, device identifiers and usage data.",
+    "We use cookies and similar technologies for analytics, advertising and to remember your preferences.",
+    "We share personal data with third parties, including service providers, analytics and advertising partners.",
+    "The legal basis for processing is your consent, the performance of a contract and our legitimate interests.",
+    "Under the GDPR you have the right to access, rectify, erase and port your data and to object to processing.",
+    "We retain personal data only as long as necessary and transfer data outside the EEA with appropriate safeguards.",
+)
+_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+    b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+CONTROL_HOST = "bench.control"
+
+
+@dataclass
+class WebConfig:
+    seed: int = 1
+    tracker_pool: int = 300
+    min_third_parties: int = 3
+    max_third_parties: int = 25
+    slow_ms: int = 1500
+    policy_paragraphs: int = 40
+
+
+@dataclass
+class SiteSpec:
+    index: int
+    host: str
+    kind: str
+    lang: str
+    policy_path: str | None
+    trackers: list[str]
+    delay_ms: int
+
+
+def site_host(i: int) -> str:
+    return f"site{i}.test"
+
+
+def tracker_host(k: int) -> str:
+    return f"tracker{k}.test"
+
+
+def site_spec(i: int, cfg: WebConfig) -> SiteSpec:
+    rng = random.Random(cfg.seed * 1_000_003 + i)
+    kind = rng.choices(list(KIND_WEIGHTS), weights=list(KIND_WEIGHTS.values()))[0]
+    lang = rng.choice(list(FOOTER_LABELS))
+    policy_path: str | None
+    if kind in ("footer", "hub", "slow"):
+        policy_path = f"/info/{lang}/policy-{i}"
+    elif kind == "common_path":
+        policy_path = rng.choice(COMMON_PRIVACY_PATHS)
+    elif kind == "onetrust":
+        policy_path = "/privacy-notice"
+    else:
+        policy_path = None
+    weights = [1.0 / (k + 1) for k in range(cfg.tracker_pool)]
+    n = rng.randint(cfg.min_third_parties, cfg.max_third_parties)
+    trackers = sorted({tracker_host(k) for k in rng.choices(range(cfg.tracker_pool), weights=weights, k=n)})
+    if kind == "onetrust":
+        trackers.append("cdn.cookielaw.test")
+    return SiteSpec(
+        index=i,
+        host=site_host(i),
+        kind=kind,
+        lang=lang,
+        policy_path=policy_path,
+        trackers=trackers,
+        delay_ms=cfg.slow_ms if kind == "slow" else 0,
+    )
+
+
+def tracker_radar_index(cfg: WebConfig, *, mapped_share: float = 0.6) -> dict[str, Any]:
+    """Synthetic Tracker Radar index for the tracker pool (entities shared by ~3 hosts)."""
+    rng = random.Random(cfg.seed)
+    out: dict[str, Any] = {}
+    categories = ["Advertising", "Analytics", "Audience Measurement", "CDN", "Social Network"]
+    for k in range(cfg.tracker_pool):
+        if rng.random() > mapped_share:
+            continue
+        host = tracker_host(k)
+        out[host] = {
+            "entity": f"Tracker Group {k // 3}",
+            "categories": [categories[k % len(categories)]],
+            "prevalence": round(0.5 / (k + 1), 6),
+            "policy_url": f"http://{host}/privacy",
+            "source_domain_file": f"domains/XX/{host}.json",
+        }
+    return out
+
+
+def _page(title: str, body: str, lang: str = "en") -> str:
+    return (
+        f'<!doctype html><html lang="{lang}"><head><meta charset="utf-8"><title>{title}</title></head>'
+        f"<body>{body}</body></html>"
+    )
+
+
+def _home(spec: SiteSpec) -> str:
+    name = spec.host.split(".")[0].title()
+    subresources = []
+    for n, t in enumerate(spec.trackers):
+        if t == "cdn.cookielaw.test":
+            subresources.append(f'<script src="http://{t}/scripttemplates/otSDKStub.js"></script>')
+        elif n % 3 == 0:
+            subresources.append(f'<img src="http://{t}/p.gif?s={spec.index}" width="1" height="1" alt="">')
+        elif n % 3 == 1:
+            subresources.append(f'<script async src="http://{t}/t.js"></script>')
+        else:
+            subresources.append(f'<iframe src="http://{t}/frame.html" hidden></iframe>')
+    footer = ['<a href="/about">About</a>', '<a href="/contact">Contact</a>', '<a href="/terms">Terms</a>']
+    if spec.kind in ("footer", "slow"):
+        footer.append(f'<a href="{spec.policy_path}">{FOOTER_LABELS[spec.lang]}</a>')
+    elif spec.kind == "hub":
+        footer.append('<a href="/legal">Legal</a>')
+    banner = ""
+    if spec.kind == "onetrust":
+        banner = (
+            '<div id="onetrust-consent-sdk"><div id="onetrust-banner-sdk" role="dialog">'
+            '<p id="onetrust-policy-text">We and our partners use cookies to personalise content and ads. '
+            f'<a class="ot-cookie-policy-link" href="{spec.policy_path}">Privacy Notice</a></p>'
+            '<button id="onetrust-accept-btn-handler">Accept All Cookies</button>'
+            '<button id="onetrust-reject-all-handler">Reject All</button></div></div>'
+        )
+    body = (
+        f"<header><nav><a href='/'>{name}</a> <a href='/products'>Products</a> <a href='/blog'>Blog</a></nav></header>"
+        f"<main><h1>Welcome to {name}</h1>" + "".join(f"<p>{_FILLER}</p>" for _ in range(6)) + "</main>"
+        + banner
+        + "<footer>" + " | ".join(footer) + "</footer>"
+        + "".join(subresources)
+    )
+    return _page(name, body, spec.lang)
+
+
+def _policy(name: str, label: str, paragraphs: int, lang: str = "en") -> str:
+    paras = "".join(
+        f"<p>{_POLICY_PARAS[n % len(_POLICY_PARAS)].format(name=name)}</p>" for n in range(paragraphs)
+    )
+    return _page(label, f"<main><article><h1>{label}</h1>{paras}</article></main><footer><a href='/'>Home</a></footer>", lang)
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counts: dict[str, int] = {}
+        self.bytes = 0
+
+    def add(self, kind: str, nbytes: int) -> None:
+        with self.lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self.bytes += nbytes
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {"requests": sum(self.counts.values()), "by_kind": dict(self.counts), "bytes": self.bytes}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts.clear()
+            self.bytes = 0
+
+
+def _make_handler(cfg: WebConfig, stats: _Stats) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def _send(self, status: int, body: bytes, ctype: str, kind: str) -> None:
+            stats.add(kind, len(body))
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _html(self, status: int, html: str, kind: str) -> None:
+            self._send(status, html.encode("utf-8"), "text/html; charset=utf-8", kind)
+
+        def do_HEAD(self) -> None:  # noqa: N802 - stdlib naming
+            self.do_GET()
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            if self.path.startswith("http://") or self.path.startswith("https://"):
+                parsed = urlparse(self.path)
+                host, path = (parsed.hostname or "").lower(), parsed.path or "/"
+            else:
+                parsed = urlparse(self.path)
+                host = (self.headers.get("Host") or "").split(":", 1)[0].lower()
+                path = parsed.path or "/"
+
+            if host in (CONTROL_HOST, "127.0.0.1", "localhost"):
+                if path == "/__stats":
+                    body = json.dumps(stats.snapshot()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if path == "/__reset":
+                    stats.reset()
+                    self.send_response(204)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+            if host.startswith("tracker") or host == "cdn.cookielaw.test":
+                if path == "/privacy":
+                    label = "Privacy Policy"
+                    return self._html(200, _policy(host.split(".")[0].title(), label, cfg.policy_paragraphs // 2), "tracker_policy")
+                if path.endswith(".gif"):
+                    return self._send(200, _GIF, "image/gif", "subresource")
+                if path.endswith(".js"):
+                    return self._send(200, b"(function(){var t=1;})();", "application/javascript", "subresource")
+                return self._html(200, "<!doctype html><html><body></body></html>", "subresource")
+
+            if not (host.startswith("site") and host.endswith(".test")):
+                return self._html(404, _page("Not found", "<p>unknown host</p>"), "unknown")
+            try:
+                spec = site_spec(int(host[4:-5]), cfg)
+            except ValueError:
+                return self._html(404, _page("Not found", "<p>unknown host</p>"), "unknown")
+
+            if spec.delay_ms:
+                time.sleep(spec.delay_ms / 1000)
+            if spec.kind == "failing":
+                return self._html(503, _page("Unavailable", "<p>Service temporarily unavailable</p>"), "failing")
+            name = spec.host.split(".")[0].title()
+            if path in ("/", ""):
+                return self._html(200, _home(spec), "home")
+            if spec.policy_path and path == spec.policy_path:
+                return self._html(200, _policy(name, FOOTER_LABELS[spec.lang], cfg.policy_paragraphs, spec.lang), "policy")
+            if spec.kind == "hub" and path == "/legal":
+                links = (
+                    '<ul><li><a href="/terms">Terms of Service</a></li>'
+                    f'<li><a href="{spec.policy_path}">Privacy Notice</a></li>'
+                    '<li><a href="/impressum">Impressum</a></li></ul>'
+                )
+                return self._html(200, _page("Legal", f"<main><h1>Legal</h1>{links}<p>{_FILLER}</p></main>"), "hub")
+            return self._html(404, _page("Not found", "<h1>404</h1><p>Page not found</p>"), "not_found")
+
+    return Handler
+
+
+def _serve(cfg: WebConfig, port_queue: Any) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(cfg, _Stats()))
+    server.daemon_threads = True
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+class SyntheticWeb:
+    """Runs the synthetic web server in a child process (keeps it off the crawler's GIL)."""
+
+    def __init__(self, cfg: WebConfig | None = None) -> None:
+        self.cfg = cfg or WebConfig()
+        self.port: int | None = None
+        self._proc: mp.process.BaseProcess | None = None
+
+    @property
+    def proxy(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "SyntheticWeb":
+        ctx = mp.get_context("spawn")
+        q = ctx.Queue()
+        self._proc = ctx.Process(target=_serve, args=(self.cfg, q), daemon=True)
+        self._proc.start()
+        self.port = int(q.get(timeout=30))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.join(timeout=5)
+            self._proc = None
+
+    def _control(self, path: str) -> bytes:
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        with opener.open(f"http://127.0.0.1:{self.port}{path}", timeout=10) as resp:
+            return resp.read()
+
+    def stats(self) -> dict[str, Any]:
+        return json.loads(self._control("/__stats"))
+
+    def reset_stats(self) -> None:
+        self._control("/__reset")
+
+    def site_urls(self, n: int) -> list[str]:
+        return [f"http://{site_host(i)}/" for i in range(n)]
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import argparse
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from .utils.io import iter_jsonl, write_json
+from .utils.logging import log
+
+DEFAULT_RANK_BUCKETS = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_STATUSES = ("ok", "policy_not_found")
+
+
+def _require_scipy() -> tuple[Any, Any]:
+    try:
+        import numpy as np  # type: ignore
+        import scipy.sparse as sp  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "Run analytics needs numpy and scipy. Install with `pip install numpy scipy`."
+        ) from e
+    return np, sp
+
+
+@dataclass
+class SiteMatrices:
+    """Binary site x entity and site x category incidence matrices (CSR) for one run."""
+
+    sites: list[str]
+    ranks: Any  # float64, NaN when unranked
+    entities: list[str]
+    categories: list[str]
+    site_entity: Any
+    site_category: Any
+
+    @property
+    def n_sites(self) -> int:
+        return len(self.sites)
+
+
+def _binary_csr(rows: array, cols: array, shape: tuple[int, int]) -> Any:
+    np, sp = _require_scipy()
+    r = np.frombuffer(rows, dtype=np.int32)
+    c = np.frombuffer(cols, dtype=np.int32)
+    m = sp.csr_matrix((np.ones(r.shape[0], dtype=np.float32), (r, c)), shape=shape)
+    m.sum_duplicates()
+    # A site embedding three Google domains still counts once for Google.
+    m.data[:] = 1.0
+    return m
+
+
+def load_matrices(
+    results: str | Path | Iterable[dict[str, Any]],
+    *,
+    statuses: Iterable[str] | None = DEFAULT_STATUSES,
+) -> SiteMatrices:
+    """
+    Stream results into sparse incidence matrices.
+
+    Only the (row, col) index pairs are accumulated (in compact `array`s), so
+    memory is ~8 bytes per site/third-party pair plus the vocabularies.
+    """
+    np, _ = _require_scipy()
+    records = iter_jsonl(results) if isinstance(results, (str, Path)) else results
+    keep = set(statuses) if statuses else None
+
+    sites: list[str] = []
+    ranks = array("d")
+    entity_ids: dict[str, int] = {}
+    category_ids: dict[str, int] = {}
+    e_rows, e_cols = array("i"), array("i")
+    c_rows, c_cols = array("i"), array("i")
+
+    for rec in records:
+        if keep is not None and rec.get("status") not in keep:
+            continue
+        row = len(sites)
+        sites.append(str(rec.get("site_etld1") or rec.get("input") or ""))
+        rank = rec.get("rank")
+        ranks.append(float(rank) if isinstance(rank, (int, float)) else float("nan"))
+        for tp in rec.get("third_parties") or []:
+            if not isinstance(tp, dict):
+                continue
+            entity = tp.get("entity")
+            if isinstance(entity, str) and entity.strip():
+                e_rows.append(row)
+                e_cols.append(entity_ids.setdefault(entity, len(entity_ids)))
+            for cat in tp.get("categories") or []:
+                if isinstance(cat, str) and cat.strip():
+                    c_rows.append(row)
+                    c_cols.append(category_ids.setdefault(cat, len(category_ids)))
+
+    return SiteMatrices(
+        sites=sites,
+        ranks=np.frombuffer(ranks, dtype=np.float64) if len(ranks) else np.zeros(0),
+        entities=list(entity_ids),
+        categories=list(category_ids),
+        site_entity=_binary_csr(e_rows, e_cols, (len(sites), len(entity_ids))),
+        site_category=_binary_csr(c_rows, c_cols, (len(sites), len(category_ids))),
+    )
+
+
+def _column_reach(m: Any, n_sites: int) -> Any:
+    np, _ = _require_scipy()
+    counts = np.asarray(m.sum(axis=0)).ravel()
+    return counts, counts / max(1, n_sites)
+
+
+def entity_reach(sm: SiteMatrices, *, top_n: int = 100) -> list[dict[str, Any]]:
+    np, _ = _require_scipy()
+    counts, share = _column_reach(sm.site_entity, sm.n_sites)
+    order = np.argsort(-counts, kind="stable")[:top_n]
+    return [{"entity": sm.entities[j], "sites": int(counts[j]), "share": float(share[j])} for j in order]
+
+
+def category_reach(sm: SiteMatrices) -> list[dict[str, Any]]:
+    """Share of sites with at least one third party of each category."""
+    np, _ = _require_scipy()
+    counts, share = _column_reach(sm.site_category, sm.n_sites)
+    order = np.argsort(-counts, kind="stable")
+    return [{"category": sm.categories[j], "sites": int(counts[j]), "share": float(share[j])} for j in order]
+
+
+def prevalence_by_rank_bucket(
+    sm: SiteMatrices,
+    *,
+    buckets: Iterable[int] = DEFAULT_RANK_BUCKETS,
+    top_n: int = 20,
+) -> list[dict[str, Any]]:
+    """
+    Entity prevalence per rank bucket. Sites are grouped with one sparse
+    (bucket x site) indicator matrix, so all buckets come from a single
+    sparse product.
+    """
+    np, sp = _require_scipy()
+    edges = np.asarray(sorted(int(b) for b in buckets), dtype=np.float64)
+    labels = []
+    lo = 1
+    for hi in edges:
+        labels.append(f"{lo}-{int(hi)}")
+        lo = int(hi) + 1
+    labels.append(f">{int(edges[-1])}" if edges.size else "all")
+    labels.append("unranked")
+
+    idx = np.searchsorted(edges, sm.ranks, side="left")
+    idx[np.isnan(sm.ranks)] = len(labels) - 1
+    indicator = sp.csr_matrix(
+        (np.ones(sm.n_sites, dtype=np.float32), (idx, np.arange(sm.n_sites))),
+        shape=(len(labels), sm.n_sites),
+    )
+    site_counts = np.asarray(indicator.sum(axis=1)).ravel()
+    counts = (indicator @ sm.site_entity).toarray()
+
+    out = []
+    for b, label in enumerate(labels):
+        if not site_counts[b]:
+            continue
+        row = counts[b]
+        order = np.argsort(-row, kind="stable")[:top_n]
+        out.append({
+            "bucket": label,
+            "sites": int(site_counts[b]),
+            "entities": [
+                {"entity": sm.entities[j], "sites": int(row[j]), "share": float(row[j] / site_counts[b])}
+                for j in order
+                if row[j] > 0
+            ],
+        })
+    return out
+
+
+def entity_cooccurrence(
+    sm: SiteMatrices,
+    *,
+    top_n: int = 200,
+    min_sites: int = 10,
+    max_pairs: int = 1000,
+) -> list[dict[str, Any]]:
+    """
+    Pairwise co-occurrence among the `top_n` most prevalent entities:
+    C = X^T X on the column-restricted incidence matrix, with Jaccard and lift.
+    """
+    np, sp = _require_scipy()
+    counts, _ = _column_reach(sm.site_entity, sm.n_sites)
+    cols = np.argsort(-counts, kind="stable")[:top_n]
+    x = sm.site_entity[:, cols]
+    co = (x.T @ x).toarray()
+    reach = counts[cols]
+    iu, ju = np.triu_indices(len(cols), k=1)
+    both = co[iu, ju]
+    mask = both >= min_sites
+    iu, ju, both = iu[mask], ju[mask], both[mask]
+    union = reach[iu] + reach[ju] - both
+    jaccard = both / np.maximum(union, 1)
+    lift = both * sm.n_sites / np.maximum(reach[iu] * reach[ju], 1)
+    order = np.argsort(-both, kind="stable")[:max_pairs]
+    return [
+        {
+            "a": sm.entities[cols[iu[k]]],
+            "b": sm.entities[cols[ju[k]]],
+            "sites": int(both[k]),
+            "jaccard": float(jaccard[k]),
+            "lift": float(lift[k]),
+        }
+        for k in order
+    ]
+
+
+def compute_analytics(
+    sm: SiteMatrices,
+    *,
+    buckets: Iterable[int] = DEFAULT_RANK_BUCKETS,
+    top_n: int = 100,
+    cooccurrence_top_n: int = 200,
+    min_pair_sites: int = 10,
+) -> dict[str, Any]:
+    np, _ = _require_scipy()
+    per_site = np.asarray(sm.site_entity.sum(axis=1)).ravel()
+    return {
+        "sites": sm.n_sites,
+        "entities": len(sm.entities),
+        "categories": len(sm.categories),
+        "entities_per_site": {
+            "mean": float(per_site.mean()) if per_site.size else 0.0,
+            "median": float(np.median(per_site)) if per_site.size else 0.0,
+            "p90": float(np.percentile(per_site, 90)) if per_site.size else 0.0,
+            "zero_share": float((per_site == 0).mean()) if per_site.size else 0.0,
+        },
+        "entity_reach": entity_reach(sm, top_n=top_n),
+        "category_reach": category_reach(sm),
+        "rank_buckets": prevalence_by_rank_bucket(sm, buckets=buckets, top_n=min(top_n, 20)),
+        "cooccurrence": entity_cooccurrence(sm, top_n=cooccurrence_top_n, min_sites=min_pair_sites),
+    }
+
+
+def write_parquet(analytics: dict[str, Any], out_dir: str | Path) -> None:
+    """Flat Parquet tables of the same statistics (needs pyarrow)."""
+    from .export import _require_pyarrow
+
+    pa, pq = _require_pyarrow()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist(analytics["entity_reach"]), out / "entity_reach.parquet")
+    pq.write_table(pa.Table.from_pylist(analytics["category_reach"]), out / "category_reach.parquet")
+    pq.write_table(pa.Table.from_pylist(analytics["cooccurrence"]), out / "entity_cooccurrence.parquet")
+    bucket_rows = [
+        {"bucket": b["bucket"], "bucket_sites": b["sites"], **e}
+        for b in analytics["rank_buckets"]
+        for e in b["entities"]
+    ]
+    pq.write_table(pa.Table.from_pylist(bucket_rows), out / "rank_bucket_prevalence.parquet")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset analytics",
+        description="Run-wide entity/category prevalence, rank-bucket prevalence and entity co-occurrence.",
+    )
+    p.add_argument("--results", type=str, required=True, help="Path to results.jsonl.")
+    p.add_argument("--out", type=str, required=True, help="Output analytics JSON.")
+    p.add_argument("--parquet-dir", type=str, default=None, help="Also write the tables as Parquet here (needs pyarrow).")
+    p.add_argument("--statuses", type=str, default=",".join(DEFAULT_STATUSES), help="Comma-separated site statuses to include. Default: ok,policy_not_found")
+    p.add_argument("--rank-buckets", type=str, default=",".join(str(b) for b in DEFAULT_RANK_BUCKETS), help="Comma-separated upper rank bounds. Default: 1000,10000,100000,1000000")
+    p.add_argument("--top", type=int, default=100, help="Entities listed in entity_reach. Default: 100")
+    p.add_argument("--cooccurrence-top", type=int, default=200, help="Most prevalent entities included in co-occurrence. Default: 200")
+    p.add_argument("--min-pair-sites", type=int, default=10, help="Minimum shared sites for a co-occurrence pair. Default: 10")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    statuses = [s.strip() for s in args.statuses.split(",") if s.strip()]
+    buckets = [int(b) for b in args.rank_buckets.split(",") if b.strip()]
+    sm = load_matrices(args.results, statuses=statuses)
+    analytics = compute_analytics(
+        sm,
+        buckets=buckets,
+        top_n=args.top,
+        cooccurrence_top_n=args.cooccurrence_top,
+        min_pair_sites=args.min_pair_sites,
+    )
+    write_json(args.out, analytics)
+    if args.parquet_dir:
+        write_parquet(analytics, args.parquet_dir)
+    log(f"Analytics: {sm.n_sites} sites x {len(sm.entities)} entities x {len(sm.categories)} categories -> {args.out}")
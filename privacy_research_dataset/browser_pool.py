@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Callable
+
+from . import tracing
+from .crawl4ai_client import Crawl4AIResult
+from .memwatch import direct_children, tree_rss_bytes
+from .metrics import METRICS
+from .utils.errors import classify_error
+from .utils.logging import log, warn
+
+_MB = 1024 * 1024
+# RSS is read from /proc for the whole browser tree; don't do it on every page.
+RSS_CHECK_EVERY_PAGES = 10
+START_ATTEMPTS = 3
+
+
+class _Slot:
+    __slots__ = ("index", "client", "pids", "in_flight", "pages", "generation", "state", "reason")
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.client: Any = None
+        self.pids: set[int] = set()
+        self.in_flight = 0
+        self.pages = 0
+        self.generation = 0
+        # starting | ready | draining | dead | failed
+        self.state = "starting"
+        self.reason: str | None = None
+
+    def alive(self) -> bool:
+        """False once any browser process started for this slot has exited."""
+        for pid in self.pids:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return False
+            except OSError:
+                continue
+        return True
+
+
+class BrowserPool:
+    """
+    M browser clients behind the single-client interface (`fetch`, `restart`,
+    async context manager) so the crawler doesn't need to know.
+
+    Fetches go to the ready slot with the fewest in-flight fetches. A slot is
+    drained and relaunched after `recycle_pages` fetches or once its browser
+    processes exceed `recycle_rss_mb`. When a fetch fails with a browser crash
+    (or the slot's processes are gone), the slot is relaunched and the fetch
+    is retried on another slot, up to `crash_retries` times.
+
+    `client_factory` returns an unopened client (e.g. a `Crawl4AIClient`).
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        *,
+        size: int = 1,
+        recycle_pages: int = 0,
+        recycle_rss_mb: float | None = None,
+        crash_retries: int = 1,
+    ) -> None:
+        self._factory = client_factory
+        self.size = max(1, int(size))
+        self.recycle_pages = max(0, int(recycle_pages))
+        self.recycle_rss_mb = recycle_rss_mb
+        self.crash_retries = max(0, int(crash_retries))
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self._cond: asyncio.Condition | None = None
+        # Slots start one at a time so new child pids can be attributed to a slot.
+        self._start_lock: asyncio.Lock | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.restarts: dict[str, int] = {}
+        self._template = client_factory()
+
+    # The crawler reads these for its plain-HTTP tier.
+    @property
+    def user_agent(self) -> str | None:
+        return getattr(self._template, "user_agent", None)
+
+    @property
+    def proxy(self) -> str | None:
+        return getattr(self._template, "proxy", None)
+
+    @property
+    def page_timeout_ms(self) -> int:
+        return int(getattr(self._template, "page_timeout_ms", 15000))
+
+    async def __aenter__(self) -> "BrowserPool":
+        self._cond = asyncio.Condition()
+        self._start_lock = asyncio.Lock()
+        for slot in self._slots:
+            await self._start(slot, raise_on_failure=True)
+        METRICS.set_gauge("browser_pool_ready", self._ready_count())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        for t in list(self._tasks):
+            t.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for slot in self._slots:
+            await self._close(slot)
+
+    async def restart(self) -> None:
+        """Relaunch every slot. Callers drain fetches first (see `memwatch.RestartGate`)."""
+        await asyncio.gather(*(self._restart(slot, "requested") for slot in self._slots))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "restarts": dict(self.restarts),
+            "slots": [
+                {"index": s.index, "state": s.state, "pages": s.pages, "in_flight": s.in_flight, "generation": s.generation}
+                for s in self._slots
+            ],
+        }
+
+    async def fetch(self, url: str, **kwargs: Any) -> Crawl4AIResult:
+        res: Crawl4AIResult | None = None
+        for attempt in range(self.crash_retries + 1):
+            slot = await self._acquire()
+            if slot is None:
+                return res or Crawl4AIResult(
+                    url=url, success=False, status_code=None, raw_html=None, cleaned_html=None,
+                    text=None, network_requests=None, error_message="browser_pool: no healthy browser",
+                )
+            generation = slot.generation
+            crashed = False
+            try:
+                res = await slot.client.fetch(url, **kwargs)
+                crashed = not res.success and (
+                    classify_error(res.error_message) == "browser_crash" or not slot.alive()
+                )
+            finally:
+                await self._release(slot, generation, crashed=crashed)
+            if not crashed:
+                return res
+            METRICS.inc("browser_crash_retries_total")
+            tracing.annotate(browser_crash_retries=attempt + 1)
+            warn(f"[browser_pool] browser {slot.index} crashed on {url}: {res.error_message}")
+        assert res is not None
+        return res
+
+    # ---------------------------
+    # internals
+    # ---------------------------
+
+    def _ready_count(self) -> int:
+        return sum(1 for s in self._slots if s.state == "ready")
+
+    async def _acquire(self) -> _Slot | None:
+        assert self._cond is not None
+        async with self._cond:
+            while True:
+                ready = [s for s in self._slots if s.state == "ready"]
+                if ready:
+                    slot = min(ready, key=lambda s: (s.in_flight, s.pages))
+                    slot.in_flight += 1
+                    return slot
+                if all(s.state == "failed" for s in self._slots):
+                    return None
+                await self._cond.wait()
+
+    async def _release(self, slot: _Slot, generation: int, *, crashed: bool) -> None:
+        assert self._cond is not None
+        async with self._cond:
+            slot.in_flight -= 1
+            if slot.generation != generation:
+                # Fetch outlived its browser (the slot was relaunched underneath it).
+                return
+            slot.pages += 1
+            if crashed and slot.state in ("ready", "draining"):
+                slot.state, slot.reason = "dead", "crash"
+            elif slot.state == "ready":
+                reason = self._recycle_reason(slot)
+                if reason:
+                    slot.state, slot.reason = "draining", reason
+            if slot.state in ("draining", "dead") and slot.in_flight == 0:
+                self._spawn(self._restart(slot, slot.reason or "recycle"))
+            self._cond.notify_all()
+
+    def _recycle_reason(self, slot: _Slot) -> str | None:
+        if self.recycle_pages and slot.pages >= self.recycle_pages:
+            return "pages"
+        if self.recycle_rss_mb and slot.pids and slot.pages % RSS_CHECK_EVERY_PAGES == 0:
+            rss = tree_rss_bytes(slot.pids)
+            if rss is not None and rss / _MB >= self.recycle_rss_mb:
+                return "rss"
+        if not slot.alive():
+            return "crash"
+        return None
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _restart(self, slot: _Slot, reason: str) -> None:
+        assert self._cond is not None
+        async with self._cond:
+            if slot.state == "starting":
+                return
+            slot.state = "starting"
+            self._cond.notify_all()
+        METRICS.set_gauge("browser_pool_ready", self._ready_count())
+        self.restarts[reason] = self.restarts.get(reason, 0) + 1
+        METRICS.inc("browser_restarts_total", reason=reason)
+        log(f"[browser_pool] relaunching browser {slot.index} ({reason}, {slot.pages} pages)")
+        await self._close(slot)
+        await self._start(slot)
+
+    async def _close(self, slot: _Slot) -> None:
+        client, slot.client = slot.client, None
+        if client is None:
+            return
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            warn(f"[browser_pool] closing browser {slot.index} failed: {e}")
+        # A crashed or wedged browser may leave processes behind.
+        for pid in slot.pids:
+            try:
+                os.kill(pid, 9)
+            except OSError:
+                pass
+        slot.pids = set()
+
+    async def _start(self, slot: _Slot, *, raise_on_failure: bool = False) -> None:
+        assert self._cond is not None and self._start_lock is not None
+        err: Exception | None = None
+        # The initial launch fails fast (e.g. Crawl4AI not installed); relaunches retry.
+        attempts = 1 if raise_on_failure else START_ATTEMPTS
+        for attempt in range(attempts):
+            async with self._start_lock:
+                before = direct_children()
+                client = self._factory()
+                try:
+                    await client.__aenter__()
+                except Exception as e:
+                    err = e
+                else:
+                    slot.pids = direct_children() - before
+                    slot.client = client
+                    break
+            if attempt + 1 < attempts:
+                warn(f"[browser_pool] starting browser {slot.index} failed (attempt {attempt + 1}): {err}")
+                await asyncio.sleep(2 ** attempt)
+        async with self._cond:
+            slot.generation += 1
+            slot.pages = 0
+            slot.reason = None
+            slot.state = "ready" if slot.client is not None else "failed"
+            self._cond.notify_all()
+        METRICS.set_gauge("browser_pool_ready", self._ready_count())
+        if slot.client is None:
+            if raise_on_failure and err is not None:
+                raise err
+            warn(f"[browser_pool] browser {slot.index} is out of service")
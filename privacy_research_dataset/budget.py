@@ -0,0 +1,131 @@
+"""
+Per-site and per-run crawl budgets.
+
+A `SiteBudget` caps one site's active processing time, fetch count and
+fetched page bytes, and carries the run-level deadline (a `time.monotonic()`
+timestamp) if there is one. The crawler activates a site's budget around each
+stage (`activate()`, a context variable like tracing's current span), so the
+fetch paths can `charge()` it without being passed the site.
+
+It is enforced in two ways:
+
+- soft: the crawler calls `exhausted()` right before each further fetch
+  (home retries, policy candidates, hubs, third-party policies) and stops
+  there, keeping what it already has;
+- hard: `run_stage` bounds each stage by `remaining_s()` and cancels it when
+  the time runs out (e.g. a render that hangs until its page timeout).
+
+Only a refused fetch or a cancelled stage marks the budget exhausted (its
+`reason`); a site that used its budget exactly isn't. An exhausted site ends
+with status `budget_exhausted` and partial results, unless it already found
+its first-party policy: that stays `ok`, with the reason recorded.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+_current: ContextVar["SiteBudget | None"] = ContextVar("privacy_dataset_budget", default=None)
+
+
+class SiteBudget:
+    def __init__(
+        self,
+        *,
+        max_wall_s: float | None = None,
+        max_fetches: int | None = None,
+        max_bytes: int | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        self.max_wall_s = max_wall_s if max_wall_s and max_wall_s > 0 else None
+        self.max_fetches = max_fetches if max_fetches and max_fetches > 0 else None
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self.deadline = deadline
+        self.fetches = 0
+        self.bytes = 0
+        self.active_s = 0.0
+        self.reason: str | None = None  # sticky once a check found the budget exhausted
+
+    def charge(self, nbytes: int = 0) -> None:
+        self.fetches += 1
+        self.bytes += max(0, int(nbytes))
+
+    def remaining_s(self) -> tuple[float | None, str | None]:
+        """Seconds of stage time left and which limit binds (`wall_time` / `run_deadline`); (None, None) if unbounded."""
+        left: float | None = None
+        reason: str | None = None
+        if self.max_wall_s is not None:
+            left, reason = self.max_wall_s - self.active_s, "wall_time"
+        if self.deadline is not None:
+            to_deadline = self.deadline - time.monotonic()
+            if left is None or to_deadline < left:
+                left, reason = to_deadline, "run_deadline"
+        return left, reason
+
+    def check(self) -> str | None:
+        """The reason another fetch would be refused, or None; doesn't mark the budget exhausted."""
+        if self.reason is not None:
+            return self.reason
+        left, why = self.remaining_s()
+        if left is not None and left <= 0:
+            return why
+        if self.max_fetches is not None and self.fetches >= self.max_fetches:
+            return "fetches"
+        if self.max_bytes is not None and self.bytes >= self.max_bytes:
+            return "bytes"
+        return None
+
+    def exhausted(self) -> str | None:
+        """Call right before a fetch: the reason to skip it (recorded as `reason`), or None."""
+        if self.reason is None:
+            self.reason = self.check()
+        return self.reason
+
+    def usage(self) -> dict[str, Any]:
+        return {"fetches": self.fetches, "bytes": self.bytes, "active_ms": int(self.active_s * 1000)}
+
+
+@contextmanager
+def activate(budget: SiteBudget | None) -> Iterator[SiteBudget | None]:
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+def current() -> SiteBudget | None:
+    return _current.get()
+
+
+def charge(nbytes: int = 0) -> None:
+    """Count one fetch (and its page bytes) against the active site budget, if any."""
+    budget = _current.get()
+    if budget is not None:
+        budget.charge(nbytes)
+
+
+def exhausted() -> str | None:
+    """`SiteBudget.exhausted()` of the active budget: only call it when a fetch would follow."""
+    budget = _current.get()
+    return budget.exhausted() if budget is not None else None
+
+
+def stop_reason() -> str | None:
+    """Why the active budget refused a fetch or cancelled a stage, if it did."""
+    budget = _current.get()
+    return budget.reason if budget is not None else None
+
+
+def from_args(args: Any, *, deadline: float | None = None) -> SiteBudget | None:
+    """A fresh budget for one site, or None when no limit is configured."""
+    if not (args.site_max_wall_s or args.site_max_fetches or args.site_max_bytes or deadline is not None):
+        return None
+    return SiteBudget(
+        max_wall_s=args.site_max_wall_s,
+        max_fetches=args.site_max_fetches,
+        max_bytes=args.site_max_bytes,
+        deadline=deadline,
+    )
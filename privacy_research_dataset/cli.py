@@ -1,58 +1,67 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
+import dataclasses
+import gc
 import json
 import os
-import re
 import sys
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable
 
-import aiohttp
-
-from .crawl4ai_client import Crawl4AIClient, Crawl4AIResult
-from .crawler import process_site
-from .tracker_radar import TrackerRadarIndex
-from .trackerdb import TrackerDbIndex
+# Keep this module light: `--help`, the prefilter and the post-processing
+# subcommands must not pay for aiohttp / Crawl4AI / trafilatura / bs4. The
+# crawl imports them in `_run`.
+from .host_scheduler import add_host_scheduler_arguments
+from .prefilter import add_prefilter_arguments
 from .tranco_list import get_tranco_sites
 from .utils.io import append_jsonl, write_json
 from .utils.logging import log, warn
-from .summary import SummaryBuilder, site_to_explorer_record
 
 
-# ---------------------------
-# Prefilter defaults
-# ---------------------------
+_CRUX_ENDPOINT = "https://chromeuxreport.googleapis.com/v1/records:queryRecord"
 
-DEFAULT_EXCLUDE_SUFFIXES: set[str] = {
-    # Infrastructure / authoritative DNS
-    "gtld-servers.net",
-    "root-servers.net",
-    "iana-servers.net",
+# Post-processing subcommands (`privacy-dataset <name> ...`). Each module exposes
+# `main(argv)` with its own parser; anything else is treated as a crawl.
+_SUBCOMMANDS: dict[str, str] = {
+    "analytics": ".analytics",
+    "consistency": ".consistency",
+    "export": ".export",
+    "ingest": ".results_db",
+    "merge-summaries": ".summary",
+    "near-dups": ".near_dup",
+    "prefilter": ".prefilter",
+    "search": ".policy_index",
+    "serve": ".serve",
+    "trace-report": ".tracing",
 }
 
-_HTML_MARKER = re.compile(r"(?is)<\s*!doctype\s+html|<\s*html\b|<\s*head\b|<\s*body\b")
-_LINK_MARKER = re.compile(r"(?is)<\s*a\b")
-_CRUX_ENDPOINT = "https://chromeuxreport.googleapis.com/v1/records:queryRecord"
+
+def add_input_arguments(group: Any) -> None:
+    group.add_argument("--input", type=str, default=None, help="Path to a newline-delimited list of domains/URLs. If omitted, uses Tranco.")
+    group.add_argument("--tranco-top", type=int, default=100, help="How many Tranco sites to include (if --input not set).")
+    group.add_argument("--tranco-date", type=str, default=None, help="Tranco snapshot date YYYY-MM-DD (recommended for reproducibility).")
+    group.add_argument("--tranco-cache-dir", type=str, default=".tranco_cache", help="Tranco cache directory.")
 
 
-def _parse_args() -> argparse.Namespace:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(
         prog="privacy-dataset",
         description="Build Step-1 dataset: websites -> first-party privacy policy + observed third-party tools (+ their policies via Tracker Radar / Ghostery TrackerDB).",
+        epilog="Subcommands: crawl (default), " + ", ".join(sorted(_SUBCOMMANDS)) + " (run `privacy-dataset <subcommand> --help`).",
     )
-    src = p.add_argument_group("Input source")
-    src.add_argument("--input", type=str, default=None, help="Path to a newline-delimited list of domains/URLs. If omitted, uses Tranco.")
-    src.add_argument("--tranco-top", type=int, default=100, help="How many Tranco sites to include (if --input not set).")
-    src.add_argument("--tranco-date", type=str, default=None, help="Tranco snapshot date YYYY-MM-DD (recommended for reproducibility).")
-    src.add_argument("--tranco-cache-dir", type=str, default=".tranco_cache", help="Tranco cache directory.")
+    add_input_arguments(p.add_argument_group("Input source"))
 
     out = p.add_argument_group("Output")
     out.add_argument("--out", type=str, required=True, help="Output JSONL path (one record per site).")
     out.add_argument("--artifacts-dir", type=str, required=True, help="Directory to store HTML/text artifacts per site.")
+    out.add_argument("--results-db", type=str, default=None, help="Also write results into an indexed SQLite database (batched transactions alongside the JSONL).")
+    out.add_argument("--results-db-batch", type=int, default=50, help="Records per SQLite transaction for --results-db. Default: 50")
+    out.add_argument("--policy-index", type=str, default=None, help="Maintain a full-text (SQLite FTS5) index of first- and third-party policy texts at this path.")
+    out.add_argument("--dedup-artifacts", action="store_true", help="Store policy/HTML artifacts once by content hash under <artifacts-dir>/_content and hardlink the per-site files to them.")
 
     radar = p.add_argument_group("Tracker Radar")
     radar.add_argument("--tracker-radar-index", type=str, default=None, help="Path to tracker_radar_index.json (built with scripts/build_tracker_radar_index.py).")
@@ -69,15 +78,43 @@ def _parse_args() -> argparse.Namespace:
     crawl.add_argument("--locale", type=str, default="en-GB", help="Browser locale. Default: en-GB")
     crawl.add_argument("--timezone-id", type=str, default="Europe/Paris", help="Browser timezone id. Default: Europe/Paris")
     crawl.add_argument("--page-timeout-ms", type=int, default=15000, help="Page timeout in ms.")
+    crawl.add_argument("--adaptive-settle", action="store_true", help="Return each page once the DOM and network have been quiet for --settle-quiet-ms (bounded by --settle-min-ms/--settle-max-ms) instead of right after DOMContentLoaded.")
+    crawl.add_argument("--settle-min-ms", type=int, default=500, help="With --adaptive-settle, never return earlier than this after navigation start. Default: 500")
+    crawl.add_argument("--settle-max-ms", type=int, default=8000, help="With --adaptive-settle, stop waiting for quiet this long after DOMContentLoaded. Default: 8000")
+    crawl.add_argument("--settle-quiet-ms", type=int, default=500, help="With --adaptive-settle, required DOM/network quiet period. Default: 500")
+    crawl.add_argument("--home-capture-window-ms", type=int, default=3000, help="With --adaptive-settle, keep capturing home-page network requests for at least this long so late third-party tags are seen. Default: 3000")
+    crawl.add_argument("--home-fetch-hedge", action="store_true", help="Race the home-page browser render against a plain HTTP fetch; link discovery starts from whichever returns usable HTML first while the browser keeps capturing network requests.")
+    crawl.add_argument("--home-hedge-delay-ms", type=int, default=0, help="With --home-fetch-hedge, start the HTTP fetch only if the browser hasn't finished after this long. Default: 0 (at once)")
+    crawl.add_argument("--home-retry", type=str, default="inline", choices=["inline", "deferred", "final-pass"], help="Where failed home fetches are retried: inline (within the site's slot), deferred (re-queued after backoff without holding a slot) or final-pass (after all other sites). DNS/TLS/4xx failures are not retried. Default: inline")
+    crawl.add_argument("--home-retry-max", type=int, default=3, help="Total home-fetch attempts per site. Default: 3")
+    crawl.add_argument("--no-resource-blocking", action="store_true", help="Load images, media, fonts, stylesheets and tracker requests on policy/hub renders too (they are aborted by default; the home fetch is never blocked).")
+    crawl.add_argument("--browser-pool-size", type=int, default=1, help="Browser instances to run; fetches go to the least-loaded one. Default: 1")
+    crawl.add_argument("--browser-recycle-pages", type=int, default=0, help="Relaunch a browser instance after this many fetches (0 = never). Default: 0")
+    crawl.add_argument("--browser-recycle-rss-mb", type=float, default=None, help="Relaunch a browser instance once its processes use more than this RSS (checked every 10 fetches).")
+    crawl.add_argument("--browser-crash-retries", type=int, default=1, help="Retry a fetch on another (or relaunched) browser this many times when its browser crashed. Default: 1")
 
     scale = p.add_argument_group("Scale / behavior")
     scale.add_argument("--max-sites", type=int, default=None, help="Hard cap on number of sites processed.")
     scale.add_argument("--concurrency", type=int, default=3, help="How many sites to process concurrently.")
+    scale.add_argument("--adaptive-concurrency", action="store_true", help="Adjust the number of concurrently processed sites during the run (additive increase, multiplicative decrease), starting from --concurrency. Decreases on browser timeouts/crashes, rising fetch latency, event-loop lag or memory; each change is emitted as a concurrency_adjusted event.")
+    scale.add_argument("--concurrency-min", type=int, default=1, help="Floor for --adaptive-concurrency. Default: 1")
+    scale.add_argument("--concurrency-max", type=int, default=None, help="Ceiling for --adaptive-concurrency. Default: 4x --concurrency")
+    scale.add_argument("--adaptive-interval-s", type=float, default=10.0, help="How often --adaptive-concurrency re-evaluates the limit. Default: 10")
+    scale.add_argument("--adaptive-max-error-rate", type=float, default=0.2, help="Share of browser fetches that time out or crash in a window above which concurrency is cut. Default: 0.2")
+    scale.add_argument("--adaptive-max-loop-lag-ms", type=float, default=250.0, help="Event-loop lag above which concurrency is cut. Default: 250")
+    scale.add_argument("--adaptive-memory-mb", type=float, default=None, help="Process + browser RSS above which concurrency is cut. Default: --memory-high-water-mb")
+    scale.add_argument("--pipeline", action="store_true", help="Process sites as a pipeline: home fetch, policy discovery and third-party work each get their own worker pool and queue, so home fetches of new sites keep flowing while earlier sites sit in slow discovery. Per-stage queue depths go to --metrics-port / --state-file.")
+    scale.add_argument("--home-workers", type=int, default=None, help="With --pipeline: home-fetch workers. Default: --concurrency")
+    scale.add_argument("--discovery-workers", type=int, default=None, help="With --pipeline: policy-discovery workers. Default: --concurrency")
+    scale.add_argument("--third-party-workers", type=int, default=None, help="With --pipeline: third-party extraction / policy-fetch workers. Default: --concurrency")
+    scale.add_argument("--pipeline-buffer", type=int, default=None, help="With --pipeline: max sites queued in front of the discovery and third-party stages. Default: 2x the stage's workers")
     scale.add_argument("--third-party-engine", type=str, default="crawl4ai", choices=["crawl4ai", "openwpm"], help="How to collect third-party requests: crawl4ai (default) or openwpm (heavier).")
     scale.add_argument("--no-third-party-policy-fetch", action="store_true", help="Do not fetch third-party policy texts (still records mappings).")
     scale.add_argument("--third-party-policy-max", type=int, default=30, help="Max number of third-party policies to fetch per site (ranked by prevalence when available).")
     scale.add_argument("--exclude-same-entity", action="store_true", help="Exclude third-party domains owned by the same entity as the first-party site (requires a mapping index).")
 
+    add_host_scheduler_arguments(p.add_argument_group("Per-host politeness (all fetches: browser, HTTP, prefilter)"))
+
     crux = p.add_argument_group("CrUX filter (browsable origins)")
     crux.add_argument("--crux-filter", action="store_true", help="Filter input sites to those present in the Chrome UX Report dataset.")
     crux.add_argument("--crux-api-key", type=str, default=None, help="Chrome UX Report API key (or set CRUX_API_KEY env var).")
@@ -85,6 +122,12 @@ def _parse_args() -> argparse.Namespace:
     crux.add_argument("--crux-concurrency", type=int, default=20, help="Concurrent CrUX API requests.")
     crux.add_argument("--crux-allow-http", action="store_true", help="Fallback to http origin if https isn't found.")
 
+    budgets = p.add_argument_group("Budgets (sites that run out keep partial results; status budget_exhausted unless a policy was found)")
+    budgets.add_argument("--site-max-wall-s", type=float, default=None, help="Max processing time per site (time spent waiting in --pipeline queues doesn't count); the running stage is cancelled when it is used up.")
+    budgets.add_argument("--site-max-fetches", type=int, default=None, help="Max page fetches per site across home attempts, policy candidates, fallbacks, hubs and third-party policies (cache hits are free).")
+    budgets.add_argument("--site-max-bytes", type=int, default=None, help="Max fetched HTML per site (characters of page HTML, summed over fetches).")
+    budgets.add_argument("--run-deadline-s", type=float, default=None, help="Stop the crawl this many seconds after it starts: in-flight sites are cut short with partial results, sites not yet started are skipped.")
+
     skip = p.add_argument_group("Browsable-only (skip failures)")
     skip.add_argument("--skip-home-fetch-failed", action="store_true", help="Drop sites that fail homepage fetch (do not write to results).")
 
@@ -93,6 +136,18 @@ def _parse_args() -> argparse.Namespace:
     sync.add_argument("--emit-events", action="store_true", help="Emit JSONL events to stdout for live dashboards.")
     sync.add_argument("--state-file", type=str, default=None, help="Write run state JSON after each site.")
     sync.add_argument("--summary-out", type=str, default=None, help="Write aggregated summary JSON after each site.")
+    sync.add_argument("--summary-state-out", type=str, default=None, help="Write mergeable summary state JSON (every 100 sites and at the end); combine shards with `privacy-dataset merge-summaries`.")
+    sync.add_argument("--summary-approx-top-k", type=int, default=None, help="Bound summary memory: track only the top-K entities/categories/unmapped domains with sketches. Default: exact counts")
+    sync.add_argument("--metrics-port", type=int, default=None, help="Serve live Prometheus-format metrics (stage latency histograms, fetch/cache counters) on 127.0.0.1:<port>/metrics.")
+    sync.add_argument("--profile", type=str, default=None, help="Sample the crawl's CPU stacks and write profiles (pstats + collapsed stacks, attributed to site stages) into this folder at run end.")
+    sync.add_argument("--profile-interval-ms", type=float, default=5.0, help="Sampling interval for --profile. Default: 5")
+    sync.add_argument("--profile-slowest", type=int, default=0, help="With --profile, also keep per-site profiles for the N slowest sites. Default: 0")
+    sync.add_argument("--trace-out", type=str, default=None, help="Append a span per fetch / policy candidate / extraction step (URL, tier, status, bytes, duration, attempt) to this JSONL; inspect with `privacy-dataset trace-report`.")
+    sync.add_argument("--memory-sample-s", type=float, default=60.0, help="Sample process and browser RSS every N seconds into the state file/events (0 = off). Default: 60")
+    sync.add_argument("--memory-high-water-mb", type=float, default=None, help="When process + browser RSS exceeds this, evict the third-party policy cache and/or restart the browser (see --memory-high-water-action).")
+    sync.add_argument("--memory-high-water-action", type=str, default="both", choices=["evict", "restart", "both"], help="What to do above --memory-high-water-mb; 'both' evicts first and restarts the browser only if still above. Default: both")
+    sync.add_argument("--memory-count-objects", action="store_true", help="Add the number of gc-tracked Python objects to each memory sample (walks the whole heap; pauses the crawl briefly on large runs).")
+    sync.add_argument("--tracemalloc-every", type=int, default=0, help="Trace Python allocations and log the top growth sites every N processed sites (slows the crawl). Default: 0 (off)")
     sync.add_argument("--explorer-out", type=str, default=None, help="Write explorer JSONL (or JSON) for dashboard browsing.")
 
     # ---------------------------
@@ -104,51 +159,12 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Before crawling, keep only domains that respond with HTML over HTTP(S). Helps remove infra domains like gtld-servers.net.",
     )
-    pf.add_argument(
-        "--prefilter-timeout-ms",
-        type=int,
-        default=7000,
-        help="Timeout for the lightweight prefilter HTTP check (ms). Default: 7000",
-    )
-    pf.add_argument(
-        "--prefilter-concurrency",
-        type=int,
-        default=50,
-        help="Concurrency for the prefilter HTTP checks (independent of crawl concurrency). Default: 50",
-    )
-    pf.add_argument(
-        "--prefilter-max-bytes",
-        type=int,
-        default=65536,
-        help="Max bytes to read from response body during prefilter. Default: 65536 (64KB).",
-    )
-    pf.add_argument(
-        "--prefilter-allow-http",
-        action="store_true",
-        help="Allow http:// fallback if https:// fails. Default: off (HTTPS only).",
-    )
-    pf.add_argument(
-        "--prefilter-require-links",
-        action="store_true",
-        help="Require that the HTML contains at least one <a> link. Increases precision for 'real websites'.",
-    )
-    pf.add_argument(
-        "--exclude-suffix",
-        action="append",
-        default=[],
-        help="Exclude domains ending with this suffix (repeatable). Example: --exclude-suffix gtld-servers.net",
-    )
-    pf.add_argument(
-        "--exclude-domains-file",
-        type=str,
-        default=None,
-        help="Path to a file with domains to exclude (one per line; # comments allowed).",
-    )
+    add_prefilter_arguments(pf)
 
-    return p.parse_args()
+    return p.parse_args(argv)
 
 
-def _load_input_sites(args: argparse.Namespace) -> list[dict[str, Any]]:
+def load_input_sites(args: argparse.Namespace) -> list[dict[str, Any]]:
     if args.input:
         path = Path(args.input)
         lines = [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip() and not ln.strip().startswith("#")]
@@ -162,133 +178,6 @@ def _load_input_sites(args: argparse.Namespace) -> list[dict[str, Any]]:
     return sites
 
 
-def _load_exclude_exact(path: str | None) -> set[str]:
-    if not path:
-        return set()
-    p = Path(path)
-    if not p.exists():
-        warn(f"Exclude file not found: {path}")
-        return set()
-    exact: set[str] = set()
-    for ln in p.read_text(encoding="utf-8").splitlines():
-        ln = ln.strip()
-        if not ln or ln.startswith("#"):
-            continue
-        exact.add(ln.lower().rstrip("."))
-    return exact
-
-
-def _normalize_suffix(s: str) -> str:
-    s = s.strip().lower().lstrip(".")
-    return s.rstrip(".")
-
-
-def _is_excluded(domain: str, suffixes: set[str], exact: set[str]) -> bool:
-    d = domain.strip().lower().rstrip(".")
-    if d in exact:
-        return True
-    # suffix match: exact suffix or subdomain of suffix
-    for suf in suffixes:
-        if d == suf or d.endswith("." + suf):
-            return True
-    return False
-
-
-async def _looks_like_website(
-    session: aiohttp.ClientSession,
-    domain: str,
-    *,
-    timeout_ms: int,
-    max_bytes: int,
-    allow_http: bool,
-    require_links: bool,
-) -> bool:
-    # Prefer HTTPS; optionally fall back to HTTP.
-    schemes = ["https"]
-    if allow_http:
-        schemes.append("http")
-
-    for scheme in schemes:
-        url = f"{scheme}://{domain}/"
-        try:
-            timeout = aiohttp.ClientTimeout(total=timeout_ms / 1000)
-            async with session.get(url, timeout=timeout, allow_redirects=True) as resp:
-                if resp.status >= 400:
-                    continue
-
-                ctype = (resp.headers.get("content-type") or "").lower()
-                if ("text/html" not in ctype) and ("application/xhtml" not in ctype):
-                    continue
-
-                chunk = await resp.content.read(max_bytes)
-                if not chunk:
-                    continue
-
-                text = chunk.decode("utf-8", errors="ignore")
-                if not _HTML_MARKER.search(text):
-                    continue
-                if require_links and not _LINK_MARKER.search(text):
-                    continue
-
-                return True
-
-        except Exception:
-            continue
-
-    return False
-
-
-async def _prefilter_sites(args: argparse.Namespace, sites: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    # Combine default suffix excludes with user-provided.
-    suffixes = set(DEFAULT_EXCLUDE_SUFFIXES)
-    for s in args.exclude_suffix or []:
-        suffixes.add(_normalize_suffix(s))
-
-    exact = _load_exclude_exact(args.exclude_domains_file)
-
-    # First apply cheap string-based excludes.
-    pre = []
-    excluded_count = 0
-    for rec in sites:
-        dom = str(rec["site"]).strip()
-        if _is_excluded(dom, suffixes, exact):
-            excluded_count += 1
-            continue
-        pre.append(rec)
-
-    if excluded_count:
-        log(f"Prefilter: excluded {excluded_count} sites by suffix/file rules.")
-
-    if not pre:
-        return pre
-
-    # Now do HTTP checks.
-    ua = args.user_agent or "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
-    headers = {"User-Agent": ua}
-
-    sem = asyncio.Semaphore(max(1, int(args.prefilter_concurrency)))
-
-    async with aiohttp.ClientSession(headers=headers) as session:
-        async def check_one(rec: dict[str, Any]) -> tuple[dict[str, Any], bool]:
-            async with sem:
-                dom = str(rec["site"]).strip()
-                ok = await _looks_like_website(
-                    session,
-                    dom,
-                    timeout_ms=int(args.prefilter_timeout_ms),
-                    max_bytes=int(args.prefilter_max_bytes),
-                    allow_http=bool(args.prefilter_allow_http),
-                    require_links=bool(args.prefilter_require_links),
-                )
-                return rec, ok
-
-        results = await asyncio.gather(*(check_one(r) for r in pre))
-        kept = [rec for (rec, ok) in results if ok]
-
-    log(f"Prefilter: kept {len(kept)}/{len(sites)} sites that look like browsable websites.")
-    return kept
-
-
 def _origin_for_site(site: str) -> str | None:
     s = site.strip()
     if not s:
@@ -313,8 +202,10 @@ async def _crux_has_record(
     origin: str,
     timeout_ms: int,
 ) -> tuple[bool, int | None, str | None]:
+    from aiohttp import ClientTimeout
+
     url = f"{_CRUX_ENDPOINT}?key={api_key}"
-    timeout = aiohttp.ClientTimeout(total=timeout_ms / 1000)
+    timeout = ClientTimeout(total=timeout_ms / 1000)
     try:
         async with session.post(url, json={"origin": origin}, timeout=timeout) as resp:
             status = resp.status
@@ -332,6 +223,10 @@ async def _crux_filter_sites(args: argparse.Namespace, sites: list[dict[str, Any
         warn("CrUX filter requested but no API key provided. Skipping CrUX filter.")
         return sites
 
+    import asyncio
+
+    import aiohttp
+
     sem = asyncio.Semaphore(max(1, int(args.crux_concurrency)))
     headers = {"Content-Type": "application/json"}
     cache: dict[str, bool] = {}
@@ -390,7 +285,28 @@ async def _crux_filter_sites(args: argparse.Namespace, sites: list[dict[str, Any
 
 
 async def _run(args: argparse.Namespace) -> None:
+    import asyncio
+
+    from . import tracing
+    from .content_store import ContentStore
+    from . import budget, host_scheduler
+    from .browser_pool import BrowserPool
+    from .concurrency import AdaptiveLimiter, AimdController
+    from .crawl4ai_client import Crawl4AIClient, Crawl4AIResult, ResourceBlocker, SettlePolicy
+    from .crawler import SITE_STAGES, SiteConfig, finish_site, home_retry_delay_s, new_site_context, run_site, run_stage
+    from .memwatch import MemoryWatch, RestartGate
+    from .pipeline import SitePipeline
+    from .metrics import METRICS, observe_site, serve_metrics
+    from .policy_index import PolicyIndex
+    from .prefilter import prefilter_sites
+    from .profiling import SamplingProfiler, format_stage_table
+    from .results_db import ResultsDB
+    from .summary import SummaryBuilder, site_to_explorer_record
+    from .tracker_radar import TrackerRadarIndex
+    from .trackerdb import TrackerDbIndex
+
     run_id = args.run_id or str(uuid.uuid4())
+    host_scheduler.configure(host_scheduler.from_args(args))
     tracker_radar = TrackerRadarIndex(args.tracker_radar_index) if args.tracker_radar_index else None
     trackerdb = TrackerDbIndex(args.trackerdb_index) if args.trackerdb_index else None
     mapping_mode = (
@@ -402,7 +318,7 @@ async def _run(args: argparse.Namespace) -> None:
         if tracker_radar
         else "none"
     )
-    sites = _load_input_sites(args)
+    sites = load_input_sites(args)
 
     def emit_event(evt: dict[str, Any]) -> None:
         if not args.emit_events:
@@ -437,7 +353,7 @@ async def _run(args: argparse.Namespace) -> None:
     # ---------------------------
     if args.prefilter_websites:
         try:
-            sites = await _prefilter_sites(args, sites)
+            sites = await prefilter_sites(args, sites)
             emit_event({
                 "type": "run_stage",
                 "run_id": run_id,
@@ -451,152 +367,369 @@ async def _run(args: argparse.Namespace) -> None:
     if args.third_party_engine == "openwpm" and args.concurrency > 1:
         warn("OpenWPM engine is blocking/heavy; forcing --concurrency 1.")
         args.concurrency = 1
+        args.adaptive_concurrency = False
+        if args.pipeline:
+            warn("OpenWPM engine is blocking/heavy; ignoring --pipeline.")
+            args.pipeline = False
+    if args.pipeline and args.adaptive_concurrency:
+        warn("--adaptive-concurrency sizes the site slots of the non-pipelined crawl; ignoring it with --pipeline.")
+        args.adaptive_concurrency = False
     if not tracker_radar and not trackerdb:
         warn("No mapping index provided. Third-party domains will be collected but not mapped to entities/policies.")
     if args.exclude_same_entity and not (tracker_radar or trackerdb):
         warn("--exclude-same-entity set but no mapping index provided. Option will have no effect.")
 
-    sem = asyncio.Semaphore(max(1, int(args.concurrency)))
+    floor = max(1, args.concurrency_min)
+    ceiling = max(floor, args.concurrency_max or 4 * args.concurrency)
+    if args.adaptive_concurrency:
+        args.concurrency = min(max(args.concurrency, floor), ceiling)
+    sem = AdaptiveLimiter(args.concurrency)
     write_lock = asyncio.Lock()
 
-    summary = SummaryBuilder(run_id=run_id, total_sites=len(sites), mapping_mode=mapping_mode)
-    explorer_records: list[dict[str, Any]] = []
-    explorer_is_jsonl = bool(args.explorer_out and str(args.explorer_out).endswith(".jsonl"))
+    content_store = ContentStore(Path(args.artifacts_dir) / "_content") if args.dedup_artifacts else None
+    profiler = (
+        SamplingProfiler(interval_s=args.profile_interval_ms / 1000, slowest_sites=args.profile_slowest)
+        if args.profile
+        else None
+    )
+    memory = MemoryWatch(
+        high_water_mb=args.memory_high_water_mb,
+        tracemalloc_every=args.tracemalloc_every,
+        count_objects=args.memory_count_objects,
+    )
+    results_db = ResultsDB(args.results_db, batch_size=args.results_db_batch) if args.results_db else None
+    policy_index = PolicyIndex(args.policy_index) if args.policy_index else None
+    metrics_server = serve_metrics(args.metrics_port) if args.metrics_port else None
+    if metrics_server is not None:
+        log(f"Metrics on http://127.0.0.1:{metrics_server.server_port}/metrics")
+    if args.trace_out:
+        tracing.configure(tracing.JsonlSpanExporter(args.trace_out))
+    if profiler is not None:
+        profiler.start()
 
-    emit_event({
-        "type": "run_started",
-        "run_id": run_id,
-        "total_sites": len(sites),
-        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-    })
+    try:
+        summary = SummaryBuilder(
+            run_id=run_id,
+            total_sites=len(sites),
+            mapping_mode=mapping_mode,
+            approx_top_k=args.summary_approx_top_k,
+        )
+        explorer_records: list[dict[str, Any]] = []
+        explorer_is_jsonl = bool(args.explorer_out and str(args.explorer_out).endswith(".jsonl"))
+
+        emit_event({
+            "type": "run_started",
+            "run_id": run_id,
+            "total_sites": len(sites),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        })
+
+        emit_event({
+            "type": "run_stage",
+            "run_id": run_id,
+            "stage": "crawl_started",
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        })
+
+        resource_blocker = None if args.no_resource_blocking else ResourceBlocker(indexes=(tracker_radar, trackerdb))
+        settle = (
+            SettlePolicy(
+                min_ms=args.settle_min_ms,
+                max_ms=args.settle_max_ms,
+                quiet_ms=args.settle_quiet_ms,
+                capture_window_ms=args.home_capture_window_ms,
+            )
+            if args.adaptive_settle
+            else None
+        )
+
+        def new_browser_client() -> Crawl4AIClient:
+            return Crawl4AIClient(
+                browser_type=args.browser,
+                headless=(not args.headed),
+                verbose=args.verbose,
+                user_agent=args.user_agent,
+                proxy=args.proxy,
+                locale=args.locale,
+                timezone_id=args.timezone_id,
+                page_timeout_ms=args.page_timeout_ms,
+                resource_blocker=resource_blocker,
+                settle=settle,
+            )
 
-    emit_event({
-        "type": "run_stage",
-        "run_id": run_id,
-        "stage": "crawl_started",
-        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-    })
+        async with BrowserPool(
+            new_browser_client,
+            size=args.browser_pool_size,
+            recycle_pages=args.browser_recycle_pages,
+            recycle_rss_mb=args.browser_recycle_rss_mb,
+            crash_retries=args.browser_crash_retries,
+        ) as client:
+            tp_policy_cache: dict[str, Crawl4AIResult] = {}
+            tp_policy_inflight: dict[str, asyncio.Future[Crawl4AIResult]] = {}
+            tp_policy_cache_lock = asyncio.Lock()
+
+            async def fetch_third_party_policy_cached(policy_url: str) -> Crawl4AIResult:
+                owner = False
+                async with tp_policy_cache_lock:
+                    cached = tp_policy_cache.get(policy_url)
+                    if cached is not None:
+                        METRICS.inc("tp_policy_cache_total", result="hit")
+                        return cached
+                    fut = tp_policy_inflight.get(policy_url)
+                    if fut is None:
+                        fut = asyncio.get_running_loop().create_future()
+                        tp_policy_inflight[policy_url] = fut
+                        owner = True
+                METRICS.inc("tp_policy_cache_total", result=("miss" if owner else "inflight_wait"))
+
+                if owner:
+                    try:
+                        result = await client.fetch(
+                            policy_url,
+                            capture_network=False,
+                            remove_overlays=True,
+                            magic=False,
+                        )
+                    except Exception as e:
+                        result = Crawl4AIResult(
+                            url=policy_url,
+                            success=False,
+                            status_code=None,
+                            raw_html=None,
+                            cleaned_html=None,
+                            text=None,
+                            network_requests=None,
+                            error_message=str(e),
+                            text_extraction_method=None,
+                        )
+
+                    # Callers only use the text and fetch outcome; don't keep the page HTML alive.
+                    result = dataclasses.replace(result, raw_html=None, cleaned_html=None, network_requests=None)
+                    async with tp_policy_cache_lock:
+                        tp_policy_cache[policy_url] = result
+                        inflight = tp_policy_inflight.pop(policy_url, None)
+                        if inflight is not None and not inflight.done():
+                            inflight.set_result(result)
+                    return result
 
-    async with Crawl4AIClient(
-        browser_type=args.browser,
-        headless=(not args.headed),
-        verbose=args.verbose,
-        user_agent=args.user_agent,
-        proxy=args.proxy,
-        locale=args.locale,
-        timezone_id=args.timezone_id,
-        page_timeout_ms=args.page_timeout_ms,
-    ) as client:
-        tp_policy_cache: dict[str, Crawl4AIResult] = {}
-        tp_policy_inflight: dict[str, asyncio.Future[Crawl4AIResult]] = {}
-        tp_policy_cache_lock = asyncio.Lock()
-
-        async def fetch_third_party_policy_cached(policy_url: str) -> Crawl4AIResult:
-            owner = False
-            async with tp_policy_cache_lock:
-                cached = tp_policy_cache.get(policy_url)
+                async with tp_policy_cache_lock:
+                    wait_fut = tp_policy_inflight.get(policy_url)
+                    cached = tp_policy_cache.get(policy_url)
                 if cached is not None:
                     return cached
-                fut = tp_policy_inflight.get(policy_url)
-                if fut is None:
-                    fut = asyncio.get_running_loop().create_future()
-                    tp_policy_inflight[policy_url] = fut
-                    owner = True
-
-            if owner:
-                try:
-                    result = await client.fetch(
-                        policy_url,
-                        capture_network=False,
-                        remove_overlays=True,
-                        magic=False,
-                    )
-                except Exception as e:
-                    result = Crawl4AIResult(
-                        url=policy_url,
-                        success=False,
-                        status_code=None,
-                        raw_html=None,
-                        cleaned_html=None,
-                        text=None,
-                        network_requests=None,
-                        error_message=str(e),
-                        text_extraction_method=None,
-                    )
+                if wait_fut is not None:
+                    return await wait_fut
+
+                # Fallback safety path (should rarely happen under race conditions).
+                return await client.fetch(
+                    policy_url,
+                    capture_network=False,
+                    remove_overlays=True,
+                    magic=False,
+                )
 
-                async with tp_policy_cache_lock:
-                    tp_policy_cache[policy_url] = result
-                    inflight = tp_policy_inflight.pop(policy_url, None)
-                    if inflight is not None and not inflight.done():
-                        inflight.set_result(result)
-                return result
+            restart_gate = RestartGate(client.restart)
+
+            site_cfg = SiteConfig(
+                client=client,
+                artifacts_dir=args.artifacts_dir,
+                tracker_radar=tracker_radar,
+                trackerdb=trackerdb,
+                fetch_third_party_policies=not args.no_third_party_policy_fetch,
+                third_party_policy_max=args.third_party_policy_max,
+                third_party_engine=args.third_party_engine,
+                run_id=run_id,
+                exclude_same_entity=bool(args.exclude_same_entity),
+                third_party_policy_fetcher=fetch_third_party_policy_cached,
+                content_store=content_store,
+                policy_text_callback=(policy_index.add_event if policy_index is not None else None),
+                home_hedge_delay_ms=(args.home_hedge_delay_ms if args.home_fetch_hedge else None),
+                home_max_attempts=(args.home_retry_max if args.home_retry == "inline" else 1),
+            )
 
-            async with tp_policy_cache_lock:
-                wait_fut = tp_policy_inflight.get(policy_url)
-                cached = tp_policy_cache.get(policy_url)
-            if cached is not None:
-                return cached
-            if wait_fut is not None:
-                return await wait_fut
-
-            # Fallback safety path (should rarely happen under race conditions).
-            return await client.fetch(
-                policy_url,
-                capture_network=False,
-                remove_overlays=True,
-                magic=False,
+            def pipeline_stage(name: str, stage: Any) -> Any:
+                async def run(ctx: Any) -> bool:
+                    # Hold the restart gate per stage, not while the site waits in a queue.
+                    await restart_gate.enter()
+                    try:
+                        # Workers are long-lived tasks: nest the stage under the site's own span.
+                        with tracing.use(ctx.trace_parent), tracing.span("pipeline_stage", stage=name, site=ctx.domain_or_url):
+                            return await run_stage(stage, ctx, site_cfg)
+                    finally:
+                        await restart_gate.leave()
+                return run
+
+            pipeline_workers = {
+                "home": args.home_workers,
+                "discovery": args.discovery_workers,
+                "third_party": args.third_party_workers,
+            }
+            pipeline = (
+                SitePipeline(
+                    [(name, pipeline_workers[name] or args.concurrency, pipeline_stage(name, stage)) for name, stage in SITE_STAGES],
+                    buffer=args.pipeline_buffer,
+                )
+                if args.pipeline
+                else None
             )
+            if pipeline is not None:
+                # Admit only as many sites as the stages can hold; the rest wait before their home fetch.
+                await sem.set_limit(pipeline.capacity)
+                pipeline.start()
+
+            async def on_memory_high_water(sample: dict[str, Any]) -> None:
+                if args.memory_high_water_action in ("evict", "both"):
+                    async with tp_policy_cache_lock:
+                        evicted = len(tp_policy_cache)
+                        tp_policy_cache.clear()
+                    gc.collect()
+                    if evicted:
+                        after = memory.sample()
+                        entry = memory.record_action("evict_tp_policy_cache", sample, after, evicted=evicted)
+                        warn(f"Memory high-water mark reached ({entry['total_mb_before']} MB); evicted {evicted} cached third-party policies -> {entry['total_mb_after']} MB.")
+                        emit_event({"type": "memory_action", "run_id": run_id, **entry})
+                        sample = after
+                if (
+                    args.memory_high_water_action in ("restart", "both")
+                    and memory.over_high_water(sample)
+                    and memory.restart_allowed()
+                ):
+                    entry = memory.record_action("browser_restart", sample)
+                    warn(f"Memory still above high-water mark ({entry['total_mb_before']} MB); restarting the browser once in-flight sites finish.")
+                    emit_event({"type": "memory_action", "run_id": run_id, **entry})
+                    await restart_gate.request()
+
+            async def memory_loop() -> None:
+                while True:
+                    await asyncio.sleep(args.memory_sample_s)
+                    sample = memory.sample()
+                    emit_event({
+                        "type": "memory_sample",
+                        "run_id": run_id,
+                        **sample,
+                        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    })
+                    if memory.over_high_water(sample):
+                        await on_memory_high_water(sample)
+
+            def on_stage(site: str, rank: int | None, stage: str) -> None:
+                if profiler is not None:
+                    profiler.set_stage(site, stage)
+                emit_event({
+                    "type": "site_stage",
+                    "run_id": run_id,
+                    "site": site,
+                    "rank": rank,
+                    "stage": stage,
+                    "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                })
 
-        async def worker(rec: dict[str, Any]) -> None:
-            async with sem:
+            final_pass: list[tuple[dict[str, Any], int, list[dict[str, Any]], float, dict[str, Any]]] = []
+            run_deadline = (time.monotonic() + args.run_deadline_s) if args.run_deadline_s else None
+            deadline_skipped: list[str] = []
+
+            async def attempt_site(rec: dict[str, Any], attempt: int) -> dict[str, Any]:
                 rank = rec["rank"]
                 site = rec["site"]
-                log(f"Processing {site} (rank={rank})")
+                log(f"Processing {site} (rank={rank})" + (f" [home retry, attempt {attempt}]" if attempt > 1 else ""))
                 emit_event({
                     "type": "site_started",
                     "run_id": run_id,
                     "site": site,
                     "rank": rank,
+                    "attempt": attempt,
                     "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
                 })
-                try:
-                    result = await process_site(
-                        client,
-                        site,
-                        rank=rank,
-                        artifacts_dir=args.artifacts_dir,
-                        tracker_radar=tracker_radar,
-                        trackerdb=trackerdb,
-                        fetch_third_party_policies=not args.no_third_party_policy_fetch,
-                        third_party_policy_max=args.third_party_policy_max,
-                        third_party_engine=args.third_party_engine,
-                        run_id=run_id,
-                        exclude_same_entity=bool(args.exclude_same_entity),
-                        third_party_policy_fetcher=fetch_third_party_policy_cached,
-                        stage_callback=lambda stage: emit_event({
-                            "type": "site_stage",
-                            "run_id": run_id,
-                            "site": site,
+                if pipeline is None:
+                    await restart_gate.enter()
+                METRICS.add_gauge("sites_in_flight", 1)
+                with tracing.span("site", site=site, rank=rank, attempt=(attempt if attempt > 1 else None)) as site_span:
+                    try:
+                        ctx = new_site_context(
+                            site,
+                            rank=rank,
+                            artifacts_dir=args.artifacts_dir,
+                            stage_callback=lambda stage: on_stage(site, rank, stage),
+                            site_budget=budget.from_args(args, deadline=run_deadline),
+                        )
+                        if pipeline is not None:
+                            result = finish_site(await pipeline.run(ctx), site_cfg)
+                        else:
+                            result = await run_site(ctx, site_cfg)
+                    except Exception as e:
+                        warn(f"Unhandled error for {site}: {e}")
+                        result = {
                             "rank": rank,
-                            "stage": stage,
-                            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-                        }),
+                            "input": site,
+                            "status": "exception",
+                            "error_message": str(e),
+                            "run_id": run_id,
+                        }
+                    finally:
+                        METRICS.add_gauge("sites_in_flight", -1)
+                        if pipeline is None:
+                            await restart_gate.leave()
+                    site_span.set(status=result.get("status"), total_ms=result.get("total_ms"))
+                return result
+
+            async def worker(
+                rec: dict[str, Any],
+                attempt: int = 1,
+                history: list[dict[str, Any]] | None = None,
+                result: dict[str, Any] | None = None,
+            ) -> None:
+                history = [] if history is None else history
+                while True:
+                    async with sem:
+                        if run_deadline is not None and time.monotonic() >= run_deadline:
+                            if result is None:
+                                deadline_skipped.append(rec["site"])
+                                return
+                            break  # don't retry past the deadline; keep the last failed attempt
+                        result = await attempt_site(rec, attempt)
+                    done = len(history)
+                    history.extend(
+                        {**h, "attempt": done + i} for i, h in enumerate(result.get("home_fetch_history") or [], start=1)
                     )
-                except Exception as e:
-                    warn(f"Unhandled error for {site}: {e}")
-                    result = {
-                        "rank": rank,
-                        "input": site,
-                        "status": "exception",
-                        "error_message": str(e),
+                    if args.home_retry == "inline" or result.get("status") != "home_fetch_failed":
+                        break
+                    last_error = history[-1]["error_message"] if history else result.get("error_message")
+                    delay_s = home_retry_delay_s(last_error, len(history), max_attempts=args.home_retry_max)
+                    if delay_s is None:
+                        break
+                    METRICS.inc("home_retries_total", mode=args.home_retry, error_class=history[-1]["error_class"])
+                    emit_event({
+                        "type": "site_retry_scheduled",
                         "run_id": run_id,
-                    }
+                        "site": rec["site"],
+                        "rank": rec["rank"],
+                        "attempt": len(history) + 1,
+                        "delay_s": delay_s,
+                        "error_class": history[-1]["error_class"],
+                        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    })
+                    if args.home_retry == "final-pass":
+                        final_pass.append((rec, attempt + 1, history, time.monotonic() + delay_s, result))
+                        return
+                    # Deferred: back off without holding a concurrency slot.
+                    await asyncio.sleep(delay_s)
+                    attempt += 1
+                if history:
+                    result["home_fetch_history"] = history
+                    result["home_fetch_attempts"] = len(history) + (0 if result.get("status") == "home_fetch_failed" else 1)
+                rank = rec["rank"]
+                site = rec["site"]
+                observe_site(result)
+                if profiler is not None:
+                    profiler.set_stage(site, "write_results")
 
                 async with write_lock:
                     if args.skip_home_fetch_failed and result.get("status") == "home_fetch_failed":
                         warn(f"Skipping {site} due to home_fetch_failed.")
                     else:
                         append_jsonl(args.out, result)
+                        if results_db is not None:
+                            results_db.add(result)
 
                     if not (args.skip_home_fetch_failed and result.get("status") == "home_fetch_failed"):
                         summary.update(result)
@@ -610,6 +743,15 @@ async def _run(args: argparse.Namespace) -> None:
 
                     if args.summary_out:
                         write_json(args.summary_out, summary.to_summary())
+                    if args.summary_state_out and summary.processed_sites % 100 == 0:
+                        write_json(args.summary_state_out, summary.to_state())
+                    if memory.tracemalloc_due(summary.processed_sites):
+                        tm = memory.tracemalloc_diff(summary.processed_sites)
+                        log("Top allocation growth:\n" + "\n".join(
+                            f"  {t['size_diff_kb'] if t['size_diff_kb'] is not None else t['size_kb']:>10} KB  {t['where']}"
+                            for t in tm["top"]
+                        ))
+                        emit_event({"type": "memory_tracemalloc", "run_id": run_id, **tm})
 
                     if args.state_file:
                         write_json(args.state_file, {
@@ -629,6 +771,12 @@ async def _run(args: argparse.Namespace) -> None:
                                 "unmapped": summary.third_party_unmapped,
                                 "no_policy_url": summary.third_party_no_policy_url,
                             },
+                            "metrics": METRICS.summary(),
+                            "memory": memory.summary(),
+                            "browser_pool": client.stats(),
+                            "open_hosts": host_scheduler.get().open_hosts(),
+                            "concurrency": controller.summary() if controller is not None else None,
+                            "pipeline": pipeline.stats() if pipeline is not None else None,
                             "updated_at": summary.updated_at,
                         })
 
@@ -650,13 +798,109 @@ async def _run(args: argparse.Namespace) -> None:
                     "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
                 })
 
+                if profiler is not None:
+                    profiler.site_finished(site, result.get("total_ms"))
+
                 if result.get("status") != "ok":
                     warn(f"FAILED {site}: {result.get('status')}")
 
-        await asyncio.gather(*[worker(r) for r in sites])
+            def on_concurrency_decision(decision: dict[str, Any]) -> None:
+                log(f"Concurrency {decision['from']} -> {decision['to']}" + (f" ({', '.join(decision['reasons'])})" if decision["reasons"] else ""))
+                emit_event({
+                    "type": "concurrency_adjusted",
+                    "run_id": run_id,
+                    **decision,
+                    "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                })
+
+            controller = (
+                AimdController(
+                    sem,
+                    floor=floor,
+                    ceiling=ceiling,
+                    interval_s=args.adaptive_interval_s,
+                    max_error_rate=args.adaptive_max_error_rate,
+                    max_loop_lag_ms=args.adaptive_max_loop_lag_ms,
+                    memory_mb=args.adaptive_memory_mb or args.memory_high_water_mb,
+                    on_decision=on_concurrency_decision,
+                )
+                if args.adaptive_concurrency
+                else None
+            )
+
+            async def run_all(coros: list[Any]) -> None:
+                # Unlike a bare gather, cancel the other sites when one raises, so the
+                # run's cleanup doesn't close the outputs under sites still running.
+                tasks = [asyncio.ensure_future(c) for c in coros]
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for t in tasks:
+                        t.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+
+            memory.sample()
+            memory_task = asyncio.create_task(memory_loop()) if args.memory_sample_s > 0 else None
+            controller_task = asyncio.create_task(controller.run()) if controller is not None else None
+            try:
+                await run_all([worker(r) for r in sites])
+                while final_pass:
+                    batch = sorted(final_pass, key=lambda x: x[3])
+                    final_pass.clear()
+                    log(f"Final pass: retrying the home fetch of {len(batch)} site(s)")
+
+                    async def retry_later(
+                        rec: dict[str, Any], attempt: int, history: list[dict[str, Any]], due: float, last: dict[str, Any]
+                    ) -> None:
+                        if run_deadline is not None:
+                            due = min(due, run_deadline)
+                        await asyncio.sleep(max(0.0, due - time.monotonic()))
+                        await worker(rec, attempt, history, last)
+
+                    await run_all([retry_later(*item) for item in batch])
+                if deadline_skipped:
+                    warn(f"Run deadline reached; skipped {len(deadline_skipped)} site(s) that had not started.")
+                    emit_event({
+                        "type": "run_deadline_reached",
+                        "run_id": run_id,
+                        "skipped_sites": len(deadline_skipped),
+                        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    })
+            finally:
+                if memory_task is not None:
+                    memory_task.cancel()
+                if controller_task is not None:
+                    controller_task.cancel()
+                if pipeline is not None:
+                    await pipeline.close()
+    finally:
+        memory.close()
+        # Flush batched rows even when the run fails or is interrupted.
+        if results_db is not None:
+            results_db.close()
+        if policy_index is not None:
+            policy_index.close()
+        if args.trace_out:
+            tracing.shutdown()  # flushes the spans of a failed run too
+        if profiler is not None:
+            # A crashed or interrupted run is the one worth profiling.
+            profiler.stop()
+            try:
+                profile_report = profiler.write(args.profile)
+                log(f"Profile ({profile_report['samples']} samples) -> {args.profile}\n{format_stage_table(profile_report)}")
+            except Exception as e:
+                warn(f"Could not write the profile to {args.profile}: {e}")
+        # Don't leave the metrics thread or the process-wide scheduler behind
+        # for a caller that runs _run in-process.
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        host_scheduler.configure(None)
 
     if args.explorer_out and not explorer_is_jsonl:
         write_json(args.explorer_out, explorer_records)
+    if args.summary_state_out:
+        write_json(args.summary_state_out, summary.to_state())
 
     emit_event({
         "type": "run_completed",
@@ -668,7 +912,15 @@ async def _run(args: argparse.Namespace) -> None:
 
 
 def main() -> None:
-    args = _parse_args()
+    argv = sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        import importlib
+        importlib.import_module(_SUBCOMMANDS[argv[0]], __package__).main(argv[1:])
+        return
+    if argv and argv[0] == "crawl":
+        argv = argv[1:]
+    args = _parse_args(argv)
+    import asyncio
     asyncio.run(_run(args))
 
 
@@ -0,0 +1,222 @@
+"""
+Adaptive site concurrency (`--adaptive-concurrency`).
+
+`AdaptiveLimiter` is the semaphore the site workers share; its limit can
+change mid-run (lowering it only stops new sites from starting, in-flight
+sites finish). `AimdController` looks at a window every `interval_s` and
+moves the limit between `floor` and `ceiling`: +1 when the window was
+healthy and the limit was actually binding, x`decrease` when any overload
+signal fired:
+
+- `errors`: browser fetch timeouts/crashes above `max_error_rate` of the
+  window's browser fetches (DNS, 4xx etc. are the site's problem, not load);
+- `latency`: median latency of successful browser fetches above
+  `latency_factor` x the baseline, an EWMA (`baseline_alpha`) of earlier
+  windows' medians. Failed fetches are left out (a window of dead domains
+  failing fast would otherwise set a baseline no normal window can meet), and
+  the baseline follows a run whose normal latency drifts;
+- `loop_lag`: event-loop lag above `max_loop_lag_ms` (CPU-bound parsing);
+- `memory`: process + browser RSS above `memory_mb`.
+
+After a decrease the next window only holds, so one slow window doesn't
+cause a saw-tooth. Every change is passed to `on_decision` with the signals
+behind it.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable
+
+from .memwatch import children_rss_bytes, process_rss_bytes
+from .metrics import METRICS, Histogram, MetricsRegistry
+
+# Fetch error classes (utils.errors.classify_error) that indicate we are pushing the browser too hard.
+OVERLOAD_ERROR_CLASSES = ("timeout", "browser_crash")
+TICK_S = 0.25
+_MB = 1024 * 1024
+
+
+class AdaptiveLimiter:
+    """An asyncio semaphore with a mutable limit (`async with limiter:`)."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self.waiting = 0
+        self.binding = False  # the limit held someone back since the last take_binding()
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        async with self._cond:
+            if self.active >= self.limit:
+                self.binding = True
+                self.waiting += 1
+                try:
+                    await self._cond.wait_for(lambda: self.active < self.limit)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            if self.active >= self.limit:
+                self.binding = True
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    async def set_limit(self, limit: int) -> None:
+        async with self._cond:
+            self.limit = max(1, int(limit))
+            self._cond.notify_all()
+        METRICS.set_gauge("concurrency_limit", self.limit)
+
+    def take_binding(self) -> bool:
+        binding = self.binding or self.waiting > 0
+        self.binding = self.active >= self.limit
+        return binding
+
+
+def _rss_mb() -> float | None:
+    rss = process_rss_bytes()
+    if rss is None:
+        return None
+    kids = children_rss_bytes()
+    return (rss + (kids[0] if kids else 0)) / _MB
+
+
+class AimdController:
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter,
+        *,
+        floor: int = 1,
+        ceiling: int = 16,
+        interval_s: float = 10.0,
+        decrease: float = 0.7,
+        max_error_rate: float = 0.2,
+        latency_factor: float = 2.0,
+        baseline_alpha: float = 0.2,
+        max_loop_lag_ms: float = 250.0,
+        memory_mb: float | None = None,
+        min_fetches: int = 5,
+        on_decision: Callable[[dict[str, Any]], None] | None = None,
+        rss_mb: Callable[[], float | None] = _rss_mb,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        self.limiter = limiter
+        self.floor = max(1, int(floor))
+        self.ceiling = max(self.floor, int(ceiling))
+        self.interval_s = interval_s
+        self.decrease = decrease
+        self.max_error_rate = max_error_rate
+        self.latency_factor = latency_factor
+        self.baseline_alpha = baseline_alpha
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.memory_mb = memory_mb
+        self.min_fetches = min_fetches
+        self.on_decision = on_decision
+        self.rss_mb = rss_mb
+        self.registry = registry
+        self.baseline_ms: float | None = None
+        self.adjustments = {"increase": 0, "decrease": 0}
+        self.min_limit = self.max_limit = limiter.limit
+        self._hold = False
+        self._prev_hist: Histogram | None = None
+        self._prev_fetches = 0.0
+        self._prev_errors = 0.0
+
+    def _window(self) -> tuple[int, float, int, float | None]:
+        """(browser fetches, overload errors, successful fetches, their median ms) since the previous window."""
+        hist = self.registry.merged_histogram("fetch_ms", tier="browser", outcome="ok")
+        fetches = self.registry.counter_total("fetches_total", tier="browser")
+        errors = sum(
+            self.registry.counter_total("fetches_total", tier="browser", error_class=c) for c in OVERLOAD_ERROR_CLASSES
+        )
+        window = hist.delta(self._prev_hist)
+        window_fetches, window_errors = fetches - self._prev_fetches, errors - self._prev_errors
+        self._prev_hist, self._prev_fetches, self._prev_errors = hist, fetches, errors
+        return int(window_fetches), window_errors, window.count, window.quantile(0.5)
+
+    async def step(self, loop_lag_ms: float = 0.0) -> dict[str, Any] | None:
+        """Evaluate one window and apply the new limit; returns the decision if the limit changed."""
+        fetches, errors, ok_fetches, median_ms = self._window()
+        rss_mb = self.rss_mb() if self.memory_mb else None
+        reasons: list[str] = []
+        if fetches >= self.min_fetches and errors / fetches > self.max_error_rate:
+            reasons.append("errors")
+        if ok_fetches >= self.min_fetches and median_ms is not None:
+            if self.baseline_ms is not None and median_ms > self.latency_factor * self.baseline_ms:
+                reasons.append("latency")
+            if self.baseline_ms is None:
+                self.baseline_ms = median_ms
+            else:
+                self.baseline_ms += self.baseline_alpha * (median_ms - self.baseline_ms)
+        if loop_lag_ms > self.max_loop_lag_ms:
+            reasons.append("loop_lag")
+        if self.memory_mb and rss_mb is not None and rss_mb > self.memory_mb:
+            reasons.append("memory")
+
+        binding = self.limiter.take_binding()
+        old = self.limiter.limit
+        new = old
+        if reasons:
+            new = max(self.floor, min(old - 1, int(old * self.decrease)))
+            self._hold = True
+        elif self._hold:
+            self._hold = False
+        elif binding:
+            new = min(self.ceiling, old + 1)
+
+        self.registry.set_gauge("event_loop_lag_ms", loop_lag_ms)
+        if new == old:
+            return None
+        await self.limiter.set_limit(new)
+        action = "increase" if new > old else "decrease"
+        self.adjustments[action] += 1
+        self.min_limit = min(self.min_limit, new)
+        self.max_limit = max(self.max_limit, new)
+        self.registry.inc("concurrency_adjustments_total", action=action)
+        decision = {
+            "action": action,
+            "from": old,
+            "to": new,
+            "reasons": reasons,
+            "active": self.limiter.active,
+            "waiting": self.limiter.waiting,
+            "fetches": fetches,
+            "overload_errors": int(errors),
+            "median_fetch_ms": round(median_ms, 1) if median_ms is not None else None,
+            "baseline_fetch_ms": round(self.baseline_ms, 1) if self.baseline_ms is not None else None,
+            "loop_lag_ms": round(loop_lag_ms, 1),
+            "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+        }
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        return decision
+
+    async def run(self) -> None:
+        """Tick every TICK_S to measure event-loop lag; step every `interval_s`. Cancel to stop."""
+        METRICS.set_gauge("concurrency_limit", self.limiter.limit)
+        self._window()  # baseline the counters
+        next_step = time.monotonic() + self.interval_s
+        max_lag_ms = 0.0
+        while True:
+            t0 = time.monotonic()
+            await asyncio.sleep(TICK_S)
+            max_lag_ms = max(max_lag_ms, (time.monotonic() - t0 - TICK_S) * 1000)
+            if time.monotonic() >= next_step:
+                await self.step(max_lag_ms)
+                max_lag_ms = 0.0
+                next_step = time.monotonic() + self.interval_s
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "limit": self.limiter.limit,
+            "active": self.limiter.active,
+            "waiting": self.limiter.waiting,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "adjustments": dict(self.adjustments),
+        }
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from .utils.io import iter_jsonl, safe_dirname, write_jsonl
+from .utils.logging import log
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Legal-form tokens stripped from entity names ("Hotjar Ltd" -> "hotjar").
+_CORP_SUFFIXES = {
+    "inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "ag", "sa", "sas", "sarl", "bv", "nv", "plc", "srl", "spa", "oy",
+    "ab", "as", "pty", "kk", "group", "holdings", "technologies", "the",
+}
+# Domain labels / first words too generic to count as a mention on their own.
+_GENERIC_TOKENS = {
+    "ad", "ads", "analytics", "api", "app", "apps", "assets", "cdn", "cloud",
+    "com", "data", "digital", "global", "img", "media", "net", "network", "online",
+    "pixel", "services", "static", "stats", "tag", "tags", "track", "tracking",
+    "web", "www", "privacy", "cookie", "cookies", "policy",
+}
+# Product names commonly used in policies instead of the legal entity name.
+COMMON_ALIASES: dict[str, tuple[str, ...]] = {
+    "google": ("google", "google analytics", "google ads", "doubleclick", "youtube", "google tag manager", "firebase"),
+    "facebook": ("facebook", "meta", "meta pixel", "facebook pixel", "instagram"),
+    "meta": ("facebook", "meta", "meta pixel", "facebook pixel", "instagram"),
+    "microsoft": ("microsoft", "bing", "linkedin", "clarity"),
+    "amazon": ("amazon", "amazon web services", "aws", "amazon advertising"),
+    "twitter": ("twitter", "x corp"),
+    "adobe": ("adobe", "adobe analytics", "omniture", "typekit"),
+    "oracle": ("oracle", "bluekai", "addthis"),
+}
+
+_MATCH_PRIORITY = {"domain": 0, "entity": 1, "label": 2, "alias": 3}
+
+
+def _tokens(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def entity_aliases(entity: str) -> list[tuple[tuple[str, ...], str]]:
+    """(token sequence, match kind) pairs under which an entity can be mentioned."""
+    toks = _tokens(entity)
+    out: list[tuple[tuple[str, ...], str]] = []
+    if toks:
+        out.append((tuple(toks), "entity"))
+    core = [t for t in toks if t not in _CORP_SUFFIXES]
+    if core and core != toks:
+        out.append((tuple(core), "entity"))
+    if core:
+        head = core[0]
+        if len(head) >= 5 and head not in _GENERIC_TOKENS:
+            out.append(((head,), "entity"))
+        for alias in COMMON_ALIASES.get(head, ()):
+            out.append((tuple(_tokens(alias)), "alias"))
+    return out
+
+
+def domain_aliases(etld1: str) -> list[tuple[tuple[str, ...], str]]:
+    out: list[tuple[tuple[str, ...], str]] = [(tuple(_tokens(etld1)), "domain")]
+    label = etld1.split(".", 1)[0]
+    label_toks = _tokens(label)
+    if len(label_toks) > 1 or (label_toks and len(label_toks[0]) >= 4 and label_toks[0] not in _GENERIC_TOKENS):
+        out.append((tuple(label_toks), "label"))
+    return out
+
+
+class MentionAutomaton:
+    """
+    Token-level trie over every alias of every third party observed in a run.
+
+    A policy is tokenized once and walked through the trie at each token
+    position, so matching cost is O(tokens x longest alias) regardless of how
+    many third parties/aliases exist (no per-alias substring scans).
+    """
+
+    def __init__(self) -> None:
+        self.root: dict[str, Any] = {}
+
+    def add(self, tokens: tuple[str, ...], key: str, kind: str) -> None:
+        if not tokens:
+            return
+        node = self.root
+        for t in tokens:
+            node = node.setdefault(t, {})
+        node.setdefault("\0", set()).add((key, kind))
+
+    def find(self, text: str) -> dict[str, str]:
+        """Return {key: best match kind} for every key mentioned in text."""
+        toks = _tokens(text)
+        found: dict[str, str] = {}
+        root = self.root
+        for i in range(len(toks)):
+            node = root.get(toks[i])
+            j = i + 1
+            while node is not None:
+                for key, kind in node.get("\0", ()):
+                    prev = found.get(key)
+                    if prev is None or _MATCH_PRIORITY[kind] < _MATCH_PRIORITY[prev]:
+                        found[key] = kind
+                if j >= len(toks):
+                    break
+                node = node.get(toks[j])
+                j += 1
+        return found
+
+
+def build_automaton(third_parties: dict[str, str | None]) -> MentionAutomaton:
+    """third_parties maps eTLD+1 -> entity (or None). Keys are 'd:<etld1>' / 'e:<entity>'."""
+    ac = MentionAutomaton()
+    seen_entities: set[str] = set()
+    for et1, entity in third_parties.items():
+        for toks, kind in domain_aliases(et1):
+            ac.add(toks, f"d:{et1}", kind)
+        if entity and entity not in seen_entities:
+            seen_entities.add(entity)
+            for toks, kind in entity_aliases(entity):
+                ac.add(toks, f"e:{entity}", kind)
+    return ac
+
+
+def site_matrix_row(result: dict[str, Any], policy_text: str | None, ac: MentionAutomaton) -> dict[str, Any]:
+    tps = [tp for tp in (result.get("third_parties") or []) if isinstance(tp, dict) and tp.get("third_party_etld1")]
+    found = ac.find(policy_text) if policy_text else {}
+    mentioned: list[int] = []
+    match: list[str | None] = []
+    for tp in tps:
+        kinds = [found.get(f"d:{tp['third_party_etld1']}")]
+        if tp.get("entity"):
+            kinds.append(found.get(f"e:{tp['entity']}"))
+        kinds = [k for k in kinds if k]
+        best = min(kinds, key=_MATCH_PRIORITY.__getitem__) if kinds else None
+        mentioned.append(1 if best else 0)
+        match.append(best)
+    return {
+        "site": result.get("site_etld1") or result.get("input"),
+        "rank": result.get("rank"),
+        "status": result.get("status"),
+        "policy": policy_text is not None,
+        "third_parties": [tp["third_party_etld1"] for tp in tps],
+        "entities": [tp.get("entity") for tp in tps],
+        "mentioned": mentioned,
+        "match": match,
+    }
+
+
+_WORKER_AC: MentionAutomaton | None = None
+
+
+def _init_worker(ac: MentionAutomaton) -> None:
+    global _WORKER_AC
+    _WORKER_AC = ac
+
+
+def _policy_text(artifacts_dir: str, result: dict[str, Any]) -> str | None:
+    site = result.get("site_etld1") or result.get("input")
+    if not site or not result.get("first_party_policy"):
+        return None
+    p = Path(artifacts_dir) / safe_dirname(str(site)) / "policy.txt"
+    try:
+        return p.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return None
+
+
+def _rows_for_batch(artifacts_dir: str, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    assert _WORKER_AC is not None
+    return [site_matrix_row(r, _policy_text(artifacts_dir, r), _WORKER_AC) for r in batch]
+
+
+def _batches(results_path: str | Path, size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for rec in iter_jsonl(results_path):
+        # Keep only what the matcher needs so batches stay small when pickled.
+        batch.append({
+            k: rec.get(k)
+            for k in ("site_etld1", "input", "rank", "status", "first_party_policy", "third_parties")
+        })
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_consistency_table(
+    results_path: str | Path,
+    artifacts_dir: str | Path,
+    *,
+    workers: int | None = None,
+    batch_size: int = 500,
+) -> Iterator[dict[str, Any]]:
+    """Yield one matrix row per site (observed third parties x mentioned in policy)."""
+    third_parties: dict[str, str | None] = {}
+    for rec in iter_jsonl(results_path):
+        for tp in rec.get("third_parties") or []:
+            if isinstance(tp, dict) and tp.get("third_party_etld1"):
+                third_parties.setdefault(tp["third_party_etld1"], tp.get("entity"))
+    ac = build_automaton(third_parties)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker(ac)
+        for batch in _batches(results_path, batch_size):
+            yield from _rows_for_batch(str(artifacts_dir), batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ac,)) as pool:
+        # Bounded window of in-flight batches keeps memory flat on 100k-site runs.
+        pending = []
+        for batch in _batches(results_path, batch_size):
+            pending.append(pool.submit(_rows_for_batch, str(artifacts_dir), batch))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for fut in pending:
+            yield from fut.result()
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset consistency",
+        description="Precompute, per site, which observed third parties the first-party policy mentions.",
+    )
+    p.add_argument("--results", type=str, required=True, help="Path to results.jsonl.")
+    p.add_argument("--artifacts-dir", type=str, required=True, help="Artifacts directory of the same run.")
+    p.add_argument("--out", type=str, required=True, help="Output JSONL (one row per site).")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes. Default: CPU count")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    totals = {"sites": 0, "pairs": 0, "mentioned": 0}
+
+    def counted() -> Iterator[dict[str, Any]]:
+        for row in build_consistency_table(args.results, args.artifacts_dir, workers=args.workers):
+            totals["sites"] += 1
+            totals["pairs"] += len(row["mentioned"])
+            totals["mentioned"] += sum(row["mentioned"])
+            yield row
+
+    write_jsonl(args.out, counted())
+    rate = (totals["mentioned"] / totals["pairs"] * 100) if totals["pairs"] else 0.0
+    log(
+        f"Consistency: {totals['sites']} sites, {totals['pairs']} site/third-party pairs, "
+        f"{totals['mentioned']} mentioned ({rate:.1f}%) -> {args.out}"
+    )
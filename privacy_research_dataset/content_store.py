@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+
+def content_sha256(text: str | None) -> str | None:
+    """Hex SHA-256 of a UTF-8 text artifact (None for missing/empty text)."""
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContentStore:
+    """
+    Content-addressed store for text/HTML artifacts.
+
+    Each distinct payload is written once under `<root>/<sha[:2]>/<sha>`. Per-site
+    artifact paths are materialized as hardlinks to the stored blob, so existing
+    readers (dashboard, scripts) keep working with the usual per-site layout while
+    identical policies (OneTrust/iubenda hosted notices, popular third-party
+    policies) only occupy disk space once.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, text: str | None) -> str | None:
+        """Store `text` and return its digest; None for missing/empty text, like `content_sha256`."""
+        if not text:
+            return None
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.blob_path(digest)
+        if target.exists():
+            return digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent shards never observe a partial blob.
+        tmp = target.with_name(f".{digest}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        return digest
+
+    @staticmethod
+    def _replace(dest: str | Path) -> Path:
+        # Unlink rather than overwrite: `dest` may be a hardlink to a shared blob.
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+        return dest
+
+    def materialize(self, digest: str, dest: str | Path) -> None:
+        dest = self._replace(dest)
+        try:
+            os.link(self.blob_path(digest), dest)
+        except OSError:
+            # No hardlink support, cross-device artifacts dir, or the per-inode link
+            # limit was reached (very popular policies): fall back to a plain copy.
+            shutil.copyfile(self.blob_path(digest), dest)
+
+    def write(self, dest: str | Path, text: str | None) -> str | None:
+        digest = self.put(text)
+        if digest is None:
+            # Keep the usual (empty) per-site file; there is no blob to link.
+            self._replace(dest).write_bytes(b"")
+        else:
+            self.materialize(digest, dest)
+        return digest
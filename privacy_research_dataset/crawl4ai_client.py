@@ -3,9 +3,15 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 import inspect
+import re
+import time
 from urllib.parse import urlparse
 from typing import Any, Optional
 
+from . import budget, host_scheduler, tracing
+from .metrics import METRICS, observe_fetch
+from .utils.errors import classify_error
+from .utils.etld import etld1
 from .text_extract import extract_main_text_with_method
 from .utils.logging import warn
 
@@ -20,6 +26,8 @@ class Crawl4AIResult:
     network_requests: list[dict[str, Any]] | None
     error_message: str | None
     text_extraction_method: str | None = None
+    # With a SettlePolicy: ms from navigation start until the page settled; None if the wait timed out.
+    settle_ms: int | None = None
 
 def _extract_network(result: Any) -> list[dict[str, Any]] | None:
     # Crawl4AI docs mention `result.network_requests` (v0.7.x).
@@ -87,6 +95,130 @@ def _proxy_to_proxy_config(proxy: str) -> dict[str, str]:
         cfg["password"] = p.password
     return cfg
 
+# Text-only renders (policy candidates, hubs, third-party policies) never need these.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+# Mapping-index categories whose hosts are aborted on text-only renders.
+_TRACKER_CATEGORY_MARKERS = ("advertis", "analytic", "audience", "ad motivated", "session replay", "action pixel")
+# Consent platforms render hosted notices client-side; their requests are the policy.
+_NEVER_BLOCK_DOMAINS = ("onetrust.com", "cookielaw.org", "cookiepro.com")
+
+
+@dataclass(frozen=True)
+class SettlePolicy:
+    """
+    Return a page once it has settled instead of right after DOMContentLoaded:
+    no DOM mutation and no finished subresource for `quiet_ms`, and no earlier
+    than `min_ms` after navigation start (`performance.now()`). `max_ms` is
+    Crawl4AI's `wait_for_timeout`, which starts when it begins polling after
+    DOMContentLoaded, so a page that never settles is returned about
+    DOMContentLoaded + `max_ms` after navigation start. Fetches that capture
+    network traffic (the home page) wait at least `capture_window_ms` so late
+    third-party tags are seen (that bound is also measured from navigation
+    start, and raises the timeout to match).
+    """
+
+    min_ms: int = 500
+    max_ms: int = 8000
+    quiet_ms: int = 500
+    capture_window_ms: int = 3000
+
+    def wait_for(self, *, capture_network: bool) -> str:
+        min_ms = max(self.min_ms, self.capture_window_ms) if capture_network else self.min_ms
+        return _SETTLE_JS % {"min_ms": int(min_ms), "quiet_ms": int(self.quiet_ms), "attr": _SETTLE_ATTR}
+
+    def timeout_ms(self, *, capture_network: bool) -> int:
+        return int(max(self.max_ms, self.capture_window_ms) if capture_network else self.max_ms)
+
+
+# Polled by Crawl4AI every 100 ms. Subresources are counted as Resource Timing
+# entries (finished loads); the settle time is handed back via an attribute.
+_SETTLE_ATTR = "data-prd-settle-ms"
+_SETTLE_JS = """js:() => {
+  const now = performance.now();
+  let s = window.__prdSettle;
+  if (!s) {
+    s = window.__prdSettle = {dom: now, net: now, res: -1};
+    try { performance.setResourceTimingBufferSize(100000); } catch (e) {}
+    try {
+      new MutationObserver(() => { s.dom = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    } catch (e) {}
+  }
+  const res = performance.getEntriesByType("resource").length;
+  if (res !== s.res) { s.res = res; s.net = now; }
+  if (document.readyState === "loading" || now < %(min_ms)d) return false;
+  if (now - s.dom < %(quiet_ms)d || now - s.net < %(quiet_ms)d) return false;
+  document.documentElement.setAttribute("%(attr)s", String(Math.round(now)));
+  return true;
+}"""
+_SETTLE_ATTR_RE = re.compile(r'\s' + _SETTLE_ATTR + r'="(\d+)"')
+
+
+def _pop_settle_ms(html: str | None) -> tuple[str | None, int | None]:
+    if not html:
+        return html, None
+    m = _SETTLE_ATTR_RE.search(html)
+    if m is None:
+        return html, None
+    return html[: m.start()] + html[m.end():], int(m.group(1))
+
+
+class ResourceBlocker:
+    """
+    Which subrequests a text-only render may abort: `resource_types`, plus
+    requests to tracker sites known to the mapping indexes (any object with
+    `lookup(etld1)` returning an entry with `categories`). Scripts and XHR
+    from the page's own site and from consent platforms are never treated as
+    tracker requests.
+    """
+
+    def __init__(self, *, resource_types: frozenset[str] = BLOCKED_RESOURCE_TYPES, indexes: tuple[Any, ...] = ()) -> None:
+        self.resource_types = resource_types
+        self.indexes = tuple(i for i in indexes if i is not None)
+        self._tracker_cache: dict[str, bool] = {}
+
+    def _is_tracker(self, site: str) -> bool:
+        hit = self._tracker_cache.get(site)
+        if hit is None:
+            hit = False
+            if not any(site == d or site.endswith("." + d) for d in _NEVER_BLOCK_DOMAINS):
+                for index in self.indexes:
+                    entry = index.lookup(site)
+                    cats = " ".join(getattr(entry, "categories", None) or []).lower()
+                    if any(m in cats for m in _TRACKER_CATEGORY_MARKERS):
+                        hit = True
+                        break
+            self._tracker_cache[site] = hit
+        return hit
+
+    def reason(self, resource_type: str, url: str, page_site: str | None) -> str | None:
+        """Block reason ("image", ..., "tracker") or None to let the request through."""
+        if resource_type in self.resource_types:
+            return resource_type
+        if not self.indexes:
+            return None
+        site = etld1(url)
+        if site and site != page_site and self._is_tracker(site):
+            return "tracker"
+        return None
+
+
+def _observe_subresources(stats: dict[str, Any], *, profile: str, ms: float) -> None:
+    """
+    Per-render cost by profile, so blocked (text-only) and full renders can be
+    compared. Bytes are the summed Content-Length of the responses received,
+    so chunked responses are undercounted.
+    """
+    METRICS.observe("browser_render_ms", ms, profile=profile)
+    METRICS.observe("browser_subresource_bytes", stats["bytes"], profile=profile)
+    for why, n in stats["blocked"].items():
+        METRICS.inc("browser_blocked_requests_total", n, reason=why)
+    tracing.annotate(
+        blocked_requests=sum(stats["blocked"].values()) if stats["block"] else None,
+        subresource_bytes=stats["bytes"],
+    )
+
+
 class Crawl4AIClient:
     """
     Thin wrapper around Crawl4AI AsyncWebCrawler.
@@ -104,6 +236,8 @@ class Crawl4AIClient:
         locale: str | None = None,
         timezone_id: str | None = None,
         page_timeout_ms: int = 15000,
+        resource_blocker: ResourceBlocker | None = None,
+        settle: SettlePolicy | None = None,
     ) -> None:
         self.browser_type = browser_type
         self.headless = headless
@@ -113,6 +247,8 @@ class Crawl4AIClient:
         self.locale = locale
         self.timezone_id = timezone_id
         self.page_timeout_ms = page_timeout_ms
+        self.resource_blocker = resource_blocker
+        self.settle = settle
         self._crawler = None
 
     async def __aenter__(self) -> "Crawl4AIClient":
@@ -139,14 +275,59 @@ class Crawl4AIClient:
 
         bc_kwargs = _filter_kwargs(BrowserConfig, bc_kwargs)
         self._crawler = AsyncWebCrawler(config=BrowserConfig(**bc_kwargs))
+        if self.resource_blocker is not None:
+            try:
+                self._crawler.crawler_strategy.set_hook("on_page_context_created", self._on_page_context_created)
+            except Exception as e:
+                warn(f"Resource blocking unavailable in this Crawl4AI version: {e}")
+                self.resource_blocker = None
         await self._crawler.start()
         return self
 
+    async def _on_page_context_created(self, page: Any, context: Any = None, config: Any = None, **kwargs: Any) -> Any:
+        shared = getattr(config, "shared_data", None)
+        stats = shared.get("resource_blocking") if isinstance(shared, dict) else None
+        blocker = self.resource_blocker
+        if stats is None or blocker is None:
+            return page
+        page_site = etld1(stats["url"])
+
+        def on_response(resp: Any) -> None:
+            try:
+                stats["bytes"] += int(resp.headers.get("content-length") or 0)
+            except Exception:
+                pass
+
+        page.on("response", on_response)
+        if not stats["block"]:
+            return page
+
+        async def handle(route: Any) -> None:
+            req = route.request
+            try:
+                why = None if req.is_navigation_request() else blocker.reason(req.resource_type, req.url, page_site)
+                if why:
+                    stats["blocked"][why] = stats["blocked"].get(why, 0) + 1
+                    await route.abort("blockedbyclient")
+                else:
+                    await route.continue_()
+            except Exception:
+                # Page closed or route already handled.
+                pass
+
+        await page.route("**/*", handle)
+        return page
+
     async def __aexit__(self, exc_type, exc, tb) -> None:
         if self._crawler:
             await self._crawler.close()
         self._crawler = None
 
+    async def restart(self) -> None:
+        """Close and relaunch the browser (frees memory held by long-lived browser processes)."""
+        await self.__aexit__(None, None, None)
+        await self.__aenter__()
+
     async def fetch(
         self,
         url: str,
@@ -157,6 +338,50 @@ class Crawl4AIClient:
         scan_full_page: bool = False,
         wait_for: str | None = None,
         wait_for_timeout_ms: int | None = None,
+        block_resources: bool | None = None,
+    ) -> Crawl4AIResult:
+        """
+        `block_resources` (default: `not capture_network`) applies the
+        `resource_blocker` profile, if the client has one.
+        """
+        if block_resources is None:
+            block_resources = not capture_network
+        with tracing.span("fetch", tier="browser", url=url, capture_network=capture_network or None) as span:
+            try:
+                async with host_scheduler.slot(url) as permit:
+                    res = await self._fetch(
+                        url,
+                        capture_network=capture_network,
+                        remove_overlays=remove_overlays,
+                        magic=magic,
+                        scan_full_page=scan_full_page,
+                        wait_for=wait_for,
+                        wait_for_timeout_ms=wait_for_timeout_ms,
+                        block_resources=block_resources and self.resource_blocker is not None,
+                    )
+                    permit.record(None if res.success else res.error_message, res.status_code)
+                budget.charge(len(res.raw_html or ""))
+            except host_scheduler.HostCircuitOpen as e:
+                res = Crawl4AIResult(url=url, success=False, status_code=None, raw_html=None, cleaned_html=None, text=None, network_requests=None, error_message=str(e))
+            span.set(
+                status_code=res.status_code,
+                success=res.success,
+                error_class=(None if res.success else classify_error(res.error_message)),
+                final_url=(res.url if res.url != url else None),
+            )
+            return res
+
+    async def _fetch(
+        self,
+        url: str,
+        *,
+        capture_network: bool,
+        remove_overlays: bool,
+        magic: bool,
+        scan_full_page: bool,
+        wait_for: str | None,
+        wait_for_timeout_ms: int | None,
+        block_resources: bool,
     ) -> Crawl4AIResult:
         if not self._crawler:
             raise RuntimeError("Crawl4AIClient must be used as an async context manager.")
@@ -191,19 +416,29 @@ class Crawl4AIClient:
         if capture_network:
             cfg_kwargs["capture_network_requests"] = True
 
-        # Waiting controls
+        # Waiting controls. page_timeout bounds navigation; wait_for_timeout bounds the wait after it.
+        settle = self.settle if not wait_for else None
+        if settle is not None:
+            wait_for = settle.wait_for(capture_network=capture_network)
+            wait_for_timeout_ms = settle.timeout_ms(capture_network=capture_network)
         if wait_for:
             cfg_kwargs["wait_for"] = wait_for
         if wait_for_timeout_ms is not None:
             cfg_kwargs["wait_for_timeout"] = wait_for_timeout_ms
-        else:
-            cfg_kwargs["page_timeout"] = self.page_timeout_ms
+        cfg_kwargs["page_timeout"] = self.page_timeout_ms
+
+        # The page hook reads this per fetch (hooks are per crawler, fetches run concurrently).
+        subresources: dict[str, Any] = {"url": url, "block": block_resources, "blocked": {}, "bytes": 0}
+        if self.resource_blocker is not None:
+            cfg_kwargs["shared_data"] = {"resource_blocking": subresources}
 
         run_cfg = CrawlerRunConfig(**_filter_kwargs(CrawlerRunConfig, cfg_kwargs))
 
+        t0 = time.perf_counter()
         try:
             res = await self._crawler.arun(url=url, config=run_cfg)
         except Exception as e:
+            observe_fetch("browser", ms=(time.perf_counter() - t0) * 1000, success=False, error_message=str(e))
             return Crawl4AIResult(
                 url=url,
                 success=False,
@@ -221,6 +456,33 @@ class Crawl4AIClient:
         raw_html = getattr(res, "html", None)
         cleaned_html = getattr(res, "cleaned_html", None)
         error_message = getattr(res, "error_message", None)
+        settle_ms = None
+        if settle is not None:
+            raw_html, settle_ms = _pop_settle_ms(raw_html)
+            cleaned_html, _ = _pop_settle_ms(cleaned_html)
+        if settle is not None and success:
+            METRICS.observe(
+                "settle_ms",
+                settle_ms if settle_ms is not None else wait_for_timeout_ms,
+                kind=("capture" if capture_network else "text"),
+                outcome=("settled" if settle_ms is not None else "max"),
+            )
+            tracing.annotate(settle_ms=settle_ms, settle_max=(settle_ms is None) or None)
+        body_bytes = len(raw_html.encode("utf-8", errors="ignore")) if isinstance(raw_html, str) else 0
+        observe_fetch(
+            "browser",
+            ms=(time.perf_counter() - t0) * 1000,
+            success=success,
+            error_message=error_message,
+            body_bytes=body_bytes,
+        )
+        tracing.annotate(bytes=body_bytes)
+        if self.resource_blocker is not None:
+            _observe_subresources(
+                subresources,
+                profile=("blocked" if block_resources else "full"),
+                ms=(time.perf_counter() - t0) * 1000,
+            )
         network_requests = None
         if capture_network:
             nr = _extract_network(res) or []
@@ -232,7 +494,9 @@ class Crawl4AIClient:
             ]
 
         # Text extraction (job 2): Trafilatura-first from cleaned/raw HTML.
-        text, extraction_method = extract_main_text_with_method(cleaned_html or raw_html, source_url=url)
+        with tracing.span("extract_text", html_chars=len(cleaned_html or raw_html or "")) as span:
+            text, extraction_method = extract_main_text_with_method(cleaned_html or raw_html, source_url=url)
+            span.set(method=extraction_method, text_chars=len(text or ""))
         if not text or not text.strip():
             # Fallback to Crawl4AI markdown fields if extraction yields nothing.
             text = _extract_text(res)
@@ -253,4 +517,5 @@ class Crawl4AIClient:
             text_extraction_method=extraction_method,
             network_requests=network_requests,
             error_message=error_message,
+            settle_ms=settle_ms,
         )
@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import json
 import re
-from dataclasses import asdict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 import time
 from pathlib import Path
@@ -13,7 +13,10 @@ from urllib.parse import urlparse, urlunparse
 import aiohttp
 from bs4 import BeautifulSoup
 
+from .content_store import ContentStore, content_sha256
 from .crawl4ai_client import Crawl4AIClient, Crawl4AIResult
+from . import budget, host_scheduler, tracing
+from .metrics import METRICS, observe_fetch
 from .policy_finder import (
     extract_link_candidates,
     extract_legal_hub_urls,
@@ -25,10 +28,13 @@ from .third_party import third_parties_from_network_logs
 from .tracker_radar import TrackerRadarIndex, TrackerRadarEntry
 from .trackerdb import TrackerDbIndex, TrackerDbEntry
 from .openwpm_engine import run_openwpm_for_third_parties
+from .utils.errors import classify_error
 from .utils.etld import etld1
+from .utils.io import safe_dirname as _safe_dirname
 from .utils.logging import log, warn
 
 _HTML_MARKER = re.compile(r"(?is)<\s*!doctype\s+html|<\s*html\b|<\s*head\b|<\s*body\b")
+_ANCHOR_RE = re.compile(r"(?is)<\s*a\b[^>]*\bhref\s*=")
 _NON_BROWSABLE_PATTERNS = [
     re.compile(pat, re.I)
     for pat in (
@@ -146,13 +152,18 @@ def _should_scan_full_page_policy(url: str | None) -> bool:
         return False
     return any(host == d or host.endswith(f".{d}") for d in _POLICY_SCAN_FULL_PAGE_DOMAINS)
 
-def _safe_dirname(s: str) -> str:
-    return "".join(ch if ch.isalnum() or ch in ("-", "_", ".") else "_" for ch in s)[:200]
-
 def _write_text(p: Path, text: str | None) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_text(text or "", encoding="utf-8")
 
+def _write_artifact(p: Path, text: str | None, store: ContentStore | None) -> None:
+    # Large per-site artifacts go through the content store when enabled so that
+    # identical policies/HTML are kept once on disk.
+    if store is None:
+        _write_text(p, text)
+    else:
+        store.write(p, text)
+
 def _write_json(p: Path, obj: Any) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -327,53 +338,215 @@ def _combine_errors(*msgs: str | None) -> str | None:
     return " | ".join(parts)
 
 
-async def _fetch_home_with_retry(
-    client: Crawl4AIClient,
-    site_url: str,
+# Home-fetch failures worth another attempt (classes from utils.errors.classify_error).
+# DNS, TLS, 4xx (except 429) and non-HTML responses won't change within a run.
+# circuit_open isn't retried either: the host breaker's cooldown (a minute or
+# more) outlasts the backoff, so every retry would fail fast again.
+RETRYABLE_HOME_ERRORS = frozenset({
+    "timeout", "http_5xx", "connection_reset", "connection_refused",
+    "browser_crash", "navigation", "empty_body", "other",
+})
+
+
+def home_error_class(error_message: str | None) -> str:
+    """
+    Error class of one home-fetch attempt. Its message joins the browser error
+    and the HTTP fallback's error (`_combine_errors`); the first part that
+    classifies wins, so the browser's "net::ERR_CONNECTION_REFUSED" isn't
+    overridden by whatever aiohttp said about the same host.
+    """
+    parts = (error_message or "").split(" | ")
+    for part in parts:
+        error_class = classify_error(part)
+        if error_class not in ("none", "other"):
+            return error_class
+    return classify_error(error_message)
+
+
+def home_retry_delay_s(
+    error_message: str | None,
+    attempt: int,
     *,
-    capture_network: bool,
     max_attempts: int = 3,
-    retry_delay_s: float = 0.8,
-) -> tuple[Crawl4AIResult | None, str, int, list[str]]:
-    errors: list[str] = []
-    total_ms = 0
-    home_fetch_mode = "crawl4ai"
-    for attempt in range(1, max_attempts + 1):
-        t_home = time.perf_counter()
+    base_delay_s: float = 0.8,
+) -> float | None:
+    """Backoff before home-fetch attempt `attempt + 1`; None if the failure isn't worth retrying."""
+    if attempt >= max_attempts:
+        return None
+    error_class = home_error_class(error_message)
+    if error_class not in RETRYABLE_HOME_ERRORS and not (
+        error_class == "http_4xx" and "http_status_429" in (error_message or "")
+    ):
+        return None
+    return base_delay_s * 2 ** (attempt - 1)
+
+
+def _normalize_home(home: Crawl4AIResult) -> Crawl4AIResult:
+    if home.success and not home.cleaned_html and home.raw_html:
+        home.cleaned_html = home.raw_html
+    if home.success and not home.text and home.cleaned_html:
+        home.text = _html_to_text(home.cleaned_html)
+    return home
+
+
+async def _browser_home_fetch(client: Crawl4AIClient, site_url: str, *, capture_network: bool) -> Crawl4AIResult:
+    try:
         home = await client.fetch(
             site_url,
             capture_network=capture_network,
             remove_overlays=True,
             magic=False,
             scan_full_page=False,
+            block_resources=False,
         )
-        total_ms += int((time.perf_counter() - t_home) * 1000)
+    except Exception as e:
+        home = Crawl4AIResult(
+            url=site_url, success=False, status_code=None, raw_html=None, cleaned_html=None,
+            text=None, network_requests=None, error_message=str(e) or type(e).__name__,
+        )
+    return _normalize_home(home)
+
+
+def _discard_task(task: asyncio.Task[Any]) -> None:
+    task.cancel()
+    # Don't leave "exception was never retrieved" warnings behind.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
 
-        if home.success and not home.cleaned_html and home.raw_html:
-            home.cleaned_html = home.raw_html
-        if home.success and not home.text and home.cleaned_html:
-            home.text = _html_to_text(home.cleaned_html)
 
-        if home.success and home.cleaned_html:
-            return home, home_fetch_mode, total_ms, errors
+async def _race_home_fetch(
+    client: Crawl4AIClient,
+    site_url: str,
+    *,
+    capture_network: bool,
+    hedge_delay_ms: int,
+) -> tuple[Crawl4AIResult | None, str | None, asyncio.Task[Crawl4AIResult] | None, str | None]:
+    """
+    Start the browser render and, after `hedge_delay_ms` (or as soon as the
+    browser fails), a plain HTTP fetch. The first usable page wins; an HTTP
+    page without links (typically a client-rendered app shell) only counts if
+    the browser fails, since discovery has nothing to work with in it. If HTTP
+    wins while the browser is capturing network requests, the browser task is
+    returned still running so the capture can complete.
+    Returns (home, winner, pending_browser_task, error).
+    """
+    browser = asyncio.create_task(_browser_home_fetch(client, site_url, capture_network=capture_network))
+    http: asyncio.Task[Crawl4AIResult] | None = None
 
-        t_home_fb = time.perf_counter()
-        fallback = await _simple_http_fetch(
+    def start_http() -> asyncio.Task[Crawl4AIResult]:
+        return asyncio.create_task(_simple_http_fetch(
             site_url,
             user_agent=client.user_agent,
             timeout_ms=client.page_timeout_ms,
             allow_http_fallback=True,
-        )
-        total_ms += int((time.perf_counter() - t_home_fb) * 1000)
-        if fallback.success and fallback.cleaned_html:
-            return fallback, "simple_http", total_ms, errors
+            proxy=client.proxy,
+        ))
+
+    browser_res: Crawl4AIResult | None = None
+    http_res: Crawl4AIResult | None = None
+    try:
+        if hedge_delay_ms > 0:
+            await asyncio.wait({browser}, timeout=hedge_delay_ms / 1000)
+        pending: set[asyncio.Task[Crawl4AIResult]] = {browser}
+        if not browser.done():
+            http = start_http()
+            pending.add(http)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if browser in done:
+                browser_res = browser.result()
+                if browser_res.success and browser_res.cleaned_html:
+                    if http is not None and not http.done():
+                        _discard_task(http)
+                    return browser_res, "browser", None, None
+                if http is None:
+                    http = start_http()
+                    pending.add(http)
+            if http is not None and http in done:
+                http_res = http.result()
+                if http_res.success and http_res.cleaned_html:
+                    if browser.done():
+                        return http_res, "http", None, None
+                    if not _ANCHOR_RE.search(http_res.cleaned_html):
+                        continue  # keep waiting for the rendered DOM; this is the fallback
+                    if capture_network:
+                        return http_res, "http", browser, None
+                    _discard_task(browser)
+                    return http_res, "http", None, None
+    except BaseException:
+        for t in (browser, http):
+            if t is not None and not t.done():
+                _discard_task(t)
+        raise
+    if http_res is not None and http_res.success and http_res.cleaned_html:
+        return http_res, "http", None, None  # link-less, but the browser failed
+    err = _combine_errors(
+        browser_res.error_message if browser_res else None,
+        http_res.error_message if http_res else None,
+    )
+    return None, None, None, err or "home_fetch_failed"
+
+
+async def _fetch_home_with_retry(
+    client: Crawl4AIClient,
+    site_url: str,
+    *,
+    capture_network: bool,
+    max_attempts: int = 3,
+    retry_delay_s: float = 0.8,
+    hedge_delay_ms: int | None = None,
+) -> tuple[Crawl4AIResult | None, str, int, list[str], str | None, asyncio.Task[Crawl4AIResult] | None]:
+    """
+    Returns (home, mode, total_ms, errors, winner, pending_capture). `winner`
+    and `pending_capture` are only set in hedged mode (`hedge_delay_ms` not None).
+    """
+    errors: list[str] = []
+    total_ms = 0
+    home_fetch_mode = "crawl4ai"
+    for attempt in range(1, max_attempts + 1):
+        if budget.exhausted():
+            break
+        with tracing.span("home_fetch_attempt", attempt=attempt, url=site_url) as span:
+            t_home = time.perf_counter()
+            if hedge_delay_ms is not None:
+                home, winner, capture, err = await _race_home_fetch(
+                    client,
+                    site_url,
+                    capture_network=capture_network,
+                    hedge_delay_ms=hedge_delay_ms,
+                )
+                total_ms += int((time.perf_counter() - t_home) * 1000)
+                if home is not None:
+                    span.set(winner=winner)
+                    METRICS.inc("home_fetch_winner_total", winner=winner)
+                    mode = "crawl4ai" if winner == "browser" else "simple_http"
+                    return home, mode, total_ms, errors, winner, capture
+                errors.append(err or "home_fetch_failed")
+            else:
+                home = await _browser_home_fetch(client, site_url, capture_network=capture_network)
+                total_ms += int((time.perf_counter() - t_home) * 1000)
+                if home.success and home.cleaned_html:
+                    return home, home_fetch_mode, total_ms, errors, None, None
+
+                t_home_fb = time.perf_counter()
+                fallback = await _simple_http_fetch(
+                    site_url,
+                    user_agent=client.user_agent,
+                    timeout_ms=client.page_timeout_ms,
+                    allow_http_fallback=True,
+                    proxy=client.proxy,
+                )
+                total_ms += int((time.perf_counter() - t_home_fb) * 1000)
+                if fallback.success and fallback.cleaned_html:
+                    return fallback, "simple_http", total_ms, errors, None, None
 
-        errors.append(_combine_errors(home.error_message, fallback.error_message) or "home_fetch_failed")
+                errors.append(_combine_errors(home.error_message, fallback.error_message) or "home_fetch_failed")
 
-        if attempt < max_attempts:
-            await asyncio.sleep(retry_delay_s * attempt)
+        delay_s = home_retry_delay_s(errors[-1], attempt, max_attempts=max_attempts, base_delay_s=retry_delay_s)
+        if delay_s is None:
+            break
+        await asyncio.sleep(delay_s)
 
-    return None, home_fetch_mode, total_ms, errors
+    return None, home_fetch_mode, total_ms, errors, None, None
 
 def _classify_non_browsable(home: Crawl4AIResult) -> tuple[bool, str | None]:
     # Treat explicit HTTP errors as non-browsable when we did get a page.
@@ -413,6 +586,7 @@ async def _simple_http_fetch(
     timeout_ms: int,
     max_bytes: int = 2_000_000,
     allow_http_fallback: bool = True,
+    proxy: str | None = None,
 ) -> Crawl4AIResult:
     headers = {"User-Agent": user_agent} if user_agent else {}
     parsed = urlparse(url)
@@ -420,55 +594,64 @@ async def _simple_http_fetch(
     if allow_http_fallback and parsed.scheme == "https":
         urls_to_try.append(urlunparse(parsed._replace(scheme="http")))
 
-    timeout = aiohttp.ClientTimeout(total=timeout_ms / 1000)
-    async with aiohttp.ClientSession(headers=headers) as session:
-        last_error: str | None = None
-        for u in urls_to_try:
-            try:
-                async with session.get(u, timeout=timeout, allow_redirects=True) as resp:
-                    if resp.status >= 400:
-                        last_error = f"http_status_{resp.status}"
-                        continue
-                    ctype = (resp.headers.get("content-type") or "").lower()
-                    raw = await resp.content.read(max_bytes)
-                    if not raw:
-                        last_error = "empty_body"
-                        continue
-                    text = raw.decode("utf-8", errors="ignore")
-                    if ("text/html" not in ctype) and ("application/xhtml" not in ctype):
+    with tracing.span("fetch", tier="http", url=url) as span:
+        timeout = aiohttp.ClientTimeout(total=timeout_ms / 1000)
+        t0 = time.perf_counter()
+        async with aiohttp.ClientSession(headers=headers) as session:
+            last_error: str | None = None
+            for u in urls_to_try:
+                try:
+                    async with host_scheduler.slot(u) as permit, session.get(u, timeout=timeout, allow_redirects=True, proxy=proxy) as resp:
+                        permit.record(status_code=resp.status)
+                        if resp.status >= 400:
+                            budget.charge()
+                            last_error = f"http_status_{resp.status}"
+                            continue
+                        ctype = (resp.headers.get("content-type") or "").lower()
+                        raw = await resp.content.read(max_bytes)
+                        budget.charge(len(raw))
+                        if not raw:
+                            last_error = "empty_body"
+                            continue
+                        text = raw.decode("utf-8", errors="ignore")
+                        if ("text/html" not in ctype) and ("application/xhtml" not in ctype):
+                            if not _HTML_MARKER.search(text):
+                                last_error = f"non_html_content_type:{ctype}"
+                                continue
                         if not _HTML_MARKER.search(text):
-                            last_error = f"non_html_content_type:{ctype}"
+                            last_error = "html_marker_missing"
                             continue
-                    if not _HTML_MARKER.search(text):
-                        last_error = "html_marker_missing"
-                        continue
-
-                    cleaned = text
-                    extracted_text = _html_to_text(cleaned)
-                    return Crawl4AIResult(
-                        url=str(resp.url),
-                        success=True,
-                        status_code=resp.status,
-                        raw_html=text,
-                        cleaned_html=cleaned,
-                        text=extracted_text,
-                        network_requests=[],
-                        error_message=None,
-                    )
-            except Exception as e:
-                last_error = str(e)
-                continue
 
-    return Crawl4AIResult(
-        url=url,
-        success=False,
-        status_code=None,
-        raw_html=None,
-        cleaned_html=None,
-        text=None,
-        network_requests=None,
-        error_message=last_error or "simple_http_fetch_failed",
-    )
+                        cleaned = text
+                        extracted_text = _html_to_text(cleaned)
+                        observe_fetch("http", ms=(time.perf_counter() - t0) * 1000, success=True, body_bytes=len(raw))
+                        span.set(status_code=resp.status, success=True, bytes=len(raw), final_url=(str(resp.url) if str(resp.url) != url else None))
+                        return Crawl4AIResult(
+                            url=str(resp.url),
+                            success=True,
+                            status_code=resp.status,
+                            raw_html=text,
+                            cleaned_html=cleaned,
+                            text=extracted_text,
+                            network_requests=[],
+                            error_message=None,
+                        )
+                except Exception as e:
+                    last_error = str(e)
+                    continue
+
+        observe_fetch("http", ms=(time.perf_counter() - t0) * 1000, success=False, error_message=last_error)
+        span.set(success=False, error_class=classify_error(last_error))
+        return Crawl4AIResult(
+            url=url,
+            success=False,
+            status_code=None,
+            raw_html=None,
+            cleaned_html=None,
+            text=None,
+            network_requests=None,
+            error_message=last_error or "simple_http_fetch_failed",
+        )
 
 async def _fetch_best_policy(
     client: Crawl4AIClient,
@@ -480,20 +663,24 @@ async def _fetch_best_policy(
 ) -> dict[str, Any]:
     site_et = etld1(site_url) or ""
 
-    candidates = extract_link_candidates(home_cleaned_html, site_url, site_et)
+    with tracing.span("extract_links", html_chars=len(home_cleaned_html or "")) as span:
+        candidates = extract_link_candidates(home_cleaned_html, site_url, site_et)
+        span.set(candidates=len(candidates))
     tried: list[dict[str, Any]] = []
     chosen: dict[str, Any] | None = None
     best_fallback: dict[str, Any] | None = None
     best_key: tuple[float, int] | None = None
 
     async def try_candidate(c: LinkCandidate) -> dict[str, Any]:
-        res = await client.fetch(
-            c.url,
-            capture_network=False,
-            remove_overlays=True,
-            magic=False,
-            scan_full_page=_should_scan_full_page_policy(c.url),
-        )
+        with tracing.span("policy_candidate", url=c.url, source=c.source, score=c.score) as span:
+            res = await client.fetch(
+                c.url,
+                capture_network=False,
+                remove_overlays=True,
+                magic=False,
+                scan_full_page=_should_scan_full_page_policy(c.url),
+            )
+            span.set(success=res.success, status_code=res.status_code)
         rec = dict(
             url=c.url,
             anchor_text=c.anchor_text,
@@ -537,6 +724,8 @@ async def _fetch_best_policy(
 
     # 1) Try top candidates directly
     for c in candidates[:max_candidates]:
+        if budget.exhausted():
+            break
         rec = await try_candidate(c)
         tried.append({k: rec[k] for k in rec.keys() if k not in ("text", "cleaned_html", "raw_html")})
         consider_best(rec)
@@ -547,6 +736,8 @@ async def _fetch_best_policy(
     # 2) Fallback common paths
     if chosen is None:
         for c in fallback_privacy_urls(site_url, site_et):
+            if budget.exhausted():
+                break
             rec = await try_candidate(c)
             tried.append({k: rec[k] for k in rec.keys() if k not in ("text", "cleaned_html", "raw_html")})
             consider_best(rec)
@@ -558,17 +749,22 @@ async def _fetch_best_policy(
     if chosen is None and candidates:
         hub_urls = extract_legal_hub_urls(candidates, limit=max_hub_pages)
         for hub in hub_urls:
-            hub_res = await client.fetch(
-                hub,
-                capture_network=False,
-                remove_overlays=True,
-                magic=False,
-                scan_full_page=_should_scan_full_page_policy(hub),
-            )
+            if budget.exhausted():
+                break
+            with tracing.span("policy_hub", url=hub):
+                hub_res = await client.fetch(
+                    hub,
+                    capture_network=False,
+                    remove_overlays=True,
+                    magic=False,
+                    scan_full_page=_should_scan_full_page_policy(hub),
+                )
             if not hub_res.success or not hub_res.cleaned_html:
                 continue
             hub_cands = extract_link_candidates(hub_res.cleaned_html, hub_res.url, site_et)
             for c in hub_cands[:max_candidates]:
+                if budget.exhausted():
+                    break
                 # mark as hub source
                 c2 = LinkCandidate(
                     url=c.url, anchor_text=c.anchor_text, score=c.score + 0.2, source="hub",
@@ -604,87 +800,165 @@ async def _fetch_best_policy(
         "chosen": (None if chosen is None else {k: chosen[k] for k in chosen.keys() if k in (
             "url","anchor_text","score","source","candidate_etld1","is_same_site","status_code","likeliness_score","text_len","text_extraction_method"
         )}) ,
+        "budget_exhausted": budget.stop_reason(),
         "_chosen_full": chosen,  # internal (includes text/html)
     }
 
-async def process_site(
-    client: Crawl4AIClient,
+
+@dataclass
+class SiteConfig:
+    """Run-wide settings for the site stages (the keyword arguments of `process_site`)."""
+
+    client: Crawl4AIClient
+    artifacts_dir: str | Path
+    tracker_radar: TrackerRadarIndex | None = None
+    trackerdb: TrackerDbIndex | None = None
+    fetch_third_party_policies: bool = True
+    third_party_policy_max: int = 30
+    third_party_engine: str = "crawl4ai"  # crawl4ai|openwpm
+    run_id: str | None = None
+    exclude_same_entity: bool = False
+    third_party_policy_fetcher: Callable[[str], Awaitable[Crawl4AIResult]] | None = None
+    content_store: ContentStore | None = None
+    policy_text_callback: Callable[[dict[str, Any]], None] | None = None
+    home_hedge_delay_ms: int | None = None
+    home_max_attempts: int = 3
+
+
+@dataclass
+class SiteContext:
+    """
+    One site's state as it moves through `SITE_STAGES`. A stage that ends the
+    site early (e.g. a failed home fetch) sets `result`; otherwise
+    `finish_site()` builds the record once the last stage has run.
+    """
+
+    domain_or_url: str
+    rank: int | None
+    site_url: str = ""
+    site_art_dir: Path | None = None
+    stage_callback: Callable[[str], None] | None = None
+    started_at: str = ""
+    t_total: float = 0.0
+    home: Crawl4AIResult | None = None
+    home_fetch_mode: str | None = None
+    home_fetch_ms: int | None = None
+    home_errors: list[str] = field(default_factory=list)
+    home_fetch_winner: str | None = None
+    home_capture: asyncio.Task[Crawl4AIResult] | None = None
+    home_settle_ms: int | None = None
+    policy_fetch_ms: int | None = None
+    first_party_policy: dict[str, Any] | None = None
+    third_party_records: list[dict[str, Any]] = field(default_factory=list)
+    third_party_policy_fetches: list[dict[str, Any]] = field(default_factory=list)
+    third_party_extract_ms: int | None = None
+    third_party_policy_fetch_ms: int | None = None
+    budget: budget.SiteBudget | None = None
+    trace_parent: tracing.Span | None = None  # the site's span, re-entered by pipeline workers
+    result: dict[str, Any] | None = None
+
+    @property
+    def home_fetch_history(self) -> list[dict[str, Any]]:
+        return [
+            {"attempt": i, "error_class": home_error_class(e), "error_message": e}
+            for i, e in enumerate(self.home_errors, start=1)
+        ]
+
+    def stage(self, name: str) -> None:
+        if self.stage_callback:
+            self.stage_callback(name)
+
+
+def new_site_context(
     domain_or_url: str,
     *,
     rank: int | None,
     artifacts_dir: str | Path,
-    tracker_radar: TrackerRadarIndex | None = None,
-    trackerdb: TrackerDbIndex | None = None,
-    fetch_third_party_policies: bool = True,
-    third_party_policy_max: int = 30,
-    third_party_engine: str = "crawl4ai",  # crawl4ai|openwpm
-    run_id: str | None = None,
     stage_callback: Callable[[str], None] | None = None,
-    exclude_same_entity: bool = False,
-    third_party_policy_fetcher: Callable[[str], Awaitable[Crawl4AIResult]] | None = None,
-) -> dict[str, Any]:
-    """
-    Process a single website:
-    - Fetch homepage
-    - Find and fetch best privacy policy
-    - Extract third-party domains from network logs (Crawl4AI) or OpenWPM (optional)
-    - Map third parties via Tracker Radar / Ghostery TrackerDB (+ optionally fetch their policy texts)
-    """
-    started_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    t_total = time.perf_counter()
-
+    site_budget: budget.SiteBudget | None = None,
+) -> SiteContext:
+    ctx = SiteContext(
+        domain_or_url=domain_or_url,
+        rank=rank,
+        stage_callback=stage_callback,
+        budget=site_budget,
+        trace_parent=tracing.current(),
+        started_at=datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        t_total=time.perf_counter(),
+    )
     site_url = domain_or_url.strip()
     if not site_url:
-        return {"input": domain_or_url, "error": "empty_input"}
+        ctx.result = {"input": domain_or_url, "error": "empty_input"}
+        return ctx
     if "://" not in site_url:
         site_url = "https://" + site_url
-
-    site_art_dir = Path(artifacts_dir) / _safe_dirname(etld1(site_url) or domain_or_url)
-    site_art_dir.mkdir(parents=True, exist_ok=True)
-
-    # 1) Homepage fetch
-    if stage_callback:
-        stage_callback("home_fetch")
-    capture_net = (third_party_engine == "crawl4ai")
-    home, home_fetch_mode, home_fetch_ms, home_errors = await _fetch_home_with_retry(
-        client,
-        site_url,
+    ctx.site_url = site_url
+    ctx.site_art_dir = Path(artifacts_dir) / _safe_dirname(etld1(site_url) or domain_or_url)
+    ctx.site_art_dir.mkdir(parents=True, exist_ok=True)
+    return ctx
+
+
+async def home_stage(ctx: SiteContext, cfg: SiteConfig) -> None:
+    """1) Homepage fetch. Ends the site with `home_fetch_failed` if every attempt fails."""
+    ctx.stage("home_fetch")
+    capture_net = (cfg.third_party_engine == "crawl4ai")
+    (
+        ctx.home,
+        ctx.home_fetch_mode,
+        ctx.home_fetch_ms,
+        ctx.home_errors,
+        ctx.home_fetch_winner,
+        ctx.home_capture,
+    ) = await _fetch_home_with_retry(
+        cfg.client,
+        ctx.site_url,
         capture_network=capture_net,
+        max_attempts=cfg.home_max_attempts,
+        hedge_delay_ms=cfg.home_hedge_delay_ms,
     )
-
-    if not home:
-        return {
-            "rank": rank,
-            "input": domain_or_url,
-            "site_url": site_url,
-            "final_url": site_url,
-            "site_etld1": etld1(site_url),
+    home = ctx.home
+
+    if not home and ctx.home_errors:
+        ctx.result = {
+            "rank": ctx.rank,
+            "input": ctx.domain_or_url,
+            "site_url": ctx.site_url,
+            "final_url": ctx.site_url,
+            "site_etld1": etld1(ctx.site_url),
             "status": "home_fetch_failed",
             "status_code": None,
-            "error_message": _combine_errors(*home_errors),
-            "home_fetch_mode": home_fetch_mode,
+            "error_message": _combine_errors(*ctx.home_errors),
+            "home_fetch_mode": ctx.home_fetch_mode,
             "error_code": "home_fetch_failed",
-            "home_fetch_ms": home_fetch_ms,
-            "home_fetch_attempts": len(home_errors),
-            "total_ms": int((time.perf_counter() - t_total) * 1000),
-            "run_id": run_id,
-            "started_at": started_at,
+            "home_fetch_ms": ctx.home_fetch_ms,
+            "home_fetch_attempts": len(ctx.home_errors),
+            "home_fetch_history": ctx.home_fetch_history,
+            "total_ms": int((time.perf_counter() - ctx.t_total) * 1000),
+            "run_id": cfg.run_id,
+            "started_at": ctx.started_at,
             "ended_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         }
+        return
+    if not home:
+        return  # the budget left no room for an attempt; finish_site records it
 
-    _write_text(site_art_dir / "home.raw.html", home.raw_html)
-    _write_text(site_art_dir / "home.cleaned.html", home.cleaned_html)
+    ctx.home_settle_ms = home.settle_ms
+    _write_artifact(ctx.site_art_dir / "home.raw.html", home.raw_html, cfg.content_store)
+    _write_artifact(ctx.site_art_dir / "home.cleaned.html", home.cleaned_html, cfg.content_store)
     if home.text:
-        _write_text(site_art_dir / "home.txt", home.text)
+        _write_artifact(ctx.site_art_dir / "home.txt", home.text, cfg.content_store)
 
-    # 2) Privacy policy discovery + fetch
-    if stage_callback:
-        stage_callback("policy_discovery")
+
+async def discovery_stage(ctx: SiteContext, cfg: SiteConfig) -> None:
+    """2) Privacy policy discovery + fetch."""
+    ctx.stage("policy_discovery")
+    home = ctx.home
+    site_art_dir = ctx.site_art_dir
     t_policy = time.perf_counter()
-    policy_info = await _fetch_best_policy(client, home.url, home.cleaned_html)
-    policy_fetch_ms = int((time.perf_counter() - t_policy) * 1000)
+    policy_info = await _fetch_best_policy(cfg.client, home.url, home.cleaned_html)
+    ctx.policy_fetch_ms = int((time.perf_counter() - t_policy) * 1000)
     _write_json(site_art_dir / "policy.discovery.json", {
-        k: policy_info[k] for k in ("site_etld1","candidates_top","tried","chosen")
+        k: policy_info[k] for k in ("site_etld1","candidates_top","tried","chosen","budget_exhausted")
     })
 
     chosen_full = policy_info.get("_chosen_full")
@@ -703,82 +977,114 @@ async def process_site(
                 "raw_html": home.raw_html,
                 "text_extraction_method": home.text_extraction_method or "fallback",
             }
-    first_party_policy = None
     if chosen_full:
         raw_text = chosen_full.get("text") or ""
-        cleaned_text = _clean_policy_text(raw_text)
-        first_party_policy = {
+        with tracing.span("clean_policy_text", text_chars=len(raw_text)):
+            cleaned_text = _clean_policy_text(raw_text)
+        first_party_policy = ctx.first_party_policy = {
             "url": chosen_full.get("url"),
             "status_code": chosen_full.get("status_code"),
             "likeliness_score": chosen_full.get("likeliness_score"),
             "text_len": len(cleaned_text),
             "text_len_raw": chosen_full.get("text_len"),
             "extraction_method": chosen_full.get("text_extraction_method") or "fallback",
+            "text_sha256": content_sha256(cleaned_text),
         }
         _write_text(site_art_dir / "policy.url.txt", chosen_full.get("url"))
-        _write_text(site_art_dir / "policy.raw.txt", raw_text)
-        _write_text(site_art_dir / "policy.txt", cleaned_text)
+        _write_artifact(site_art_dir / "policy.raw.txt", raw_text, cfg.content_store)
+        _write_artifact(site_art_dir / "policy.txt", cleaned_text, cfg.content_store)
         _write_json(
             site_art_dir / "policy.extraction.json",
             {
                 "method": first_party_policy["extraction_method"],
                 "source_url": chosen_full.get("url"),
+                "text_sha256": first_party_policy["text_sha256"],
             },
         )
-        _write_text(site_art_dir / "policy.cleaned.html", chosen_full.get("cleaned_html"))
+        _write_artifact(site_art_dir / "policy.cleaned.html", chosen_full.get("cleaned_html"), cfg.content_store)
         if chosen_full.get("raw_html"):
-            _write_text(site_art_dir / "policy.raw.html", chosen_full.get("raw_html"))
+            _write_artifact(site_art_dir / "policy.raw.html", chosen_full.get("raw_html"), cfg.content_store)
+        if cfg.policy_text_callback:
+            cfg.policy_text_callback({
+                "kind": "first_party",
+                "site_etld1": etld1(home.url) or etld1(ctx.site_url),
+                "third_party_etld1": None,
+                "url": chosen_full.get("url"),
+                "text": cleaned_text,
+                "text_sha256": first_party_policy["text_sha256"],
+                "run_id": cfg.run_id,
+            })
 
-    # 3) Third-party extraction
-    if stage_callback:
-        stage_callback("third_party_extract")
-    t_tp = time.perf_counter()
-    if third_party_engine == "openwpm":
-        openwpm_dir = site_art_dir / "openwpm"
-        try:
-            urls = run_openwpm_for_third_parties(home.url, out_dir=openwpm_dir, headless=True)
-            network_like = [{"url": u} for u in urls]
-            obs = third_parties_from_network_logs(home.url, network_like)
-        except Exception as e:
-            warn(f"[{etld1(home.url)}] OpenWPM failed; falling back to Crawl4AI network logs: {e}")
-            obs = third_parties_from_network_logs(home.url, home.network_requests)
-    else:
-        obs = third_parties_from_network_logs(home.url, home.network_requests)
-    third_party_extract_ms = int((time.perf_counter() - t_tp) * 1000)
-
-    third_party_etlds = obs.third_party_etld1s
-
-    def _merge_entries(radar_entry: TrackerRadarEntry | None, db_entry: TrackerDbEntry | None) -> dict[str, Any]:
-        # Mixed mode: prefer Tracker Radar if present; otherwise fall back to TrackerDB.
-        if radar_entry:
-            return {
-                "entity": radar_entry.entity,
-                "categories": list(radar_entry.categories or []),
-                "prevalence": radar_entry.prevalence,
-                "policy_url": radar_entry.policy_url,
-                "tracker_radar_source_domain_file": radar_entry.source_domain_file,
-                "trackerdb_source_pattern_file": None,
-                "trackerdb_source_org_file": None,
-            }
-        if db_entry:
-            return {
-                "entity": db_entry.entity,
-                "categories": list(db_entry.categories or []),
-                "prevalence": db_entry.prevalence,
-                "policy_url": db_entry.policy_url,
-                "tracker_radar_source_domain_file": None,
-                "trackerdb_source_pattern_file": db_entry.source_pattern_file,
-                "trackerdb_source_org_file": db_entry.source_org_file,
-            }
+
+def _merge_entries(radar_entry: TrackerRadarEntry | None, db_entry: TrackerDbEntry | None) -> dict[str, Any]:
+    # Mixed mode: prefer Tracker Radar if present; otherwise fall back to TrackerDB.
+    if radar_entry:
         return {
-            "entity": None,
-            "categories": [],
-            "prevalence": None,
-            "policy_url": None,
-            "tracker_radar_source_domain_file": None,
+            "entity": radar_entry.entity,
+            "categories": list(radar_entry.categories or []),
+            "prevalence": radar_entry.prevalence,
+            "policy_url": radar_entry.policy_url,
+            "tracker_radar_source_domain_file": radar_entry.source_domain_file,
             "trackerdb_source_pattern_file": None,
             "trackerdb_source_org_file": None,
         }
+    if db_entry:
+        return {
+            "entity": db_entry.entity,
+            "categories": list(db_entry.categories or []),
+            "prevalence": db_entry.prevalence,
+            "policy_url": db_entry.policy_url,
+            "tracker_radar_source_domain_file": None,
+            "trackerdb_source_pattern_file": db_entry.source_pattern_file,
+            "trackerdb_source_org_file": db_entry.source_org_file,
+        }
+    return {
+        "entity": None,
+        "categories": [],
+        "prevalence": None,
+        "policy_url": None,
+        "tracker_radar_source_domain_file": None,
+        "trackerdb_source_pattern_file": None,
+        "trackerdb_source_org_file": None,
+    }
+
+
+async def third_party_stage(ctx: SiteContext, cfg: SiteConfig) -> None:
+    """3) Third-party extraction and mapping, 4) third-party policy texts (best-effort)."""
+    ctx.stage("third_party_extract")
+    home = ctx.home
+    site_art_dir = ctx.site_art_dir
+    tracker_radar, trackerdb = cfg.tracker_radar, cfg.trackerdb
+    t_tp = time.perf_counter()
+    if ctx.home_capture is not None and budget.exhausted():
+        # Out of budget: extract from what the HTTP winner saw rather than wait for the render.
+        _discard_task(ctx.home_capture)
+        ctx.home_capture = None
+    if ctx.home_capture is not None:
+        # Hedged fetch won over HTTP; the browser render was left running for its network capture.
+        with tracing.span("home_capture_wait", url=ctx.site_url) as span:
+            captured = await ctx.home_capture
+            span.set(success=captured.success)
+        ctx.home_capture = None
+        if captured.success:
+            home.network_requests = captured.network_requests
+            ctx.home_settle_ms = captured.settle_ms
+        else:
+            warn(f"[{etld1(home.url)}] Browser capture failed after HTTP won the home fetch: {captured.error_message}")
+    with tracing.span("third_party_extract", engine=cfg.third_party_engine) as span:
+        if cfg.third_party_engine == "openwpm":
+            openwpm_dir = site_art_dir / "openwpm"
+            try:
+                urls = run_openwpm_for_third_parties(home.url, out_dir=openwpm_dir, headless=True)
+                network_like = [{"url": u} for u in urls]
+                obs = third_parties_from_network_logs(home.url, network_like)
+            except Exception as e:
+                warn(f"[{etld1(home.url)}] OpenWPM failed; falling back to Crawl4AI network logs: {e}")
+                obs = third_parties_from_network_logs(home.url, home.network_requests)
+        else:
+            obs = third_parties_from_network_logs(home.url, home.network_requests)
+        span.set(third_parties=len(obs.third_party_etld1s))
+    ctx.third_party_extract_ms = int((time.perf_counter() - t_tp) * 1000)
 
     site_entity: str | None = None
     site_etld = etld1(home.url) or ""
@@ -791,13 +1097,13 @@ async def process_site(
         if site_entry_db and site_entry_db.entity:
             site_entity = site_entry_db.entity
 
-    third_party_records: list[dict[str, Any]] = []
-    for tp in third_party_etlds:
+    third_party_records = ctx.third_party_records
+    for tp in obs.third_party_etld1s:
         radar_entry = tracker_radar.lookup(tp) if tracker_radar else None
         db_entry = trackerdb.lookup(tp) if trackerdb else None
         merged = _merge_entries(radar_entry, db_entry)
         tp_entity = merged.get("entity")
-        if exclude_same_entity and site_entity and tp_entity and tp_entity == site_entity:
+        if cfg.exclude_same_entity and site_entity and tp_entity and tp_entity == site_entity:
             continue
         third_party_records.append({
             "third_party_etld1": tp,
@@ -810,45 +1116,59 @@ async def process_site(
             "trackerdb_source_org_file": merged.get("trackerdb_source_org_file"),
         })
 
-    # 4) Optional: fetch third-party policy texts (best-effort)
-    if stage_callback:
-        stage_callback("third_party_policy_fetch")
+    ctx.stage("third_party_policy_fetch")
     t_tp_policy = time.perf_counter()
-    third_party_policy_fetches: list[dict[str, Any]] = []
-    if fetch_third_party_policies and (tracker_radar or trackerdb):
+    third_party_policy_fetches = ctx.third_party_policy_fetches
+    if cfg.fetch_third_party_policies and (tracker_radar or trackerdb):
         def sort_key(r: dict[str, Any]):
             p = r.get("prevalence")
             return (-(p if isinstance(p, (int, float)) else -1.0), r["third_party_etld1"])
 
-        for rec in sorted(third_party_records, key=sort_key)[:third_party_policy_max]:
+        for rec in sorted(third_party_records, key=sort_key)[:cfg.third_party_policy_max]:
             purl = rec.get("policy_url")
             if not purl:
                 continue
+            if budget.exhausted():
+                break
             tp_dir = site_art_dir / "third_party" / _safe_dirname(rec["third_party_etld1"])
             tp_dir.mkdir(parents=True, exist_ok=True)
-            if third_party_policy_fetcher is not None:
-                res = await third_party_policy_fetcher(purl)
-            else:
-                res = await client.fetch(
-                    purl,
-                    capture_network=False,
-                    remove_overlays=True,
-                    magic=False,
-                    scan_full_page=_should_scan_full_page_policy(purl),
-                )
-            tp_text_raw = (res.text or "").strip()
-            tp_text = _clean_policy_text(tp_text_raw)
+            with tracing.span("third_party_policy", url=purl, third_party=rec["third_party_etld1"]) as span:
+                if cfg.third_party_policy_fetcher is not None:
+                    res = await cfg.third_party_policy_fetcher(purl)
+                else:
+                    res = await cfg.client.fetch(
+                        purl,
+                        capture_network=False,
+                        remove_overlays=True,
+                        magic=False,
+                        scan_full_page=_should_scan_full_page_policy(purl),
+                    )
+                tp_text_raw = (res.text or "").strip()
+                tp_text = _clean_policy_text(tp_text_raw)
+                span.set(success=res.success, status_code=res.status_code, text_chars=len(tp_text))
+            tp_sha = content_sha256(tp_text)
             _write_text(tp_dir / "policy.url.txt", purl)
-            _write_text(tp_dir / "policy.raw.txt", tp_text_raw)
-            _write_text(tp_dir / "policy.txt", tp_text)
+            _write_artifact(tp_dir / "policy.raw.txt", tp_text_raw, cfg.content_store)
+            _write_artifact(tp_dir / "policy.txt", tp_text, cfg.content_store)
             tp_method = res.text_extraction_method or "fallback"
             _write_json(
                 tp_dir / "policy.extraction.json",
                 {
                     "method": tp_method,
                     "source_url": purl,
+                    "text_sha256": tp_sha,
                 },
             )
+            if cfg.policy_text_callback:
+                cfg.policy_text_callback({
+                    "kind": "third_party",
+                    "site_etld1": etld1(home.url) or etld1(ctx.site_url),
+                    "third_party_etld1": rec["third_party_etld1"],
+                    "url": purl,
+                    "text": tp_text,
+                    "text_sha256": tp_sha,
+                    "run_id": cfg.run_id,
+                })
             third_party_policy_fetches.append({
                 "third_party_etld1": rec["third_party_etld1"],
                 "policy_url": purl,
@@ -857,24 +1177,117 @@ async def process_site(
                 "text_len": len(tp_text),
                 "text_len_raw": len(tp_text_raw),
                 "extraction_method": tp_method,
+                "text_sha256": tp_sha,
                 "error_message": res.error_message,
             })
-    third_party_policy_fetch_ms = int((time.perf_counter() - t_tp_policy) * 1000)
+    ctx.third_party_policy_fetch_ms = int((time.perf_counter() - t_tp_policy) * 1000)
 
     fetch_method_by_tp = {
         str(item.get("third_party_etld1")): item.get("extraction_method")
         for item in third_party_policy_fetches
         if item.get("third_party_etld1")
     }
+    fetch_sha_by_tp = {
+        str(item.get("third_party_etld1")): item.get("text_sha256")
+        for item in third_party_policy_fetches
+        if item.get("third_party_etld1")
+    }
     if fetch_method_by_tp:
         for tp in third_party_records:
             et = str(tp.get("third_party_etld1") or "")
             tp["policy_extraction_method"] = fetch_method_by_tp.get(et)
+            tp["policy_text_sha256"] = fetch_sha_by_tp.get(et)
+
+
+# (name, stage) in processing order; `cli --pipeline` runs each with its own worker pool.
+SITE_STAGES: tuple[tuple[str, Callable[[SiteContext, SiteConfig], Awaitable[None]]], ...] = (
+    ("home", home_stage),
+    ("discovery", discovery_stage),
+    ("third_party", third_party_stage),
+)
+
 
-    # 5) Final record
-    status = "ok" if first_party_policy else "policy_not_found"
+async def run_stage(stage: Callable[[SiteContext, SiteConfig], Awaitable[None]], ctx: SiteContext, cfg: SiteConfig) -> bool:
+    """
+    Run one of `SITE_STAGES` with the site's budget active; False once the
+    site is finished. A stage that runs out of budget time is cancelled and
+    the site carries on (or finishes) with what it has.
+    """
+    if ctx.result is not None or (ctx.home is None and stage is not home_stage):
+        return False
+    site_budget = ctx.budget
+    left, why = site_budget.remaining_s() if site_budget is not None else (None, None)
+    t0 = time.perf_counter()
+    try:
+        with budget.activate(site_budget):
+            if left is None or site_budget.check():
+                # Out of budget already: stages skip their fetches, so the rest is cheap.
+                await stage(ctx, cfg)
+            else:
+                try:
+                    await asyncio.wait_for(stage(ctx, cfg), timeout=max(left, 0.0))
+                except asyncio.TimeoutError:
+                    if time.perf_counter() - t0 < left:
+                        raise  # a fetch's own timeout, not the budget's
+                    site_budget.reason = site_budget.reason or why
+                    warn(f"[{ctx.site_url}] Site budget exhausted ({site_budget.reason}); stage cancelled.")
+                    if ctx.home_capture is not None:
+                        _discard_task(ctx.home_capture)
+                        ctx.home_capture = None
+    except BaseException:
+        if ctx.home_capture is not None:
+            _discard_task(ctx.home_capture)
+            ctx.home_capture = None
+        raise
+    finally:
+        if site_budget is not None:
+            site_budget.active_s += time.perf_counter() - t0
+    return ctx.result is None and ctx.home is not None
+
+
+def finish_site(ctx: SiteContext, cfg: SiteConfig) -> dict[str, Any]:
+    """5) Final record (or the early result a stage set)."""
+    if ctx.home_capture is not None:
+        # Ended before the third-party stage collected the hedged browser capture.
+        _discard_task(ctx.home_capture)
+        ctx.home_capture = None
+    if ctx.result is not None:
+        return ctx.result
+    home = ctx.home
+    budget_reason = ctx.budget.reason if ctx.budget is not None else None
+    if budget_reason is not None:
+        METRICS.inc("site_budget_exhausted_total", reason=budget_reason)
+    if home is None:
+        # The budget ran out before a home page was fetched.
+        ctx.result = {
+            "rank": ctx.rank,
+            "input": ctx.domain_or_url,
+            "site_url": ctx.site_url,
+            "final_url": ctx.site_url,
+            "site_etld1": etld1(ctx.site_url),
+            "status": "budget_exhausted",
+            "status_code": None,
+            "error_message": f"budget_exhausted: {budget_reason}",
+            "error_code": "budget_exhausted",
+            "budget_exhausted_reason": budget_reason,
+            "budget_usage": ctx.budget.usage() if ctx.budget is not None else None,
+            "home_fetch_mode": ctx.home_fetch_mode,
+            "home_fetch_ms": ctx.home_fetch_ms,
+            "home_fetch_attempts": len(ctx.home_errors),
+            "home_fetch_history": ctx.home_fetch_history,
+            "total_ms": int((time.perf_counter() - ctx.t_total) * 1000),
+            "run_id": cfg.run_id,
+            "started_at": ctx.started_at,
+            "ended_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+        return ctx.result
+    status = "ok" if ctx.first_party_policy else "policy_not_found"
     non_browsable_reason: str | None = None
-    if status != "ok":
+    if budget_reason is not None:
+        warn(f"[{etld1(home.url)}] Site budget exhausted ({budget_reason}); keeping partial results.")
+        if status != "ok":
+            status = "budget_exhausted"
+    elif status != "ok":
         is_nb, reason = _classify_non_browsable(home)
         if is_nb:
             status = "non_browsable"
@@ -883,27 +1296,98 @@ async def process_site(
         else:
             warn(f"[{etld1(home.url)}] Privacy policy not found.")
 
-    return {
-        "rank": rank,
-        "input": domain_or_url,
-        "site_url": site_url,
+    ctx.result = {
+        "rank": ctx.rank,
+        "input": ctx.domain_or_url,
+        "site_url": ctx.site_url,
         "final_url": home.url,
         "site_etld1": etld1(home.url),
         "status": status,
         "home_status_code": home.status_code,
-        "home_fetch_mode": home_fetch_mode,
-        "home_fetch_attempts": max(1, len(home_errors) + 1),
-        "first_party_policy": first_party_policy,
+        "home_fetch_mode": ctx.home_fetch_mode,
+        "home_fetch_attempts": max(1, len(ctx.home_errors) + 1),
+        "home_fetch_history": ctx.home_fetch_history,
+        "first_party_policy": ctx.first_party_policy,
         "non_browsable_reason": non_browsable_reason,
-        "third_parties": third_party_records,
-        "third_party_policy_fetches": third_party_policy_fetches,
+        "third_parties": ctx.third_party_records,
+        "third_party_policy_fetches": ctx.third_party_policy_fetches,
         "error_code": (None if status == "ok" else status),
-        "home_fetch_ms": home_fetch_ms,
-        "policy_fetch_ms": policy_fetch_ms,
-        "third_party_extract_ms": third_party_extract_ms,
-        "third_party_policy_fetch_ms": third_party_policy_fetch_ms,
-        "total_ms": int((time.perf_counter() - t_total) * 1000),
-        "run_id": run_id,
-        "started_at": started_at,
+        "budget_exhausted_reason": budget_reason,
+        "budget_usage": ctx.budget.usage() if ctx.budget is not None else None,
+        "home_fetch_ms": ctx.home_fetch_ms,
+        "home_fetch_winner": ctx.home_fetch_winner,
+        "home_settle_ms": ctx.home_settle_ms,
+        "policy_fetch_ms": ctx.policy_fetch_ms,
+        "third_party_extract_ms": ctx.third_party_extract_ms,
+        "third_party_policy_fetch_ms": ctx.third_party_policy_fetch_ms,
+        "total_ms": int((time.perf_counter() - ctx.t_total) * 1000),
+        "run_id": cfg.run_id,
+        "started_at": ctx.started_at,
         "ended_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
     }
+    return ctx.result
+
+
+async def process_site(
+    client: Crawl4AIClient,
+    domain_or_url: str,
+    *,
+    rank: int | None,
+    artifacts_dir: str | Path,
+    tracker_radar: TrackerRadarIndex | None = None,
+    trackerdb: TrackerDbIndex | None = None,
+    fetch_third_party_policies: bool = True,
+    third_party_policy_max: int = 30,
+    third_party_engine: str = "crawl4ai",  # crawl4ai|openwpm
+    run_id: str | None = None,
+    stage_callback: Callable[[str], None] | None = None,
+    exclude_same_entity: bool = False,
+    third_party_policy_fetcher: Callable[[str], Awaitable[Crawl4AIResult]] | None = None,
+    content_store: ContentStore | None = None,
+    policy_text_callback: Callable[[dict[str, Any]], None] | None = None,
+    home_hedge_delay_ms: int | None = None,
+    home_max_attempts: int = 3,
+    site_budget: budget.SiteBudget | None = None,
+) -> dict[str, Any]:
+    """
+    Process a single website:
+    - Fetch homepage
+    - Find and fetch best privacy policy
+    - Extract third-party domains from network logs (Crawl4AI) or OpenWPM (optional)
+    - Map third parties via Tracker Radar / Ghostery TrackerDB (+ optionally fetch their policy texts)
+
+    Runs `SITE_STAGES` back to back (`run_site`); `pipeline.SitePipeline`
+    runs the same stages with a worker pool each.
+    """
+    cfg = SiteConfig(
+        client=client,
+        artifacts_dir=artifacts_dir,
+        tracker_radar=tracker_radar,
+        trackerdb=trackerdb,
+        fetch_third_party_policies=fetch_third_party_policies,
+        third_party_policy_max=third_party_policy_max,
+        third_party_engine=third_party_engine,
+        run_id=run_id,
+        exclude_same_entity=exclude_same_entity,
+        third_party_policy_fetcher=third_party_policy_fetcher,
+        content_store=content_store,
+        policy_text_callback=policy_text_callback,
+        home_hedge_delay_ms=home_hedge_delay_ms,
+        home_max_attempts=home_max_attempts,
+    )
+    ctx = new_site_context(
+        domain_or_url,
+        rank=rank,
+        artifacts_dir=artifacts_dir,
+        stage_callback=stage_callback,
+        site_budget=site_budget,
+    )
+    return await run_site(ctx, cfg)
+
+
+async def run_site(ctx: SiteContext, cfg: SiteConfig) -> dict[str, Any]:
+    """All of `SITE_STAGES` back to back for one site."""
+    for _, stage in SITE_STAGES:
+        if not await run_stage(stage, ctx, cfg):
+            break
+    return finish_site(ctx, cfg)
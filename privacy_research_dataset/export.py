@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Any
+
+from .records import policy_fetch_rows, site_row, third_party_rows
+from .utils.io import iter_jsonl
+from .utils.logging import log
+
+
+def _require_pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "Columnar export needs pyarrow. Install with `pip install pyarrow`."
+        ) from e
+    return pa, pq
+
+
+def table_schemas() -> dict[str, Any]:
+    """Arrow schemas for the three normalised tables (low-cardinality strings dictionary-encoded)."""
+    pa, _ = _require_pyarrow()
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    sites = pa.schema([
+        ("run_id", dict_str),
+        ("rank", pa.int64()),
+        ("input", pa.string()),
+        ("site_etld1", pa.string()),
+        ("final_url", pa.string()),
+        ("status", dict_str),
+        ("error_code", dict_str),
+        ("home_status_code", pa.int32()),
+        ("home_fetch_mode", dict_str),
+        ("home_fetch_attempts", pa.int32()),
+        ("non_browsable_reason", dict_str),
+        ("policy_url", pa.string()),
+        ("policy_status_code", pa.int32()),
+        ("policy_likeliness_score", pa.float64()),
+        ("policy_text_len", pa.int64()),
+        ("policy_text_len_raw", pa.int64()),
+        ("policy_extraction_method", dict_str),
+        ("policy_text_sha256", pa.string()),
+        ("third_party_count", pa.int32()),
+        ("home_fetch_ms", pa.int64()),
+        ("policy_fetch_ms", pa.int64()),
+        ("third_party_extract_ms", pa.int64()),
+        ("third_party_policy_fetch_ms", pa.int64()),
+        ("total_ms", pa.int64()),
+        ("started_at", pa.string()),
+        ("ended_at", pa.string()),
+    ])
+    third_parties = pa.schema([
+        ("run_id", dict_str),
+        ("site_etld1", pa.string()),
+        ("rank", pa.int64()),
+        ("third_party_etld1", dict_str),
+        ("entity", dict_str),
+        ("categories", pa.list_(dict_str)),
+        ("prevalence", pa.float64()),
+        ("policy_url", dict_str),
+        ("mapping_source", dict_str),
+        ("policy_extraction_method", dict_str),
+        ("policy_text_sha256", pa.string()),
+    ])
+    policy_fetches = pa.schema([
+        ("run_id", dict_str),
+        ("site_etld1", pa.string()),
+        ("third_party_etld1", dict_str),
+        ("policy_url", dict_str),
+        ("fetch_success", pa.bool_()),
+        ("status_code", pa.int32()),
+        ("text_len", pa.int64()),
+        ("text_len_raw", pa.int64()),
+        ("extraction_method", dict_str),
+        ("text_sha256", pa.string()),
+        ("error_message", pa.string()),
+    ])
+    return {
+        "sites": sites,
+        "site_third_parties": third_parties,
+        "policy_fetches": policy_fetches,
+    }
+
+
+class _TableSink:
+    """Buffer rows for one table and flush them as Parquet row groups."""
+
+    def __init__(self, path: Path, schema: Any, *, batch_size: int, compression: str) -> None:
+        pa, pq = _require_pyarrow()
+        self._pa = pa
+        self.schema = schema
+        self.batch_size = batch_size
+        self.rows: list[dict[str, Any]] = []
+        self.count = 0
+        self.writer = pq.ParquetWriter(str(path), schema, compression=compression)
+
+    def extend(self, rows: list[dict[str, Any]]) -> None:
+        self.rows.extend(rows)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        table = self._pa.Table.from_pylist(self.rows, schema=self.schema)
+        self.writer.write_table(table)
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+def export_results(
+    results_path: str | Path,
+    out_dir: str | Path,
+    *,
+    batch_size: int = 50_000,
+    compression: str = "zstd",
+) -> dict[str, int]:
+    """
+    Stream a results JSONL into `sites`, `site_third_parties` and `policy_fetches`
+    Parquet files. Memory is bounded by `batch_size` rows per table.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    schemas = table_schemas()
+    sinks = {
+        name: _TableSink(out / f"{name}.parquet", schema, batch_size=batch_size, compression=compression)
+        for name, schema in schemas.items()
+    }
+    try:
+        for result in iter_jsonl(results_path):
+            sinks["sites"].extend([site_row(result)])
+            sinks["site_third_parties"].extend(third_party_rows(result))
+            sinks["policy_fetches"].extend(policy_fetch_rows(result))
+    finally:
+        for sink in sinks.values():
+            sink.close()
+    return {name: sink.count for name, sink in sinks.items()}
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset export",
+        description="Export a results JSONL into normalised Parquet tables (sites, site_third_parties, policy_fetches).",
+    )
+    p.add_argument("--results", type=str, required=True, help="Path to results.jsonl.")
+    p.add_argument("--out-dir", type=str, required=True, help="Directory for the .parquet files.")
+    p.add_argument("--batch-size", type=int, default=50_000, help="Rows buffered per table before writing a row group. Default: 50000")
+    p.add_argument("--compression", type=str, default="zstd", choices=["zstd", "snappy", "gzip", "none"], help="Parquet compression codec. Default: zstd")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    counts = export_results(
+        args.results,
+        args.out_dir,
+        batch_size=max(1, int(args.batch_size)),
+        compression=args.compression,
+    )
+    log(
+        "Export: "
+        + ", ".join(f"{name}={count}" for name, count in counts.items())
+        + f" -> {args.out_dir}"
+    )
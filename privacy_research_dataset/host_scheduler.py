@@ -0,0 +1,249 @@
+"""
+Per-host politeness and failure isolation shared by every fetch path
+(browser renders, plain HTTP fetches, prefilter checks).
+
+Each host gets a token bucket (`rate_per_s`, `burst`), a concurrency cap and
+a circuit breaker: after `breaker_errors` consecutive host-level failures
+(timeouts, connection errors, 5xx, 429) requests to the host fail fast with
+`HostCircuitOpen` for `breaker_cooldown_s`; then a single probe is let
+through, and its outcome closes the breaker or reopens it with a doubled
+cooldown.
+
+The scheduler is process-wide, like tracing: `configure()` installs one and
+`slot(url)` is a no-op without it. asyncio and metrics are imported lazily so
+the argument helpers stay cheap for `--help`.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from urllib.parse import urlparse
+
+# Error classes (utils.errors.classify_error) that say something about the host.
+HOST_FAILURE_CLASSES = frozenset({"timeout", "dns", "connection_refused", "connection_reset", "http_5xx"})
+MAX_COOLDOWN_S = 900.0
+
+
+class HostCircuitOpen(RuntimeError):
+    """Raised by `slot()` while a host's breaker is open; the message classifies as `circuit_open`."""
+
+    def __init__(self, host: str, retry_in_s: float) -> None:
+        super().__init__(f"host_circuit_open: {host} (retry in {retry_in_s:.1f}s)")
+        self.host = host
+        self.retry_in_s = retry_in_s
+
+
+def _host_failure(error_message: str | None) -> bool:
+    if not error_message:
+        return False
+    from .utils.errors import classify_error
+
+    error_class = classify_error(error_message)
+    return error_class in HOST_FAILURE_CLASSES or (error_class == "http_4xx" and "http_status_429" in error_message)
+
+
+class _Host:
+    __slots__ = ("tokens", "updated", "sem", "failures", "open_until", "cooldown_s", "probing")
+
+    def __init__(self, burst: float, max_concurrent: int | None) -> None:
+        import asyncio
+
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.sem = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self.failures = 0
+        self.open_until = 0.0
+        self.cooldown_s = 0.0
+        self.probing = False
+
+
+class Permit:
+    """Handed out by `slot()`; report the fetch outcome with `record()`."""
+
+    __slots__ = ("error_message", "recorded", "probe")
+
+    def __init__(self, probe: bool = False) -> None:
+        self.error_message: str | None = None
+        self.recorded = False
+        self.probe = probe
+
+    def record(self, error_message: str | None = None, status_code: int | None = None) -> None:
+        """None (or a non-host error such as a 404) counts as the host answering; 429/5xx don't."""
+        if status_code is not None and (status_code == 429 or status_code >= 500):
+            error_message = error_message or f"http_status_{status_code}"
+        self.error_message = error_message
+        self.recorded = True
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        *,
+        rate_per_s: float | None = None,
+        burst: int = 5,
+        max_concurrent: int | None = 4,
+        breaker_errors: int = 5,
+        breaker_cooldown_s: float = 60.0,
+    ) -> None:
+        self.rate_per_s = rate_per_s if rate_per_s and rate_per_s > 0 else None
+        self.burst = float(max(1, burst))
+        self.max_concurrent = max_concurrent if max_concurrent and max_concurrent > 0 else None
+        self.breaker_errors = max(0, int(breaker_errors))
+        self.breaker_cooldown_s = float(breaker_cooldown_s)
+        self._hosts: dict[str, _Host] = {}
+
+    def _host(self, host: str) -> _Host:
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = _Host(self.burst, self.max_concurrent)
+        return h
+
+    def state(self, host: str) -> str:
+        h = self._hosts.get(host)
+        if h is None or not h.open_until:
+            return "closed"
+        return "open" if time.monotonic() < h.open_until else "half_open"
+
+    def open_hosts(self) -> list[str]:
+        return sorted(host for host in self._hosts if self.state(host) != "closed")
+
+    def _check_breaker(self, host: str, h: _Host) -> bool:
+        """True if this request is the half-open probe."""
+        if not h.open_until:
+            return False
+        now = time.monotonic()
+        if now < h.open_until or h.probing:
+            raise HostCircuitOpen(host, max(0.0, h.open_until - now))
+        h.probing = True
+        return True
+
+    async def _take_token(self, h: _Host) -> float:
+        if self.rate_per_s is None:
+            return 0.0
+        import asyncio
+
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            h.tokens = min(self.burst, h.tokens + (now - h.updated) * self.rate_per_s)
+            h.updated = now
+            if h.tokens >= 1.0:
+                h.tokens -= 1.0
+                return waited
+            delay = (1.0 - h.tokens) / self.rate_per_s
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def _settle(self, host: str, h: _Host, failed: bool, probe: bool) -> None:
+        from .metrics import METRICS
+
+        if probe:
+            h.probing = False
+        if not failed:
+            if h.open_until:
+                METRICS.inc("host_breaker_transitions_total", state="closed")
+            h.failures = 0
+            h.open_until = 0.0
+            h.cooldown_s = 0.0
+            return
+        h.failures += 1
+        if self.breaker_errors and (probe or h.failures >= self.breaker_errors):
+            h.cooldown_s = min(MAX_COOLDOWN_S, h.cooldown_s * 2 if probe and h.cooldown_s else self.breaker_cooldown_s)
+            h.open_until = time.monotonic() + h.cooldown_s
+            METRICS.inc("host_breaker_transitions_total", state="open")
+            from .utils.logging import warn
+
+            warn(f"[host_scheduler] {host}: {h.failures} consecutive failures, pausing for {h.cooldown_s:.0f}s")
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Permit]:
+        """
+        Wait for the host's concurrency slot and a token, then run the block.
+        Raises `HostCircuitOpen` instead while the breaker is open. Exceptions
+        from the block count as the permit's error; a cancelled block that
+        recorded nothing counts as neither success nor failure.
+        """
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            yield Permit()
+            return
+        h = self._host(host)
+        permit = Permit(probe=self._check_breaker(host, h))
+        from .metrics import METRICS
+
+        acquired = False
+        try:
+            if h.sem is not None:
+                await h.sem.acquire()
+                acquired = True
+            waited = await self._take_token(h)
+        except BaseException:
+            # Cancelled while queued: don't leave a half-open host waiting on a probe that never ran.
+            if permit.probe:
+                h.probing = False
+            if acquired:
+                h.sem.release()
+            raise
+        if waited:
+            METRICS.observe("host_throttle_wait_ms", waited * 1000)
+        outcome_known = True
+        try:
+            yield permit
+        except Exception as e:
+            permit.record(f"{type(e).__name__}: {e}")
+            raise
+        except BaseException:
+            # Cancelled mid-fetch (a lost hedge leg, a budget timeout): unless the
+            # block already recorded an outcome, the host told us nothing.
+            outcome_known = permit.recorded
+            raise
+        finally:
+            if outcome_known:
+                self._settle(host, h, _host_failure(permit.error_message), permit.probe)
+            elif permit.probe:
+                h.probing = False
+            if acquired:
+                h.sem.release()
+
+
+_scheduler: HostScheduler | None = None
+
+
+def configure(scheduler: HostScheduler | None) -> None:
+    """Install (or with None, remove) the process-wide scheduler."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get() -> HostScheduler | None:
+    return _scheduler
+
+
+@asynccontextmanager
+async def slot(url: str) -> AsyncIterator[Permit]:
+    """`HostScheduler.slot` on the configured scheduler; a no-op without one."""
+    scheduler = _scheduler
+    if scheduler is None:
+        yield Permit()
+        return
+    async with scheduler.slot(url) as permit:
+        yield permit
+
+
+def add_host_scheduler_arguments(group: Any) -> None:
+    group.add_argument("--host-rate", type=float, default=0.0, help="Max requests per second to any one host (token bucket; 0 = unlimited). Default: 0")
+    group.add_argument("--host-burst", type=int, default=5, help="Token-bucket burst per host for --host-rate. Default: 5")
+    group.add_argument("--host-max-concurrent", type=int, default=4, help="Max concurrent requests to any one host (0 = unlimited). Default: 4")
+    group.add_argument("--host-breaker-errors", type=int, default=5, help="Consecutive timeouts/connection errors/5xx/429 from a host before its requests fail fast (0 = never). Default: 5")
+    group.add_argument("--host-breaker-cooldown-s", type=float, default=60.0, help="How long a tripped host fails fast before one probe request is let through (doubles while probes fail). Default: 60")
+
+
+def from_args(args: Any) -> HostScheduler:
+    return HostScheduler(
+        rate_per_s=args.host_rate,
+        burst=args.host_burst,
+        max_concurrent=args.host_max_concurrent,
+        breaker_errors=args.host_breaker_errors,
+        breaker_cooldown_s=args.host_breaker_cooldown_s,
+    )
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable
+
+from .metrics import METRICS
+from .utils.logging import warn
+
+_MB = 1024 * 1024
+# A browser restart only helps if the browser is what grew; don't thrash.
+RESTART_COOLDOWN_S = 300.0
+
+
+def _proc_rss(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _proc_children() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces/parens.
+                ppid = int(f.read().rsplit(b")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _proc_descendants(pid: int, children: dict[int, list[int]] | None = None) -> list[int]:
+    children = _proc_children() if children is None else children
+    out: list[int] = []
+    stack = [pid]
+    while stack:
+        for c in children.get(stack.pop(), []):
+            out.append(c)
+            stack.append(c)
+    return out
+
+
+def process_rss_bytes(pid: int | None = None) -> int | None:
+    """Resident set size of `pid` (default: this process); None if unavailable."""
+    pid = os.getpid() if pid is None else pid
+    rss = _proc_rss(pid)
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+        return int(psutil.Process(pid).memory_info().rss)
+    except Exception:
+        return None
+
+
+def direct_children(pid: int | None = None) -> set[int]:
+    """Child pids of `pid` (default: this process); empty where /proc is unavailable."""
+    pid = os.getpid() if pid is None else pid
+    return set(_proc_children().get(pid, []))
+
+
+def tree_rss_bytes(root_pids: set[int] | list[int]) -> int | None:
+    """Summed RSS of the given processes and all their descendants; None if none is alive."""
+    children = _proc_children()
+    total = 0
+    alive = False
+    for root in root_pids:
+        for pid in (root, *_proc_descendants(root, children)):
+            rss = _proc_rss(pid)
+            if rss is not None:
+                total += rss
+                alive = True
+    return total if alive else None
+
+
+def children_rss_bytes(pid: int | None = None) -> tuple[int, int] | None:
+    """(summed RSS, process count) of all descendants, i.e. the browser and its helpers."""
+    pid = os.getpid() if pid is None else pid
+    if os.path.isdir("/proc"):
+        total = count = 0
+        for c in _proc_descendants(pid):
+            rss = _proc_rss(c)
+            if rss is not None:
+                total += rss
+                count += 1
+        return total, count
+    try:
+        import psutil
+        procs = psutil.Process(pid).children(recursive=True)
+    except Exception:
+        return None
+    total = 0
+    for p in procs:
+        try:
+            total += int(p.memory_info().rss)
+        except Exception:
+            continue
+    return total, len(procs)
+
+
+class MemoryWatch:
+    """
+    Periodic memory telemetry for long crawls.
+
+    `sample()` reads this process's RSS and the summed RSS of its descendants
+    (the browser processes). With `tracemalloc_every`, Python allocations are
+    traced and `tracemalloc_diff()` reports the top growth since the previous
+    snapshot. `count_objects` adds the number of gc-tracked objects to each
+    sample; that walks the whole heap and blocks the event loop meanwhile, so
+    it is off by default. `high_water_mb` is compared against process +
+    browser RSS.
+    """
+
+    def __init__(
+        self,
+        *,
+        high_water_mb: float | None = None,
+        tracemalloc_every: int = 0,
+        tracemalloc_top: int = 10,
+        count_objects: bool = False,
+    ) -> None:
+        self.high_water_mb = high_water_mb
+        self.count_objects = count_objects
+        self.tracemalloc_every = max(0, int(tracemalloc_every))
+        self.tracemalloc_top = tracemalloc_top
+        self.last: dict[str, Any] | None = None
+        self.peak_rss_mb = 0.0
+        self.peak_children_rss_mb = 0.0
+        self.samples = 0
+        self.actions: list[dict[str, Any]] = []
+        self.last_tracemalloc: dict[str, Any] | None = None
+        self._last_restart = float("-inf")
+        self._snapshot: tracemalloc.Snapshot | None = None
+        if self.tracemalloc_every and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def close(self) -> None:
+        if self.tracemalloc_every and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshot = None
+
+    def sample(self) -> dict[str, Any]:
+        rss = process_rss_bytes()
+        kids = children_rss_bytes()
+        out: dict[str, Any] = {
+            "rss_mb": round(rss / _MB, 1) if rss is not None else None,
+            "children_rss_mb": round(kids[0] / _MB, 1) if kids is not None else None,
+            "children": kids[1] if kids is not None else None,
+        }
+        if self.count_objects:
+            out["gc_objects"] = len(gc.get_objects())
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            out["traced_mb"] = round(current / _MB, 1)
+            out["traced_peak_mb"] = round(peak / _MB, 1)
+        self.samples += 1
+        self.last = out
+        self.peak_rss_mb = max(self.peak_rss_mb, out["rss_mb"] or 0.0)
+        self.peak_children_rss_mb = max(self.peak_children_rss_mb, out["children_rss_mb"] or 0.0)
+        if rss is not None:
+            METRICS.set_gauge("process_rss_bytes", rss)
+        if kids is not None:
+            METRICS.set_gauge("browser_rss_bytes", kids[0])
+            METRICS.set_gauge("browser_processes", kids[1])
+        return out
+
+    def total_mb(self, sample: dict[str, Any]) -> float:
+        return float(sample.get("rss_mb") or 0.0) + float(sample.get("children_rss_mb") or 0.0)
+
+    def over_high_water(self, sample: dict[str, Any]) -> bool:
+        return self.high_water_mb is not None and self.total_mb(sample) >= self.high_water_mb
+
+    def restart_allowed(self) -> bool:
+        return time.monotonic() - self._last_restart >= RESTART_COOLDOWN_S
+
+    def record_action(self, action: str, before: dict[str, Any], after: dict[str, Any] | None = None, **extra: Any) -> dict[str, Any]:
+        if action == "browser_restart":
+            self._last_restart = time.monotonic()
+        entry = {
+            "action": action,
+            "total_mb_before": round(self.total_mb(before), 1),
+            "total_mb_after": round(self.total_mb(after), 1) if after is not None else None,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **extra,
+        }
+        self.actions.append(entry)
+        METRICS.inc("memory_actions_total", action=action)
+        return entry
+
+    def tracemalloc_due(self, processed_sites: int) -> bool:
+        return bool(self.tracemalloc_every) and processed_sites > 0 and processed_sites % self.tracemalloc_every == 0
+
+    def tracemalloc_diff(self, processed_sites: int) -> dict[str, Any]:
+        """Snapshot and diff against the previous snapshot (or tracing start)."""
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._snapshot is None:
+            stats = snap.statistics("lineno")[: self.tracemalloc_top]
+            top = [
+                {"where": str(s.traceback[0]), "size_kb": round(s.size / 1024, 1), "size_diff_kb": None, "count": s.count}
+                for s in stats
+            ]
+        else:
+            stats = snap.compare_to(self._snapshot, "lineno")[: self.tracemalloc_top]
+            top = [
+                {
+                    "where": str(s.traceback[0]),
+                    "size_kb": round(s.size / 1024, 1),
+                    "size_diff_kb": round(s.size_diff / 1024, 1),
+                    "count": s.count,
+                }
+                for s in stats
+            ]
+        self._snapshot = snap
+        self.last_tracemalloc = {"processed_sites": processed_sites, "top": top}
+        return self.last_tracemalloc
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "last": self.last,
+            "peak_rss_mb": self.peak_rss_mb,
+            "peak_children_rss_mb": self.peak_children_rss_mb,
+            "high_water_mb": self.high_water_mb,
+            "samples": self.samples,
+            "actions": self.actions[-20:],
+            "tracemalloc": self.last_tracemalloc,
+        }
+
+
+class RestartGate:
+    """
+    Lets sites use the client unless a restart is pending. A requested restart
+    stops new sites from entering, waits for the in-flight ones to leave, then
+    runs `restart` and reopens.
+    """
+
+    def __init__(self, restart: Callable[[], Awaitable[None]]) -> None:
+        self._restart = restart
+        self._open = asyncio.Event()
+        self._open.set()
+        self._active = 0
+        self._pending = False
+        self.restarts = 0
+
+    async def enter(self) -> None:
+        await self._open.wait()
+        self._active += 1
+
+    async def leave(self) -> None:
+        self._active -= 1
+        if self._pending and self._active == 0:
+            await self._do_restart()
+
+    async def request(self) -> None:
+        if self._pending:
+            return
+        self._pending = True
+        self._open.clear()
+        if self._active == 0:
+            await self._do_restart()
+
+    async def _do_restart(self) -> None:
+        try:
+            await self._restart()
+            self.restarts += 1
+        except Exception as e:
+            warn(f"Browser restart failed: {e}")
+        finally:
+            self._pending = False
+            self._open.set()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from .utils.errors import classify_error
+
+# Milliseconds; roughly x2.5 steps from 5 ms to 5 min.
+DEFAULT_MS_BUCKETS: tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 60_000, 120_000, 300_000,
+)
+SITE_STAGES = ("home_fetch", "policy_fetch", "third_party_extract", "third_party_policy_fetch", "total")
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any]) -> _Labels:
+    return tuple(sorted((k, "" if v is None else str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: _Labels, extra: _Labels = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Histogram:
+    """Fixed-bucket streaming histogram; quantiles are interpolated within buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_MS_BUCKETS) -> None:
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= target and c:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return lo + (hi - lo) * ((target - seen) / c)
+            seen += c
+        return self.max
+
+    def delta(self, earlier: "Histogram | None") -> "Histogram":
+        """Observations since `earlier` (a previous `copy()` of this histogram)."""
+        out = self.copy()
+        if earlier is not None:
+            out.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+            out.count -= earlier.count
+            out.sum -= earlier.sum
+        return out
+
+    def copy(self) -> "Histogram":
+        out = Histogram(self.bounds)
+        out.counts = list(self.counts)
+        out.count = self.count
+        out.sum = self.sum
+        out.max = self.max
+        return out
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": (self.sum / self.count) if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms keyed by (name, labels).
+
+    Thread-safe (the metrics endpoint renders from its own thread). Cheap enough
+    to stay on for every crawl; exposure is opt-in via `serve_metrics`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: dict[str, dict[_Labels, float]] = {}
+        self.gauges: dict[str, dict[_Labels, float]] = {}
+        self.histograms: dict[str, dict[_Labels, Histogram]] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def add_gauge(self, name: str, delta: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram()
+            h.observe(value)
+
+    def counter_total(self, name: str, **match: Any) -> float:
+        """Sum of a counter over every series whose labels include `match`."""
+        want = set(_labels(match))
+        with self._lock:
+            return sum(v for labels, v in self.counters.get(name, {}).items() if want <= set(labels))
+
+    def merged_histogram(self, name: str, **match: Any) -> Histogram:
+        """A copy of a histogram merged over every series whose labels include `match`."""
+        want = set(_labels(match))
+        out = Histogram()
+        with self._lock:
+            for labels, h in self.histograms.get(name, {}).items():
+                if want <= set(labels) and h.bounds == out.bounds:
+                    out.counts = [a + b for a, b in zip(out.counts, h.counts)]
+                    out.count += h.count
+                    out.sum += h.sum
+                    out.max = max(out.max, h.max)
+        return out
+
+    def render_prometheus(self, prefix: str = "privacy_dataset_") -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for labels, v in sorted(series.items()):
+                    lines.append(f"{prefix}{name}{_fmt_labels(labels)} {v:g}")
+            for name, series in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {prefix}{name} gauge")
+                for labels, v in sorted(series.items()):
+                    lines.append(f"{prefix}{name}{_fmt_labels(labels)} {v:g}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for labels, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, c in zip(h.bounds, h.counts):
+                        cumulative += c
+                        lines.append(f"{prefix}{name}_bucket{_fmt_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{prefix}{name}_sum{_fmt_labels(labels)} {h.sum:g}")
+                    lines.append(f"{prefix}{name}_count{_fmt_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-friendly snapshot (histograms reduced to count/mean/p50/p95/p99/max)."""
+
+        def key(labels: _Labels) -> str:
+            return ",".join(f"{k}={v}" for k, v in labels) or "all"
+
+        with self._lock:
+            return {
+                "counters": {n: {key(l): v for l, v in s.items()} for n, s in self.counters.items()},
+                "gauges": {n: {key(l): v for l, v in s.items()} for n, s in self.gauges.items()},
+                "histograms": {n: {key(l): h.summary() for l, h in s.items()} for n, s in self.histograms.items()},
+            }
+
+
+METRICS = MetricsRegistry()
+
+
+def observe_fetch(
+    tier: str,
+    *,
+    ms: float,
+    success: bool,
+    error_message: str | None = None,
+    body_bytes: int = 0,
+    registry: MetricsRegistry = METRICS,
+) -> None:
+    outcome = "ok" if success else "error"
+    error_class = "none" if success else classify_error(error_message)
+    registry.observe("fetch_ms", ms, tier=tier, outcome=outcome)
+    registry.inc("fetches_total", tier=tier, outcome=outcome, error_class=error_class)
+    if body_bytes:
+        registry.inc("fetch_bytes_total", body_bytes, tier=tier)
+
+
+def observe_site(result: dict[str, Any], registry: MetricsRegistry = METRICS) -> None:
+    """Record one finished `process_site` record (stage latencies, status, error class)."""
+    status = str(result.get("status") or "unknown")
+    error_class = classify_error(result.get("error_message")) if status == "home_fetch_failed" else "none"
+    registry.inc("sites_total", status=status, error_class=error_class)
+    for stage in SITE_STAGES:
+        ms = result.get(f"{stage}_ms")
+        if isinstance(ms, (int, float)):
+            registry.observe("site_stage_ms", float(ms), stage=stage, status=status)
+    tps = result.get("third_parties") or []
+    registry.inc("third_parties_total", len(tps))
+
+
+def serve_metrics(port: int, registry: MetricsRegistry = METRICS) -> ThreadingHTTPServer:
+    """Expose `GET /metrics` (Prometheus text format) on 127.0.0.1 from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
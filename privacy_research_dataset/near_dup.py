@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .utils.io import write_jsonl
+from .utils.logging import log, warn
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MERSENNE_61 = (1 << 61) - 1
+_SHINGLE_BLOCK = 8192
+
+
+def _require_numpy() -> Any:
+    try:
+        import numpy as np  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "Near-duplicate detection needs numpy. Install with `pip install numpy`."
+        ) from e
+    return np
+
+
+def shingle_hashes(text: str, k: int = 5) -> list[int]:
+    """Hash word k-grams of `text` into 32-bit ints (deterministic across processes)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < k:
+        return []
+    seen: set[int] = set()
+    for i in range(len(tokens) - k + 1):
+        seen.add(zlib.crc32(" ".join(tokens[i:i + k]).encode("utf-8")))
+    return list(seen)
+
+
+def _permutations(num_perm: int, seed: int) -> tuple[Any, Any]:
+    np = _require_numpy()
+    rng = np.random.default_rng(seed)
+    # a, b < 2^32 keeps a*x + b inside uint64 for 32-bit shingle hashes.
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(hashes: list[int], a: Any, b: Any) -> Any:
+    np = _require_numpy()
+    sig = np.full(a.shape[0], _MERSENNE_61, dtype=np.uint64)
+    if not hashes:
+        return sig
+    x = np.asarray(hashes, dtype=np.uint64)
+    # Process shingles in blocks so huge policies don't allocate num_perm x N at once.
+    for start in range(0, x.shape[0], _SHINGLE_BLOCK):
+        block = x[start:start + _SHINGLE_BLOCK]
+        vals = (a[:, None] * block[None, :] + b[:, None]) % np.uint64(_MERSENNE_61)
+        np.minimum(sig, vals.min(axis=1), out=sig)
+    return sig
+
+
+def _signatures_for_batch(
+    batch: list[tuple[str, str]],
+    shingle_size: int,
+    num_perm: int,
+    seed: int,
+) -> list[tuple[str, bytes | None]]:
+    a, b = _permutations(num_perm, seed)
+    out: list[tuple[str, bytes | None]] = []
+    for site, path in batch:
+        try:
+            text = Path(path).read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            out.append((site, None))
+            continue
+        hashes = shingle_hashes(text, shingle_size)
+        if not hashes:
+            out.append((site, None))
+            continue
+        out.append((site, minhash_signature(hashes, a, b).tobytes()))
+    return out
+
+
+def iter_policy_texts(artifacts_dir: str | Path, filename: str = "policy.txt") -> Iterator[tuple[str, str]]:
+    """Yield (site_dir_name, path) for each first-party policy text under an artifacts dir."""
+    root = Path(artifacts_dir)
+    for entry in sorted(root.iterdir()):
+        # Skip internal folders such as the `_content` store.
+        if not entry.is_dir() or entry.name.startswith("_"):
+            continue
+        p = entry / filename
+        if p.is_file() and p.stat().st_size > 0:
+            yield entry.name, str(p)
+
+
+def _chunks(items: Iterable[tuple[str, str]], size: int) -> Iterator[list[tuple[str, str]]]:
+    batch: list[tuple[str, str]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Keep the smallest index as root so cluster ids are stable.
+            if ri < rj:
+                self.parent[rj] = ri
+            else:
+                self.parent[ri] = rj
+
+
+def cluster_signatures(
+    signatures: Any,
+    *,
+    bands: int,
+    threshold: float,
+) -> list[int]:
+    """
+    LSH-band a (n_docs, num_perm) signature matrix and return a cluster root per doc.
+
+    Each bucket is verified against its first member only (estimated Jaccard from
+    signatures), which keeps the work linear even for template policies shared by
+    thousands of sites.
+    """
+    np = _require_numpy()
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands}).")
+    rows = num_perm // bands
+    uf = _UnionFind(n)
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        buckets: dict[bytes, int] = {}
+        for i in range(n):
+            key = block[i].tobytes()
+            first = buckets.get(key)
+            if first is None:
+                buckets[key] = i
+                continue
+            if uf.find(first) == uf.find(i):
+                continue
+            similarity = float(np.count_nonzero(signatures[first] == signatures[i])) / num_perm
+            if similarity >= threshold:
+                uf.union(first, i)
+    return [uf.find(i) for i in range(n)]
+
+
+def _signature_batches(
+    batches: Iterator[list[tuple[str, str]]],
+    workers: int,
+    shingle_size: int,
+    num_perm: int,
+    seed: int,
+) -> Iterator[list[tuple[str, bytes | None]]]:
+    if workers <= 1:
+        for batch in batches:
+            yield _signatures_for_batch(batch, shingle_size, num_perm, seed)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded window of in-flight batches, as in consistency.py: submitting
+        # the whole corpus up front queues every batch and result at once.
+        pending = []
+        for batch in batches:
+            pending.append(pool.submit(_signatures_for_batch, batch, shingle_size, num_perm, seed))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for fut in pending:
+            yield fut.result()
+
+
+def build_near_duplicate_clusters(
+    artifacts_dir: str | Path,
+    *,
+    shingle_size: int = 5,
+    num_perm: int = 128,
+    bands: int = 16,
+    threshold: float = 0.8,
+    seed: int = 1,
+    workers: int | None = None,
+    batch_size: int = 256,
+) -> list[dict[str, Any]]:
+    np = _require_numpy()
+    workers = workers or os.cpu_count() or 1
+    sites: list[str] = []
+    rows: list[bytes] = []
+    skipped = 0
+
+    batches = _chunks(iter_policy_texts(artifacts_dir), batch_size)
+    for batch_out in _signature_batches(batches, workers, shingle_size, num_perm, seed):
+        for site, sig in batch_out:
+            if sig is None:
+                skipped += 1
+                continue
+            sites.append(site)
+            rows.append(sig)
+
+    if skipped:
+        warn(f"Near-dups: skipped {skipped} policies (unreadable or shorter than {shingle_size} tokens).")
+    if not sites:
+        return []
+
+    signatures = np.frombuffer(b"".join(rows), dtype=np.uint64).reshape(len(sites), num_perm)
+    roots = cluster_signatures(signatures, bands=bands, threshold=threshold)
+
+    sizes: dict[int, int] = {}
+    for r in roots:
+        sizes[r] = sizes.get(r, 0) + 1
+    return [
+        {
+            "site": site,
+            "cluster_id": root,
+            "cluster_size": sizes[root],
+            "representative": sites[root],
+        }
+        for site, root in zip(sites, roots)
+    ]
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset near-dups",
+        description="Cluster near-duplicate first-party policies (MinHash + LSH over artifacts/<site>/policy.txt).",
+    )
+    p.add_argument("--artifacts-dir", type=str, required=True, help="Artifacts directory of a run.")
+    p.add_argument("--out", type=str, required=True, help="Output JSONL sidecar (one cluster assignment per site).")
+    p.add_argument("--shingle-size", type=int, default=5, help="Word k-gram size. Default: 5")
+    p.add_argument("--num-perm", type=int, default=128, help="MinHash permutations. Default: 128")
+    p.add_argument("--bands", type=int, default=16, help="LSH bands (num-perm must be divisible). Default: 16")
+    p.add_argument("--threshold", type=float, default=0.8, help="Minimum estimated Jaccard similarity to merge. Default: 0.8")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes for signatures. Default: CPU count")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    records = build_near_duplicate_clusters(
+        args.artifacts_dir,
+        shingle_size=args.shingle_size,
+        num_perm=args.num_perm,
+        bands=args.bands,
+        threshold=args.threshold,
+        workers=args.workers,
+    )
+    write_jsonl(args.out, records)
+    clustered = sum(1 for r in records if r["cluster_size"] > 1)
+    clusters = len({r["cluster_id"] for r in records if r["cluster_size"] > 1})
+    log(f"Near-dups: {len(records)} policies, {clustered} in {clusters} multi-site clusters -> {args.out}")
@@ -0,0 +1,161 @@
+"""
+Stage-pipelined site processing (`--pipeline`).
+
+Without it, one concurrency slot covers a site's whole `process_site`
+lifetime, so cheap home fetches wait behind slow policy discovery and
+third-party policy fetches. `SitePipeline` gives every stage its own worker
+pool with a queue in front of it, and passes each site's context from queue
+to queue. Home fetches of new sites keep flowing while earlier sites sit in
+discovery.
+
+Queues after the first are bounded (`buffer`, default 2x the stage's
+workers), so a fast stage can only run that far ahead of a slow one. The
+per-stage queue depths and busy/blocked worker counts are exported as gauges
+(`pipeline_queue_depth`, `pipeline_busy_workers`, `pipeline_blocked_workers`,
+labelled by stage) and returned by `stats()` for tuning the pool sizes.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Sequence
+
+from .metrics import METRICS
+
+# A stage returns True to pass the item on to the next stage, False when the item is finished.
+StageFn = Callable[[Any], Awaitable[bool]]
+
+
+class _Stage:
+    __slots__ = ("name", "workers", "fn", "queue", "busy", "blocked", "processed")
+
+    def __init__(self, name: str, workers: int, fn: StageFn, maxsize: int) -> None:
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.fn = fn
+        self.queue: asyncio.Queue[tuple[Any, asyncio.Future[Any]]] = asyncio.Queue(maxsize)
+        self.busy = 0
+        self.blocked = 0
+        self.processed = 0
+
+
+class SitePipeline:
+    """
+    `stages` is a sequence of (name, workers, fn). Start the workers with
+    `start()` or `async with`, then `await run(item)` per item; it
+    returns the item once a stage reports it finished or the last stage has
+    run, and re-raises a stage's exception (a RuntimeError if the stage was
+    cancelled). Items still in the pipeline at `close()` are cancelled.
+    """
+
+    def __init__(self, stages: Sequence[tuple[str, int, StageFn]], *, buffer: int | None = None) -> None:
+        if not stages:
+            raise ValueError("SitePipeline needs at least one stage")
+        self._stages = [
+            _Stage(name, workers, fn, 0 if i == 0 else max(1, buffer if buffer is not None else 2 * max(1, int(workers))))
+            for i, (name, workers, fn) in enumerate(stages)
+        ]
+        self._tasks: list[asyncio.Task[None]] = []
+        self._closing = False
+
+    @property
+    def capacity(self) -> int:
+        """Sites worth admitting at once: every worker and bounded queue slot, plus one queued home per worker."""
+        return sum(s.workers + s.queue.maxsize for s in self._stages) + self._stages[0].workers
+
+    def start(self) -> None:
+        for i, stage in enumerate(self._stages):
+            self._tasks.extend(asyncio.create_task(self._work(i)) for _ in range(stage.workers))
+            self._gauges(stage)
+
+    async def close(self) -> None:
+        self._closing = True
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Items still queued will never run; don't leave their callers waiting.
+        for stage in self._stages:
+            while not stage.queue.empty():
+                _, fut = stage.queue.get_nowait()
+                fut.cancel()
+            self._gauges(stage)
+        self._closing = False
+
+    async def __aenter__(self) -> "SitePipeline":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def run(self, item: Any) -> Any:
+        fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        first = self._stages[0]
+        first.queue.put_nowait((item, fut))
+        self._gauges(first)
+        return await fut
+
+    def _gauges(self, stage: _Stage) -> None:
+        METRICS.set_gauge("pipeline_queue_depth", stage.queue.qsize(), stage=stage.name)
+        METRICS.set_gauge("pipeline_busy_workers", stage.busy, stage=stage.name)
+        METRICS.set_gauge("pipeline_blocked_workers", stage.blocked, stage=stage.name)
+
+    async def _work(self, i: int) -> None:
+        stage = self._stages[i]
+        nxt = self._stages[i + 1] if i + 1 < len(self._stages) else None
+        while True:
+            item, fut = await stage.queue.get()
+            if fut.done():  # the caller gave up (cancelled) while the item was queued
+                self._gauges(stage)
+                continue
+            stage.busy += 1
+            self._gauges(stage)
+            try:
+                more = await stage.fn(item)
+            except asyncio.CancelledError:
+                if self._closing:
+                    fut.cancel()
+                    raise
+                # The stage cancelled itself: fail this item, keep the worker.
+                if not fut.done():
+                    fut.set_exception(RuntimeError(f"pipeline stage {stage.name!r} was cancelled"))
+                continue
+            except BaseException as e:
+                # Resolve the caller's future whatever happened, or run() never returns.
+                if not fut.done():
+                    fut.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+                continue
+            finally:
+                stage.busy -= 1
+                stage.processed += 1
+                self._gauges(stage)
+            if fut.done():
+                continue
+            if more and nxt is not None:
+                stage.blocked += 1
+                self._gauges(stage)
+                try:
+                    await nxt.queue.put((item, fut))
+                except BaseException:
+                    fut.cancel()
+                    raise
+                finally:
+                    stage.blocked -= 1
+                self._gauges(stage)
+                self._gauges(nxt)
+            else:
+                fut.set_result(item)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            s.name: {
+                "workers": s.workers,
+                "queued": s.queue.qsize(),
+                "busy": s.busy,
+                "blocked": s.blocked,
+                "processed": s.processed,
+            }
+            for s in self._stages
+        }
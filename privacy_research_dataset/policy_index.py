@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from .content_store import content_sha256
+from .utils.logging import log
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS policy_docs (
+    id INTEGER PRIMARY KEY,
+    text_sha256 TEXT NOT NULL UNIQUE,
+    text_len INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS policy_fts USING fts5(
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS policy_occurrences (
+    doc_id INTEGER NOT NULL REFERENCES policy_docs(id),
+    run_id TEXT,
+    site_etld1 TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    third_party_etld1 TEXT NOT NULL DEFAULT '',
+    url TEXT,
+    UNIQUE (site_etld1, kind, third_party_etld1)
+);
+CREATE INDEX IF NOT EXISTS occ_doc ON policy_occurrences(doc_id);
+"""
+
+
+class PolicyIndex:
+    """
+    Full-text (SQLite FTS5) index over first- and third-party policy texts.
+
+    Texts are indexed once per content hash; each site/third-party occurrence
+    points at the shared document, so the Google policy seen on 10k sites is
+    tokenized and stored once. Writes are committed in batches.
+    """
+
+    def __init__(self, path: str | Path, *, batch_size: int = 50, check_same_thread: bool = True) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self.conn.executescript(_SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(
+                "SQLite FTS5 is not available in this Python build; the policy index needs it."
+            ) from e
+        self._pending = 0
+
+    def __enter__(self) -> "PolicyIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(
+        self,
+        *,
+        site_etld1: str,
+        kind: str,
+        text: str | None,
+        url: str | None = None,
+        third_party_etld1: str | None = None,
+        run_id: str | None = None,
+        text_sha256: str | None = None,
+    ) -> bool:
+        if not text or not text.strip():
+            return False
+        sha = text_sha256 or content_sha256(text)
+        row = self.conn.execute("SELECT id FROM policy_docs WHERE text_sha256 = ?", (sha,)).fetchone()
+        if row is None:
+            cur = self.conn.execute(
+                "INSERT INTO policy_docs (text_sha256, text_len) VALUES (?, ?)",
+                (sha, len(text)),
+            )
+            doc_id = cur.lastrowid
+            self.conn.execute("INSERT INTO policy_fts (rowid, body) VALUES (?, ?)", (doc_id, text))
+        else:
+            doc_id = row["id"]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO policy_occurrences "
+            "(doc_id, run_id, site_etld1, kind, third_party_etld1, url) VALUES (?, ?, ?, ?, ?, ?)",
+            (doc_id, run_id, site_etld1, kind, third_party_etld1 or "", url),
+        )
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+        return True
+
+    def add_event(self, event: dict[str, Any]) -> None:
+        """Adapter for `process_site(policy_text_callback=...)` events."""
+        self.add(
+            site_etld1=str(event.get("site_etld1") or ""),
+            kind=str(event.get("kind") or "first_party"),
+            text=event.get("text"),
+            url=event.get("url"),
+            third_party_etld1=event.get("third_party_etld1"),
+            run_id=event.get("run_id"),
+            text_sha256=event.get("text_sha256"),
+        )
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 20,
+        kind: str | None = None,
+        snippet_tokens: int = 16,
+    ) -> list[dict[str, Any]]:
+        """
+        Run an FTS5 MATCH query (use double quotes for phrases, e.g.
+        '"google analytics"'). Returns one hit per site occurrence ordered by
+        BM25 rank of the underlying document.
+        """
+        # Join and filter before the LIMIT: a kind filter applied after limiting
+        # documents could drop every hit, and re-indexed sites leave documents
+        # with no occurrences behind.
+        sql = (
+            "SELECT o.doc_id, o.site_etld1, o.kind, o.third_party_etld1, o.url, o.run_id, bm25(policy_fts) AS score "
+            "FROM policy_fts JOIN policy_occurrences o ON o.doc_id = policy_fts.rowid "
+            "WHERE policy_fts MATCH ?"
+        )
+        params: list[Any] = [query]
+        if kind:
+            sql += " AND o.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score, o.site_etld1 LIMIT ?"
+        params.append(int(limit))
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+            # Snippets only for the documents that made the cut.
+            doc_ids = sorted({r["doc_id"] for r in rows})
+            snippets: dict[int, str] = {}
+            if doc_ids:
+                marks = ",".join("?" * len(doc_ids))
+                for s in self.conn.execute(
+                    "SELECT rowid, snippet(policy_fts, 0, '[', ']', '…', ?) AS snippet "
+                    f"FROM policy_fts WHERE policy_fts MATCH ? AND rowid IN ({marks})",
+                    [int(snippet_tokens), query, *doc_ids],
+                ):
+                    snippets[s["rowid"]] = s["snippet"]
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}") from e
+        return [
+            {
+                "site": r["site_etld1"],
+                "kind": r["kind"],
+                "third_party_etld1": r["third_party_etld1"] or None,
+                "url": r["url"],
+                "run_id": r["run_id"],
+                "score": r["score"],
+                "snippet": snippets.get(r["doc_id"]),
+            }
+            for r in rows
+        ]
+
+    def index_artifacts(self, artifacts_dir: str | Path) -> int:
+        """(Re)build the index from an artifacts folder written by `process_site`."""
+        count = 0
+        root = Path(artifacts_dir)
+        for site_dir in sorted(root.iterdir()):
+            if not site_dir.is_dir() or site_dir.name.startswith("_"):
+                continue
+            count += self._index_policy_dir(site_dir, site_dir.name, "first_party", None)
+            tp_root = site_dir / "third_party"
+            if tp_root.is_dir():
+                for tp_dir in sorted(tp_root.iterdir()):
+                    if tp_dir.is_dir():
+                        count += self._index_policy_dir(tp_dir, site_dir.name, "third_party", tp_dir.name)
+        self.commit()
+        return count
+
+    def _index_policy_dir(self, d: Path, site: str, kind: str, third_party: str | None) -> int:
+        p = d / "policy.txt"
+        if not p.is_file():
+            return 0
+        text = p.read_text(encoding="utf-8", errors="ignore")
+        url_file = d / "policy.url.txt"
+        url = url_file.read_text(encoding="utf-8").strip() if url_file.is_file() else None
+        return int(self.add(site_etld1=site, kind=kind, text=text, url=url, third_party_etld1=third_party))
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset search",
+        description="Query (and optionally build) the full-text policy index.",
+    )
+    p.add_argument("query", nargs="?", default=None, help='FTS5 query, e.g. \'"google analytics"\' or \'sell NEAR/5 data\'.')
+    p.add_argument("--index", type=str, required=True, help="Policy index SQLite path (see --policy-index on crawls).")
+    p.add_argument("--build-from-artifacts", type=str, default=None, help="Index every policy.txt under this artifacts dir before querying.")
+    p.add_argument("--kind", type=str, default=None, choices=["first_party", "third_party"], help="Restrict hits to first- or third-party policies.")
+    p.add_argument("--limit", type=int, default=20, help="Max hits. Default: 20")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    with PolicyIndex(args.index, batch_size=500) as idx:
+        if args.build_from_artifacts:
+            n = idx.index_artifacts(args.build_from_artifacts)
+            log(f"Policy index: indexed {n} policy texts from {args.build_from_artifacts}")
+        if not args.query:
+            return
+        for hit in idx.search(args.query, limit=args.limit, kind=args.kind):
+            tp = f" [{hit['third_party_etld1']}]" if hit["third_party_etld1"] else ""
+            print(f"{hit['score']:.2f}\t{hit['site']}{tp}\t{hit['url'] or ''}")
+            print(f"\t{hit['snippet']}")
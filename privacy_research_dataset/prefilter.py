@@ -0,0 +1,237 @@
+"""
+Website prefilter: drop infrastructure / non-browsable domains before a crawl.
+
+Used by the crawl (`--prefilter-websites`) and standalone as
+`privacy-dataset prefilter`, e.g. to shard a list on machines that never start
+a browser. aiohttp is only imported once HTTP checks actually run.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Any
+
+from . import host_scheduler
+from .utils.logging import log, warn
+
+DEFAULT_EXCLUDE_SUFFIXES: set[str] = {
+    # Infrastructure / authoritative DNS
+    "gtld-servers.net",
+    "root-servers.net",
+    "iana-servers.net",
+}
+
+_HTML_MARKER = re.compile(r"(?is)<\s*!doctype\s+html|<\s*html\b|<\s*head\b|<\s*body\b")
+_LINK_MARKER = re.compile(r"(?is)<\s*a\b")
+
+
+def add_prefilter_arguments(group: Any) -> None:
+    """Prefilter tuning flags, shared by the crawl parser and the `prefilter` subcommand."""
+    group.add_argument(
+        "--prefilter-timeout-ms",
+        type=int,
+        default=7000,
+        help="Timeout for the lightweight prefilter HTTP check (ms). Default: 7000",
+    )
+    group.add_argument(
+        "--prefilter-concurrency",
+        type=int,
+        default=50,
+        help="Concurrency for the prefilter HTTP checks (independent of crawl concurrency). Default: 50",
+    )
+    group.add_argument(
+        "--prefilter-max-bytes",
+        type=int,
+        default=65536,
+        help="Max bytes to read from response body during prefilter. Default: 65536 (64KB).",
+    )
+    group.add_argument(
+        "--prefilter-allow-http",
+        action="store_true",
+        help="Allow http:// fallback if https:// fails. Default: off (HTTPS only).",
+    )
+    group.add_argument(
+        "--prefilter-require-links",
+        action="store_true",
+        help="Require that the HTML contains at least one <a> link. Increases precision for 'real websites'.",
+    )
+    group.add_argument(
+        "--exclude-suffix",
+        action="append",
+        default=[],
+        help="Exclude domains ending with this suffix (repeatable). Example: --exclude-suffix gtld-servers.net",
+    )
+    group.add_argument(
+        "--exclude-domains-file",
+        type=str,
+        default=None,
+        help="Path to a file with domains to exclude (one per line; # comments allowed).",
+    )
+
+
+def _load_exclude_exact(path: str | None) -> set[str]:
+    if not path:
+        return set()
+    p = Path(path)
+    if not p.exists():
+        warn(f"Exclude file not found: {path}")
+        return set()
+    exact: set[str] = set()
+    for ln in p.read_text(encoding="utf-8").splitlines():
+        ln = ln.strip()
+        if not ln or ln.startswith("#"):
+            continue
+        exact.add(ln.lower().rstrip("."))
+    return exact
+
+
+def _normalize_suffix(s: str) -> str:
+    s = s.strip().lower().lstrip(".")
+    return s.rstrip(".")
+
+
+def _is_excluded(domain: str, suffixes: set[str], exact: set[str]) -> bool:
+    d = domain.strip().lower().rstrip(".")
+    if d in exact:
+        return True
+    # suffix match: exact suffix or subdomain of suffix
+    for suf in suffixes:
+        if d == suf or d.endswith("." + suf):
+            return True
+    return False
+
+
+async def _looks_like_website(
+    session: aiohttp.ClientSession,
+    domain: str,
+    *,
+    timeout_ms: int,
+    max_bytes: int,
+    allow_http: bool,
+    require_links: bool,
+) -> bool:
+    from aiohttp import ClientTimeout
+
+    # Prefer HTTPS; optionally fall back to HTTP.
+    schemes = ["https"]
+    if allow_http:
+        schemes.append("http")
+
+    for scheme in schemes:
+        url = f"{scheme}://{domain}/"
+        try:
+            timeout = ClientTimeout(total=timeout_ms / 1000)
+            async with host_scheduler.slot(url) as permit, session.get(url, timeout=timeout, allow_redirects=True) as resp:
+                permit.record(status_code=resp.status)
+                if resp.status >= 400:
+                    continue
+
+                ctype = (resp.headers.get("content-type") or "").lower()
+                if ("text/html" not in ctype) and ("application/xhtml" not in ctype):
+                    continue
+
+                chunk = await resp.content.read(max_bytes)
+                if not chunk:
+                    continue
+
+                text = chunk.decode("utf-8", errors="ignore")
+                if not _HTML_MARKER.search(text):
+                    continue
+                if require_links and not _LINK_MARKER.search(text):
+                    continue
+
+                return True
+
+        except Exception:
+            continue
+
+    return False
+
+
+async def prefilter_sites(args: argparse.Namespace, sites: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # Combine default suffix excludes with user-provided.
+    suffixes = set(DEFAULT_EXCLUDE_SUFFIXES)
+    for s in args.exclude_suffix or []:
+        suffixes.add(_normalize_suffix(s))
+
+    exact = _load_exclude_exact(args.exclude_domains_file)
+
+    # First apply cheap string-based excludes.
+    pre = []
+    excluded_count = 0
+    for rec in sites:
+        dom = str(rec["site"]).strip()
+        if _is_excluded(dom, suffixes, exact):
+            excluded_count += 1
+            continue
+        pre.append(rec)
+
+    if excluded_count:
+        log(f"Prefilter: excluded {excluded_count} sites by suffix/file rules.")
+
+    if not pre:
+        return pre
+
+    # Now do HTTP checks.
+    ua = args.user_agent or "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
+    headers = {"User-Agent": ua}
+
+    import asyncio
+
+    import aiohttp
+
+    sem = asyncio.Semaphore(max(1, int(args.prefilter_concurrency)))
+
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async def check_one(rec: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+            async with sem:
+                dom = str(rec["site"]).strip()
+                ok = await _looks_like_website(
+                    session,
+                    dom,
+                    timeout_ms=int(args.prefilter_timeout_ms),
+                    max_bytes=int(args.prefilter_max_bytes),
+                    allow_http=bool(args.prefilter_allow_http),
+                    require_links=bool(args.prefilter_require_links),
+                )
+                return rec, ok
+
+        results = await asyncio.gather(*(check_one(r) for r in pre))
+        kept = [rec for (rec, ok) in results if ok]
+
+    log(f"Prefilter: kept {len(kept)}/{len(sites)} sites that look like browsable websites.")
+    return kept
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    from .cli import add_input_arguments
+
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset prefilter",
+        description="Keep only domains that respond with HTML over HTTP(S); writes the kept sites one per line (usable as --input).",
+    )
+    add_input_arguments(p.add_argument_group("Input source"))
+    p.add_argument("--max-sites", type=int, default=None, help="Hard cap on number of input sites.")
+    p.add_argument("--out", type=str, required=True, help="Output path for kept sites (one per line).")
+    p.add_argument("--user-agent", type=str, default=None, help="Custom User-Agent for the HTTP checks.")
+    add_prefilter_arguments(p.add_argument_group("Prefilter"))
+    host_scheduler.add_host_scheduler_arguments(p.add_argument_group("Per-host politeness"))
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+
+    import asyncio
+
+    from .cli import load_input_sites
+
+    sites = load_input_sites(args)
+    log(f"Loaded {len(sites)} sites.")
+    host_scheduler.configure(host_scheduler.from_args(args))
+    kept = asyncio.run(prefilter_sites(args, sites))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text("".join(f"{rec['site']}\n" for rec in kept), encoding="utf-8")
+    log(f"Prefilter: wrote {len(kept)} sites -> {out}")
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from .utils.io import safe_dirname, write_json
+
+IDLE = "idle"  # event loop waiting on I/O (browser, network, sleeps)
+UNATTRIBUTED = "unattributed"
+
+_Frame = tuple[str, int, str]  # (filename, firstlineno, name), the pstats key
+
+
+def _frame_key(frame: FrameType) -> _Frame:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name)
+
+
+def _label(key: _Frame) -> str:
+    filename, _, name = key
+    parts = Path(filename).parts
+    if "site-packages" in parts:
+        parts = parts[parts.index("site-packages") + 1:]
+    else:
+        parts = parts[-2:]
+    return f"{'/'.join(parts)}:{name}".replace(";", ",").replace(" ", "_")
+
+
+class _SampleProfile:
+    """Stand-in for a cProfile object so `pstats.Stats` can load sampled data."""
+
+    def __init__(self, stats: dict[_Frame, tuple[int, int, float, float, dict[_Frame, tuple[int, int, float, float]]]]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        return
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for the crawl's event-loop thread.
+
+    A daemon thread samples the loop thread's Python stack every `interval_s`
+    and charges it to the (site, stage) of the asyncio task that is running at
+    that moment (set through `set_stage`, i.e. the `process_site`
+    stage_callback). Samples taken while no task runs are charged to `idle`:
+    time the loop spends waiting on the browser or the network.
+
+    The sampler needs the GIL to take a sample, so C calls that release it
+    (socket writes, hashing, parsing in lxml) are somewhat over-represented.
+    """
+
+    def __init__(self, *, interval_s: float = 0.005, slowest_sites: int = 0) -> None:
+        self.interval_s = max(0.0005, float(interval_s))
+        self.slowest_sites = max(0, int(slowest_sites))
+        self.stacks: Counter[tuple[str, tuple[_Frame, ...]]] = Counter()
+        self.stage_samples: Counter[str] = Counter()
+        self.samples = 0
+        self._task_state: dict[Any, tuple[str, str]] = {}
+        self._site_stacks: dict[str, Counter[tuple[str, tuple[_Frame, ...]]]] = {}
+        self._slowest: list[tuple[float, int, str, Counter[tuple[str, tuple[_Frame, ...]]]]] = []
+        self._finished = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._target_ident: int | None = None
+        self.started_at: float | None = None
+        self.wall_s = 0.0
+
+    def start(self) -> None:
+        """Call from the event loop thread."""
+        self._loop = asyncio.get_running_loop()
+        self._target_ident = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.started_at is not None:
+            self.wall_s = time.perf_counter() - self.started_at
+
+    def set_stage(self, site: str, stage: str) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            with self._lock:
+                self._task_state[task] = (site, stage)
+                if self.slowest_sites and site not in self._site_stacks:
+                    self._site_stacks[site] = Counter()
+
+    def site_finished(self, site: str, total_ms: float | None) -> None:
+        """Drop per-task state; keep the site's stacks only if it is among the slowest N."""
+        task = asyncio.current_task()
+        with self._lock:
+            if task is not None:
+                self._task_state.pop(task, None)
+            stacks = self._site_stacks.pop(site, None)
+            if stacks is None or not self.slowest_sites or total_ms is None:
+                return
+            self._finished += 1
+            item = (float(total_ms), self._finished, site, stacks)
+            if len(self._slowest) < self.slowest_sites:
+                heapq.heappush(self._slowest, item)
+            elif item[0] > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self._target_ident)  # type: ignore[arg-type]
+            if frame is None:
+                continue
+            stack: list[_Frame] = []
+            f: FrameType | None = frame
+            while f is not None:
+                stack.append(_frame_key(f))
+                f = f.f_back
+            stack.reverse()
+            task = asyncio.current_task(self._loop) if self._loop is not None else None
+            with self._lock:
+                if task is None:
+                    site, stage = None, IDLE
+                else:
+                    site, stage = self._task_state.get(task, (None, UNATTRIBUTED))
+                key = (stage, tuple(stack))
+                self.stacks[key] += 1
+                self.stage_samples[stage] += 1
+                self.samples += 1
+                if site is not None and site in self._site_stacks:
+                    self._site_stacks[site][key] += 1
+
+    def _pstats(self, stacks: Counter[tuple[str, tuple[_Frame, ...]]]) -> _SampleProfile:
+        dt = self.interval_s
+        tt: Counter[_Frame] = Counter()
+        ct: Counter[_Frame] = Counter()
+        callers: dict[_Frame, Counter[_Frame]] = {}
+        for (_, stack), n in stacks.items():
+            if not stack:
+                continue
+            tt[stack[-1]] += n
+            for fk in set(stack):
+                ct[fk] += n
+            for caller, callee in zip(stack, stack[1:]):
+                callers.setdefault(callee, Counter())[caller] += n
+        stats = {}
+        for fk, n in ct.items():
+            stats[fk] = (
+                n,
+                n,
+                tt.get(fk, 0) * dt,
+                n * dt,
+                {c: (m, m, 0.0, m * dt) for c, m in callers.get(fk, {}).items()},
+            )
+        return _SampleProfile(stats)
+
+    def _write_collapsed(self, path: Path, stacks: Counter[tuple[str, tuple[_Frame, ...]]]) -> None:
+        with path.open("w", encoding="utf-8") as f:
+            for (stage, stack), n in stacks.most_common():
+                f.write(";".join([f"stage:{stage}"] + [_label(k) for k in stack]) + f" {n}\n")
+
+    def _stage_report(self, stacks: Counter[tuple[str, tuple[_Frame, ...]]], top: int = 15) -> dict[str, Any]:
+        by_stage: dict[str, Counter[_Frame]] = {}
+        totals: Counter[str] = Counter()
+        for (stage, stack), n in stacks.items():
+            totals[stage] += n
+            if stack:
+                by_stage.setdefault(stage, Counter())[stack[-1]] += n
+        total = sum(totals.values()) or 1
+        return {
+            stage: {
+                "samples": n,
+                "seconds": round(n * self.interval_s, 3),
+                "share": round(n / total, 4),
+                "top_self": [
+                    {"function": _label(k), "samples": m, "share_of_stage": round(m / n, 4)}
+                    for k, m in by_stage.get(stage, Counter()).most_common(top)
+                ],
+            }
+            for stage, n in totals.most_common()
+        }
+
+    def write(self, out_dir: str | Path) -> dict[str, Any]:
+        """Write profile.pstats, profile.collapsed.txt, profile.stages.json (+ per-site profiles)."""
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stacks = Counter(self.stacks)
+            slowest = sorted(self._slowest, reverse=True)
+        pstats.Stats(self._pstats(stacks)).dump_stats(str(out / "profile.pstats"))
+        self._write_collapsed(out / "profile.collapsed.txt", stacks)
+        report = {
+            "interval_ms": self.interval_s * 1000,
+            "samples": self.samples,
+            "wall_s": round(self.wall_s, 3),
+            "stages": self._stage_report(stacks),
+            "slowest_sites": [],
+        }
+        for total_ms, _, site, site_stacks in slowest:
+            site_dir = out / "sites" / safe_dirname(site)
+            site_dir.mkdir(parents=True, exist_ok=True)
+            pstats.Stats(self._pstats(site_stacks)).dump_stats(str(site_dir / "profile.pstats"))
+            self._write_collapsed(site_dir / "profile.collapsed.txt", site_stacks)
+            report["slowest_sites"].append({
+                "site": site,
+                "total_ms": total_ms,
+                "samples": sum(site_stacks.values()),
+                "stages": {s: v["seconds"] for s, v in self._stage_report(site_stacks, top=0).items()},
+                "dir": str(site_dir),
+            })
+        write_json(out / "profile.stages.json", report)
+        return report
+
+
+def format_stage_table(report: dict[str, Any]) -> str:
+    lines = [f"{'stage':<28}{'seconds':>10}{'share':>8}  top self function"]
+    for stage, v in report["stages"].items():
+        top = v["top_self"][0]["function"] if v["top_self"] else ""
+        lines.append(f"{stage:<28}{v['seconds']:>10.2f}{v['share'] * 100:>7.1f}%  {top}")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Any
+
+# Flat, normalised views over one `results.jsonl` record. Shared by the columnar
+# export and the SQLite results database so both agree on column names.
+
+SITE_COLUMNS: tuple[str, ...] = (
+    "run_id",
+    "rank",
+    "input",
+    "site_etld1",
+    "final_url",
+    "status",
+    "error_code",
+    "home_status_code",
+    "home_fetch_mode",
+    "home_fetch_attempts",
+    "non_browsable_reason",
+    "policy_url",
+    "policy_status_code",
+    "policy_likeliness_score",
+    "policy_text_len",
+    "policy_text_len_raw",
+    "policy_extraction_method",
+    "policy_text_sha256",
+    "third_party_count",
+    "home_fetch_ms",
+    "policy_fetch_ms",
+    "third_party_extract_ms",
+    "third_party_policy_fetch_ms",
+    "total_ms",
+    "started_at",
+    "ended_at",
+)
+
+THIRD_PARTY_COLUMNS: tuple[str, ...] = (
+    "run_id",
+    "site_etld1",
+    "rank",
+    "third_party_etld1",
+    "entity",
+    "categories",
+    "prevalence",
+    "policy_url",
+    "mapping_source",
+    "policy_extraction_method",
+    "policy_text_sha256",
+)
+
+POLICY_FETCH_COLUMNS: tuple[str, ...] = (
+    "run_id",
+    "site_etld1",
+    "third_party_etld1",
+    "policy_url",
+    "fetch_success",
+    "status_code",
+    "text_len",
+    "text_len_raw",
+    "extraction_method",
+    "text_sha256",
+    "error_message",
+)
+
+
+def site_key(result: dict[str, Any]) -> str | None:
+    return result.get("site_etld1") or result.get("input")
+
+
+def mapping_source(tp: dict[str, Any]) -> str | None:
+    if tp.get("tracker_radar_source_domain_file"):
+        return "tracker_radar"
+    if tp.get("trackerdb_source_pattern_file") or tp.get("trackerdb_source_org_file"):
+        return "trackerdb"
+    return None
+
+
+def site_row(result: dict[str, Any]) -> dict[str, Any]:
+    fp = result.get("first_party_policy") or {}
+    third_parties = [tp for tp in (result.get("third_parties") or []) if isinstance(tp, dict)]
+    return {
+        "run_id": result.get("run_id"),
+        "rank": result.get("rank"),
+        "input": result.get("input"),
+        "site_etld1": site_key(result),
+        "final_url": result.get("final_url"),
+        "status": result.get("status"),
+        "error_code": result.get("error_code"),
+        "home_status_code": result.get("home_status_code"),
+        "home_fetch_mode": result.get("home_fetch_mode"),
+        "home_fetch_attempts": result.get("home_fetch_attempts"),
+        "non_browsable_reason": result.get("non_browsable_reason"),
+        "policy_url": fp.get("url"),
+        "policy_status_code": fp.get("status_code"),
+        "policy_likeliness_score": fp.get("likeliness_score"),
+        "policy_text_len": fp.get("text_len"),
+        "policy_text_len_raw": fp.get("text_len_raw"),
+        "policy_extraction_method": fp.get("extraction_method"),
+        "policy_text_sha256": fp.get("text_sha256"),
+        "third_party_count": len(third_parties),
+        "home_fetch_ms": result.get("home_fetch_ms"),
+        "policy_fetch_ms": result.get("policy_fetch_ms"),
+        "third_party_extract_ms": result.get("third_party_extract_ms"),
+        "third_party_policy_fetch_ms": result.get("third_party_policy_fetch_ms"),
+        "total_ms": result.get("total_ms"),
+        "started_at": result.get("started_at"),
+        "ended_at": result.get("ended_at"),
+    }
+
+
+def third_party_rows(result: dict[str, Any]) -> list[dict[str, Any]]:
+    site = site_key(result)
+    rows: list[dict[str, Any]] = []
+    for tp in result.get("third_parties") or []:
+        if not isinstance(tp, dict) or not tp.get("third_party_etld1"):
+            continue
+        prev = tp.get("prevalence")
+        rows.append({
+            "run_id": result.get("run_id"),
+            "site_etld1": site,
+            "rank": result.get("rank"),
+            "third_party_etld1": tp.get("third_party_etld1"),
+            "entity": tp.get("entity"),
+            "categories": [c for c in (tp.get("categories") or []) if isinstance(c, str) and c.strip()],
+            "prevalence": float(prev) if isinstance(prev, (int, float)) else None,
+            "policy_url": tp.get("policy_url"),
+            "mapping_source": mapping_source(tp),
+            "policy_extraction_method": tp.get("policy_extraction_method"),
+            "policy_text_sha256": tp.get("policy_text_sha256"),
+        })
+    return rows
+
+
+def policy_fetch_rows(result: dict[str, Any]) -> list[dict[str, Any]]:
+    site = site_key(result)
+    rows: list[dict[str, Any]] = []
+    for rec in result.get("third_party_policy_fetches") or []:
+        if not isinstance(rec, dict):
+            continue
+        rows.append({
+            "run_id": result.get("run_id"),
+            "site_etld1": site,
+            "third_party_etld1": rec.get("third_party_etld1"),
+            "policy_url": rec.get("policy_url"),
+            "fetch_success": rec.get("fetch_success"),
+            "status_code": rec.get("status_code"),
+            "text_len": rec.get("text_len"),
+            "text_len_raw": rec.get("text_len_raw"),
+            "extraction_method": rec.get("extraction_method"),
+            "text_sha256": rec.get("text_sha256"),
+            "error_message": rec.get("error_message"),
+        })
+    return rows
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from .records import (
+    POLICY_FETCH_COLUMNS,
+    SITE_COLUMNS,
+    THIRD_PARTY_COLUMNS,
+    policy_fetch_rows,
+    site_key,
+    site_row,
+    third_party_rows,
+)
+from .utils.logging import log
+
+_INTEGER_COLUMNS = {
+    "rank",
+    "home_status_code",
+    "home_fetch_attempts",
+    "policy_status_code",
+    "policy_text_len",
+    "policy_text_len_raw",
+    "third_party_count",
+    "home_fetch_ms",
+    "policy_fetch_ms",
+    "third_party_extract_ms",
+    "third_party_policy_fetch_ms",
+    "total_ms",
+    "status_code",
+    "text_len",
+    "text_len_raw",
+    "fetch_success",
+}
+_REAL_COLUMNS = {"policy_likeliness_score", "prevalence"}
+
+
+def _col_defs(columns: tuple[str, ...]) -> str:
+    defs = []
+    for c in columns:
+        typ = "INTEGER" if c in _INTEGER_COLUMNS else "REAL" if c in _REAL_COLUMNS else "TEXT"
+        defs.append(f"{c} {typ}")
+    return ", ".join(defs)
+
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sites (
+    id INTEGER PRIMARY KEY,
+    {_col_defs(SITE_COLUMNS)},
+    record TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS sites_run_site ON sites(run_id, site_etld1);
+CREATE INDEX IF NOT EXISTS sites_status_rank ON sites(status, rank);
+CREATE INDEX IF NOT EXISTS sites_rank ON sites(rank);
+CREATE INDEX IF NOT EXISTS sites_rank_key ON sites(COALESCE(rank, 9223372036854775807), id);
+CREATE INDEX IF NOT EXISTS sites_total_ms_key ON sites(COALESCE(total_ms, 0), id);
+CREATE INDEX IF NOT EXISTS sites_tp_count_key ON sites(COALESCE(third_party_count, 0), id);
+CREATE INDEX IF NOT EXISTS sites_site_key ON sites(COALESCE(site_etld1, ''), id);
+
+CREATE TABLE IF NOT EXISTS site_third_parties (
+    site_id INTEGER NOT NULL REFERENCES sites(id) ON DELETE CASCADE,
+    {_col_defs(THIRD_PARTY_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS tp_site ON site_third_parties(site_id);
+CREATE INDEX IF NOT EXISTS tp_entity ON site_third_parties(entity);
+CREATE INDEX IF NOT EXISTS tp_etld1 ON site_third_parties(third_party_etld1);
+
+CREATE TABLE IF NOT EXISTS third_party_categories (
+    site_id INTEGER NOT NULL REFERENCES sites(id) ON DELETE CASCADE,
+    third_party_etld1 TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tpc_site ON third_party_categories(site_id);
+CREATE INDEX IF NOT EXISTS tpc_category ON third_party_categories(category);
+
+CREATE TABLE IF NOT EXISTS policy_fetches (
+    site_id INTEGER NOT NULL REFERENCES sites(id) ON DELETE CASCADE,
+    {_col_defs(POLICY_FETCH_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS pf_site ON policy_fetches(site_id);
+CREATE INDEX IF NOT EXISTS pf_etld1 ON policy_fetches(third_party_etld1);
+CREATE INDEX IF NOT EXISTS pf_url ON policy_fetches(policy_url);
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+def _insert_sql(table: str, columns: tuple[str, ...], extra: tuple[str, ...] = ()) -> str:
+    cols = extra + columns
+    return f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+
+
+_INSERT_SITE = _insert_sql("sites", SITE_COLUMNS + ("record",))
+_INSERT_TP = _insert_sql("site_third_parties", THIRD_PARTY_COLUMNS, ("site_id",))
+_INSERT_PF = _insert_sql("policy_fetches", POLICY_FETCH_COLUMNS, ("site_id",))
+_INSERT_CAT = "INSERT INTO third_party_categories (site_id, third_party_etld1, category) VALUES (?, ?, ?)"
+
+# Sort keys usable for keyset pagination; each expression has a matching index.
+SORT_KEYS: dict[str, str] = {
+    "rank": "COALESCE(s.rank, 9223372036854775807)",
+    "total_ms": "COALESCE(s.total_ms, 0)",
+    "third_party_count": "COALESCE(s.third_party_count, 0)",
+    "site": "COALESCE(s.site_etld1, '')",
+}
+
+
+class ResultsDB:
+    """
+    Indexed SQLite mirror of `results.jsonl`.
+
+    Records are upserted by (run_id, site) in batched transactions, either live
+    from the crawl (`--results-db`) or by ingesting a JSONL file incrementally
+    (`privacy-dataset ingest`). Filtering by status, entity or category becomes
+    an index lookup instead of a full scan of the JSONL.
+    """
+
+    def __init__(self, path: str | Path, *, batch_size: int = 100, check_same_thread: bool = True) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        self._pending: list[dict[str, Any]] = []
+
+    def __enter__(self) -> "ResultsDB":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(self, result: dict[str, Any]) -> None:
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self.conn:
+            for result in self._pending:
+                self._upsert(result)
+        self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def _upsert(self, result: dict[str, Any]) -> None:
+        site = site_row(result)
+        self.conn.execute(
+            "DELETE FROM sites WHERE run_id IS ? AND site_etld1 IS ?",
+            (site["run_id"], site["site_etld1"]),
+        )
+        cur = self.conn.execute(
+            _INSERT_SITE,
+            [site[c] for c in SITE_COLUMNS] + [json.dumps(result, ensure_ascii=False)],
+        )
+        site_id = cur.lastrowid
+        for row in third_party_rows(result):
+            cats = row["categories"]
+            self.conn.execute(
+                _INSERT_TP,
+                [site_id] + [json.dumps(cats) if c == "categories" else row[c] for c in THIRD_PARTY_COLUMNS],
+            )
+            self.conn.executemany(
+                _INSERT_CAT,
+                [(site_id, row["third_party_etld1"], cat) for cat in cats],
+            )
+        for row in policy_fetch_rows(result):
+            self.conn.execute(_INSERT_PF, [site_id] + [row[c] for c in POLICY_FETCH_COLUMNS])
+
+    def ingest_jsonl(self, results_path: str | Path, *, full: bool = False) -> int:
+        """
+        Ingest new lines of a results JSONL. The byte offset of the last complete
+        line is stored with each batch, so re-running only reads what was appended.
+        """
+        key = str(Path(results_path).resolve())
+        offset = 0
+        if not full:
+            row = self.conn.execute("SELECT offset FROM ingest_state WHERE path = ?", (key,)).fetchone()
+            if row is not None:
+                offset = int(row["offset"])
+        if offset > Path(results_path).stat().st_size:
+            # File was truncated/rewritten: start over.
+            offset = 0
+
+        count = 0
+        batch: list[dict[str, Any]] = []
+        with Path(results_path).open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Partial line still being written by a live crawl.
+                    break
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(rec, dict) and site_key(rec):
+                    batch.append(rec)
+                if len(batch) >= self.batch_size:
+                    count += self._commit_batch(batch, key, offset)
+                    batch = []
+        count += self._commit_batch(batch, key, offset)
+        return count
+
+    def _commit_batch(self, batch: list[dict[str, Any]], key: str, offset: int) -> int:
+        with self.conn:
+            for rec in batch:
+                self._upsert(rec)
+            self.conn.execute(
+                "INSERT INTO ingest_state (path, offset) VALUES (?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET offset = excluded.offset",
+                (key, offset),
+            )
+        return len(batch)
+
+    def status_counts(self, run_id: str | None = None) -> dict[str, int]:
+        sql = "SELECT status, COUNT(*) AS n FROM sites"
+        params: list[Any] = []
+        if run_id is not None:
+            sql += " WHERE run_id = ?"
+            params.append(run_id)
+        sql += " GROUP BY status"
+        return {str(r["status"]): int(r["n"]) for r in self.conn.execute(sql, params)}
+
+    @staticmethod
+    def _filters(
+        status: str | None,
+        entity: str | None,
+        category: str | None,
+        third_party: str | None,
+    ) -> tuple[list[str], list[Any]]:
+        where: list[str] = []
+        params: list[Any] = []
+        if status:
+            where.append("s.status = ?")
+            params.append(status)
+        if entity:
+            where.append("s.id IN (SELECT site_id FROM site_third_parties WHERE entity = ?)")
+            params.append(entity)
+        if third_party:
+            where.append("s.id IN (SELECT site_id FROM site_third_parties WHERE third_party_etld1 = ?)")
+            params.append(third_party)
+        if category:
+            where.append("s.id IN (SELECT site_id FROM third_party_categories WHERE category = ?)")
+            params.append(category)
+        return where, params
+
+    def query_sites(
+        self,
+        *,
+        status: str | None = None,
+        entity: str | None = None,
+        category: str | None = None,
+        third_party: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Return full result records matching the filters, ordered by rank."""
+        where, params = self._filters(status, entity, category, third_party)
+        sql = "SELECT s.record FROM sites s"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.rank IS NULL, s.rank, s.id LIMIT ? OFFSET ?"
+        params.extend([int(limit), int(offset)])
+        return [json.loads(r["record"]) for r in self.conn.execute(sql, params)]
+
+    def page_sites(
+        self,
+        *,
+        sort: str = "rank",
+        descending: bool = False,
+        after: tuple[Any, int] | None = None,
+        limit: int = 100,
+        status: str | None = None,
+        entity: str | None = None,
+        category: str | None = None,
+        third_party: str | None = None,
+    ) -> tuple[list[dict[str, Any]], tuple[Any, int] | None]:
+        """
+        Keyset-paginated variant of `query_sites`: `after` is the cursor returned
+        by the previous page, so each page costs an index seek rather than an
+        OFFSET scan. Returns (records, next_cursor).
+        """
+        key = SORT_KEYS.get(sort)
+        if key is None:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        where, params = self._filters(status, entity, category, third_party)
+        if after is not None:
+            # Spelled out (rather than a row-value comparison) so SQLite seeks the index.
+            op = "<" if descending else ">"
+            where.append(f"{key} {op}= ? AND ({key} {op} ? OR s.id {op} ?)")
+            params.extend([after[0], after[0], int(after[1])])
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT s.id, {key} AS sort_key, s.record FROM sites s"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {key} {direction}, s.id {direction} LIMIT ?"
+        params.append(int(limit))
+        rows = self.conn.execute(sql, params).fetchall()
+        records = [json.loads(r["record"]) for r in rows]
+        next_cursor = (rows[-1]["sort_key"], int(rows[-1]["id"])) if len(rows) == int(limit) else None
+        return records, next_cursor
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset ingest",
+        description="Ingest a results JSONL into an indexed SQLite database (incremental by default).",
+    )
+    p.add_argument("--results", type=str, required=True, help="Path to results.jsonl.")
+    p.add_argument("--db", type=str, required=True, help="SQLite database path (created if missing).")
+    p.add_argument("--full", action="store_true", help="Re-read the whole JSONL instead of resuming from the last ingested offset.")
+    p.add_argument("--batch-size", type=int, default=1000, help="Records per transaction. Default: 1000")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    with ResultsDB(args.db, batch_size=args.batch_size) as db:
+        count = db.ingest_jsonl(args.results, full=args.full)
+        counts = db.status_counts()
+    log(f"Ingest: {count} records from {args.results} -> {args.db} (status counts: {counts})")
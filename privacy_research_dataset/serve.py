@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import parse_qs, unquote, urlparse
+
+from .results_db import SORT_KEYS, ResultsDB
+from .summary import site_to_explorer_record
+from .utils.logging import log, warn
+
+_MAX_PAGE = 500
+_FILTER_PARAMS = ("status", "entity", "category", "third_party")
+
+
+def _encode_cursor(cursor: tuple[Any, int] | None) -> str | None:
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(cursor)).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(raw: str | None) -> tuple[Any, int] | None:
+    if not raw:
+        return None
+    try:
+        value, site_id = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+        return value, int(site_id)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+class _RunIndex:
+    """SQLite index for one run folder, refreshed from its results.jsonl on demand."""
+
+    def __init__(self, run_dir: Path, refresh_s: float) -> None:
+        self.run_dir = run_dir
+        self.refresh_s = refresh_s
+        self.lock = threading.Lock()
+        self.db = ResultsDB(run_dir / "results.sqlite", batch_size=1000, check_same_thread=False)
+        self._refreshed_at = 0.0
+        # Guarded by RunCache's lock: requests using the index, and whether it left the cache.
+        self.users = 0
+        self.evicted = False
+
+    def refresh(self) -> None:
+        # Called with `lock` held. Incremental: only newly appended lines are read.
+        results = self.run_dir / "results.jsonl"
+        if not results.exists() or time.monotonic() - self._refreshed_at < self.refresh_s:
+            return
+        self.db.ingest_jsonl(results)
+        self._refreshed_at = time.monotonic()
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+
+class RunCache:
+    """
+    Opens run folders lazily and keeps the most recently used indexes open.
+    An index evicted while a request is still using it is closed when that
+    request releases it.
+    """
+
+    def __init__(self, outputs_dir: str | Path, *, max_open: int = 8, refresh_s: float = 5.0) -> None:
+        self.outputs_dir = Path(outputs_dir).resolve()
+        self.max_open = max(1, int(max_open))
+        self.refresh_s = refresh_s
+        self._lock = threading.Lock()
+        self._runs: OrderedDict[str, _RunIndex] = OrderedDict()
+
+    def run_dir(self, name: str) -> Path:
+        if not name or "/" in name or "\\" in name or name in (".", ".."):
+            raise KeyError(name)
+        p = self.outputs_dir / name
+        if not p.is_dir():
+            raise KeyError(name)
+        return p
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[_RunIndex]:
+        with self._lock:
+            idx = self._runs.get(name)
+            if idx is not None:
+                self._runs.move_to_end(name)
+            else:
+                idx = _RunIndex(self.run_dir(name), self.refresh_s)
+                self._runs[name] = idx
+                while len(self._runs) > self.max_open:
+                    _, old = self._runs.popitem(last=False)
+                    old.evicted = True
+                    if old.users == 0:
+                        old.close()
+            idx.users += 1
+        try:
+            yield idx
+        finally:
+            with self._lock:
+                idx.users -= 1
+                if idx.evicted and idx.users == 0:
+                    idx.close()
+
+    def list_runs(self) -> list[dict[str, Any]]:
+        runs = []
+        if not self.outputs_dir.exists():
+            return runs
+        for p in sorted(self.outputs_dir.iterdir()):
+            if not p.is_dir():
+                continue
+            results = p / "results.jsonl"
+            runs.append({
+                "name": p.name,
+                "has_results": results.exists(),
+                "results_bytes": results.stat().st_size if results.exists() else 0,
+                "has_summary": (p / "results.summary.json").exists(),
+                "has_state": (p / "run_state.json").exists(),
+                "mtime": p.stat().st_mtime,
+            })
+        return runs
+
+    def close(self) -> None:
+        with self._lock:
+            for idx in self._runs.values():
+                idx.close()
+            self._runs.clear()
+
+
+def _page_params(query: dict[str, list[str]]) -> dict[str, Any]:
+    def first(name: str) -> str | None:
+        vals = query.get(name)
+        return vals[0] if vals else None
+
+    sort = first("sort") or "rank"
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(sorted(SORT_KEYS))}")
+    limit = min(_MAX_PAGE, max(1, int(first("limit") or 100)))
+    params: dict[str, Any] = {
+        "sort": sort,
+        "descending": descending,
+        "limit": limit,
+        "after": _decode_cursor(first("cursor")),
+    }
+    for name in _FILTER_PARAMS:
+        params[name] = first(name)
+    return params
+
+
+def _make_handler(cache: RunCache, *, allow_origin: str | None = None) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "privacy-dataset"
+
+        def _cors(self) -> None:
+            # Off by default: any page open in the user's browser could read run data otherwise.
+            if allow_origin:
+                self.send_header("Access-Control-Allow-Origin", allow_origin)
+                self.send_header("Vary", "Origin")
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def _send_json(self, obj: Any, status: int = 200) -> None:
+            body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self._cors()
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_text(self, text: str) -> None:
+            body = text.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self._cors()
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            parsed = urlparse(self.path)
+            parts = [unquote(p) for p in parsed.path.split("/") if p]
+            query = parse_qs(parsed.query)
+            try:
+                if parts == ["api", "runs"]:
+                    return self._send_json({"runs": cache.list_runs()})
+                if len(parts) == 4 and parts[:2] == ["api", "runs"]:
+                    return self._run_endpoint(parts[2], parts[3], query)
+                return self._send_json({"error": "not_found"}, 404)
+            except KeyError:
+                return self._send_json({"error": "run_not_found"}, 404)
+            except ValueError as e:
+                return self._send_json({"error": str(e)}, 400)
+            except Exception as e:
+                warn(f"serve: {self.path} failed: {e}")
+                return self._send_json({"error": "internal_error"}, 500)
+
+        def _run_endpoint(self, run: str, what: str, query: dict[str, list[str]]) -> None:
+            if what in ("summary", "state"):
+                fname = "results.summary.json" if what == "summary" else "run_state.json"
+                p = cache.run_dir(run) / fname
+                if not p.exists():
+                    return self._send_json({"error": f"{fname}_missing"}, 404)
+                return self._send_json(json.loads(p.read_text(encoding="utf-8")))
+
+            if what in ("results", "explorer"):
+                params = _page_params(query)
+                with cache.use(run) as idx, idx.lock:
+                    idx.refresh()
+                    records, next_cursor = idx.db.page_sites(**params)
+                items = records if what == "results" else [site_to_explorer_record(r) for r in records]
+                return self._send_json({"items": items, "next_cursor": _encode_cursor(next_cursor)})
+
+            if what == "status_counts":
+                with cache.use(run) as idx, idx.lock:
+                    idx.refresh()
+                    counts = idx.db.status_counts()
+                return self._send_json({"status_counts": counts})
+
+            if what == "artifacts":
+                site = (query.get("site") or [""])[0]
+                root = (cache.run_dir(run) / "artifacts").resolve()
+                site_dir = (root / site).resolve()
+                if not site or site_dir.parent != root or not site_dir.is_dir():
+                    return self._send_json({"error": "site_not_found"}, 404)
+                files = sorted(str(p.relative_to(root)) for p in site_dir.rglob("*") if p.is_file())
+                return self._send_json({"files": files})
+
+            if what == "artifact":
+                rel = (query.get("path") or [""])[0]
+                root = (cache.run_dir(run) / "artifacts").resolve()
+                target = (root / rel).resolve()
+                if not rel or root not in target.parents or not target.is_file():
+                    return self._send_json({"error": "artifact_not_found"}, 404)
+                return self._send_text(target.read_text(encoding="utf-8", errors="replace"))
+
+            return self._send_json({"error": "not_found"}, 404)
+
+    return Handler
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset serve",
+        description=(
+            "Serve paginated, filterable run data on localhost: "
+            "/api/runs, /api/runs/<run>/{results,explorer,summary,state,status_counts,artifacts,artifact}."
+        ),
+    )
+    p.add_argument("--outputs-dir", type=str, default="outputs", help="Folder containing run folders (output_<runid>/). Default: outputs")
+    p.add_argument("--port", type=int, default=8765, help="Port to listen on (127.0.0.1 only). Default: 8765")
+    p.add_argument("--max-open-runs", type=int, default=8, help="Run indexes kept open at once. Default: 8")
+    p.add_argument("--refresh-s", type=float, default=5.0, help="Minimum seconds between re-reads of a run's results.jsonl. Default: 5")
+    p.add_argument(
+        "--allow-origin",
+        type=str,
+        default=None,
+        help="Send Access-Control-Allow-Origin for this origin (e.g. http://localhost:3000) so a local web UI can call the API. Default: no CORS.",
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    cache = RunCache(args.outputs_dir, max_open=args.max_open_runs, refresh_s=args.refresh_s)
+    server = ThreadingHTTPServer(("127.0.0.1", int(args.port)), _make_handler(cache, allow_origin=args.allow_origin))
+    log(f"Serving {cache.outputs_dir} on http://127.0.0.1:{server.server_port}/api/runs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache.close()
@@ -1,15 +1,58 @@
 from __future__ import annotations
 
+import argparse
+import json
 from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+from .utils.io import write_json
+from .utils.logging import log
+from .utils.sketches import HeavyHitters
+
+_STATE_VERSION = 1
+_INT_FIELDS = (
+    "total_sites",
+    "processed_sites",
+    "third_party_total",
+    "third_party_mapped",
+    "third_party_unmapped",
+    "third_party_no_policy_url",
+    "third_party_radar_mapped",
+    "third_party_trackerdb_mapped",
+)
+_COUNTER_FIELDS = ("category_counts", "entity_counts", "unmapped_domain_counts")
+
+
+def _counter_state(c: Counter | HeavyHitters) -> dict[str, Any]:
+    if isinstance(c, HeavyHitters):
+        return {"approx": c.to_state()}
+    return {"exact": dict(c)}
+
+
+def _counter_from_state(state: dict[str, Any]) -> Counter | HeavyHitters:
+    if "approx" in state:
+        return HeavyHitters.from_state(state["approx"])
+    return Counter({str(k): int(v) for k, v in state.get("exact", {}).items()})
+
+
 @dataclass
 class SummaryBuilder:
+    """
+    Incremental run summary.
+
+    With `approx_top_k` set, entity/category/unmapped-domain counts are kept in
+    bounded `HeavyHitters` sketches and per-entity side statistics are only
+    retained for monitored entities, so memory stays flat on huge runs. Builders
+    for shards of a run can be combined with `merge()`, and `to_state()` /
+    `from_state()` round-trip a builder through JSON.
+    """
+
     run_id: str
     total_sites: int
     mapping_mode: str | None = None
+    approx_top_k: int | None = None
     processed_sites: int = 0
     status_counts: Counter = field(default_factory=Counter)
     third_party_total: int = 0
@@ -18,14 +61,24 @@ class SummaryBuilder:
     third_party_no_policy_url: int = 0
     third_party_radar_mapped: int = 0
     third_party_trackerdb_mapped: int = 0
-    category_counts: Counter = field(default_factory=Counter)
-    entity_counts: Counter = field(default_factory=Counter)
+    category_counts: Counter | HeavyHitters = field(default_factory=Counter)
+    entity_counts: Counter | HeavyHitters = field(default_factory=Counter)
+    unmapped_domain_counts: Counter | HeavyHitters = field(default_factory=Counter)
     entity_prevalence_sum: dict[str, float] = field(default_factory=dict)
     entity_prevalence_max: dict[str, float] = field(default_factory=dict)
     entity_categories: dict[str, Counter] = field(default_factory=dict)
     started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat(timespec="seconds") + "Z")
     updated_at: str | None = None
 
+    def __post_init__(self) -> None:
+        if self.approx_top_k:
+            for name in _COUNTER_FIELDS:
+                current = getattr(self, name)
+                if not isinstance(current, HeavyHitters):
+                    hh = HeavyHitters(self.approx_top_k)
+                    hh.update(current)
+                    setattr(self, name, hh)
+
     def update(self, result: dict[str, Any]) -> None:
         self.processed_sites += 1
         status = str(result.get("status") or "unknown")
@@ -47,6 +100,9 @@ class SummaryBuilder:
                 self.third_party_mapped += 1
             else:
                 self.third_party_unmapped += 1
+                domain = tp.get("third_party_etld1")
+                if isinstance(domain, str) and domain:
+                    self.unmapped_domain_counts.update([domain])
 
             if mapped and not tp.get("policy_url"):
                 self.third_party_no_policy_url += 1
@@ -58,11 +114,13 @@ class SummaryBuilder:
 
             for cat in tp.get("categories") or []:
                 if isinstance(cat, str) and cat.strip():
-                    self.category_counts[cat] += 1
+                    self.category_counts.update([cat])
 
             entity = tp.get("entity")
             if isinstance(entity, str) and entity.strip():
-                self.entity_counts[entity] += 1
+                self.entity_counts.update([entity])
+                if self.approx_top_k and entity not in self.entity_counts:
+                    continue
                 prev = tp.get("prevalence")
                 if isinstance(prev, (int, float)):
                     self.entity_prevalence_sum[entity] = self.entity_prevalence_sum.get(entity, 0.0) + float(prev)
@@ -73,8 +131,92 @@ class SummaryBuilder:
                         self.entity_categories[entity] = Counter()
                     self.entity_categories[entity].update(cats)
 
+        if self.approx_top_k:
+            self._prune_entity_stats()
         self.updated_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
 
+    def _prune_entity_stats(self) -> None:
+        # Side statistics for entities evicted from the sketch are dropped in
+        # bulk once they outgrow the monitored set.
+        limit = 2 * int(self.approx_top_k or 0)
+        if len(self.entity_prevalence_sum) <= limit and len(self.entity_categories) <= limit:
+            return
+        for d in (self.entity_prevalence_sum, self.entity_prevalence_max, self.entity_categories):
+            for name in [n for n in d if n not in self.entity_counts]:
+                del d[name]
+
+    def merge(self, other: "SummaryBuilder") -> "SummaryBuilder":
+        """Fold another builder (e.g. a shard of the same run) into this one."""
+        if other.approx_top_k and not self.approx_top_k:
+            self.approx_top_k = other.approx_top_k
+            self.__post_init__()
+        for name in _INT_FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.status_counts.update(other.status_counts)
+        for name in _COUNTER_FIELDS:
+            mine = getattr(self, name)
+            theirs = getattr(other, name)
+            if isinstance(mine, HeavyHitters):
+                mine.merge(theirs)
+            else:
+                mine.update(theirs)
+        for name, value in other.entity_prevalence_sum.items():
+            self.entity_prevalence_sum[name] = self.entity_prevalence_sum.get(name, 0.0) + value
+        for name, value in other.entity_prevalence_max.items():
+            self.entity_prevalence_max[name] = max(self.entity_prevalence_max.get(name, 0.0), value)
+        for name, cats in other.entity_categories.items():
+            self.entity_categories.setdefault(name, Counter()).update(cats)
+        if self.mapping_mode != other.mapping_mode:
+            self.mapping_mode = self.mapping_mode or other.mapping_mode
+        self.started_at = min(self.started_at, other.started_at)
+        if other.updated_at and (not self.updated_at or other.updated_at > self.updated_at):
+            self.updated_at = other.updated_at
+        if self.approx_top_k:
+            self._prune_entity_stats()
+        return self
+
+    def to_state(self) -> dict[str, Any]:
+        state: dict[str, Any] = {
+            "version": _STATE_VERSION,
+            "run_id": self.run_id,
+            "mapping_mode": self.mapping_mode,
+            "approx_top_k": self.approx_top_k,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "status_counts": dict(self.status_counts),
+            "entity_prevalence_sum": self.entity_prevalence_sum,
+            "entity_prevalence_max": self.entity_prevalence_max,
+            "entity_categories": {k: dict(v) for k, v in self.entity_categories.items()},
+        }
+        for name in _INT_FIELDS:
+            state[name] = getattr(self, name)
+        for name in _COUNTER_FIELDS:
+            state[name] = _counter_state(getattr(self, name))
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "SummaryBuilder":
+        if state.get("version") != _STATE_VERSION:
+            raise ValueError(f"Unsupported summary state version: {state.get('version')!r}")
+        b = cls(
+            run_id=str(state.get("run_id") or ""),
+            total_sites=int(state.get("total_sites") or 0),
+            mapping_mode=state.get("mapping_mode"),
+            approx_top_k=state.get("approx_top_k"),
+            status_counts=Counter(state.get("status_counts") or {}),
+            category_counts=_counter_from_state(state["category_counts"]),
+            entity_counts=_counter_from_state(state["entity_counts"]),
+            unmapped_domain_counts=_counter_from_state(state["unmapped_domain_counts"]),
+            entity_prevalence_sum={k: float(v) for k, v in (state.get("entity_prevalence_sum") or {}).items()},
+            entity_prevalence_max={k: float(v) for k, v in (state.get("entity_prevalence_max") or {}).items()},
+            entity_categories={k: Counter(v) for k, v in (state.get("entity_categories") or {}).items()},
+            started_at=state.get("started_at") or datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            updated_at=state.get("updated_at"),
+        )
+        for name in _INT_FIELDS:
+            setattr(b, name, int(state.get(name) or 0))
+        return b
+
     def to_summary(self) -> dict[str, Any]:
         success = self.status_counts.get("ok", 0)
         success_rate = round((success / self.processed_sites) * 100, 2) if self.processed_sites else 0.0
@@ -102,6 +244,11 @@ class SummaryBuilder:
                 "categories": cats,
             })
 
+        unmapped_domains = [
+            {"name": name, "count": count}
+            for name, count in self.unmapped_domain_counts.most_common(20)
+        ]
+
         return {
             "run_id": self.run_id,
             "total_sites": self.total_sites,
@@ -122,6 +269,8 @@ class SummaryBuilder:
             },
             "categories": categories,
             "entities": entities,
+            "unmapped_domains": unmapped_domains,
+            "approximate": bool(self.approx_top_k),
             "started_at": self.started_at,
             "updated_at": self.updated_at,
         }
@@ -161,3 +310,28 @@ def site_to_explorer_record(result: dict[str, Any]) -> dict[str, Any]:
         "extractionMethod": first_party_policy.get("extraction_method"),
         "thirdParties": third_parties_out,
     }
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset merge-summaries",
+        description="Merge summary states written with --summary-state-out (e.g. one per shard) into one summary.",
+    )
+    p.add_argument("states", nargs="+", help="Summary state JSON files.")
+    p.add_argument("--out", type=str, required=True, help="Merged summary JSON.")
+    p.add_argument("--state-out", type=str, default=None, help="Also write the merged state (for further merging).")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    merged: SummaryBuilder | None = None
+    for path in args.states:
+        with open(path, "r", encoding="utf-8") as f:
+            builder = SummaryBuilder.from_state(json.load(f))
+        merged = builder if merged is None else merged.merge(builder)
+    assert merged is not None
+    write_json(args.out, merged.to_summary())
+    if args.state_out:
+        write_json(args.state_out, merged.to_state())
+    log(f"Merged {len(args.states)} summary states ({merged.processed_sites} sites) -> {args.out}")
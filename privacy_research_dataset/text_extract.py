@@ -1,19 +1,25 @@
 from __future__ import annotations
 
-from typing import Literal
+from functools import lru_cache
+from typing import Any, Literal
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
-
 from .utils.logging import warn
 
-try:
-    import trafilatura  # type: ignore
-except Exception:
-    trafilatura = None
+
+@lru_cache(maxsize=None)
+def _trafilatura() -> Any | None:
+    # Imported on first extraction: trafilatura pulls in lxml, courlan, urllib3, ...
+    try:
+        import trafilatura  # type: ignore
+    except Exception:
+        return None
+    return trafilatura
 
 
 def _bs4_extract(html: str) -> str | None:
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html, "lxml")
         text = "\n".join([ln.strip() for ln in soup.get_text("\n").splitlines() if ln.strip()])
@@ -58,6 +64,8 @@ def _extract_onetrust_notice_container(
     if not _is_onetrust_source(source_url) and "otnotice" not in html.lower():
         return None
 
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html, "lxml")
     except Exception:
@@ -139,6 +147,7 @@ def extract_main_text_with_method(
     if onetrust_text:
         return onetrust_text, "onetrust_container"
 
+    trafilatura = _trafilatura()
     if trafilatura is not None:
         # Prefer markdown to keep headings/lists for downstream section parsing.
         try:
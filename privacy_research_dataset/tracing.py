@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import json
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+from .utils.io import iter_jsonl, write_json
+from .utils.logging import log
+
+
+class Span:
+    """One timed operation. Ids are OTLP-sized hex (16-byte trace, 8-byte span)."""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "start_unix_ns", "attributes", "status", "_t0")
+
+    def __init__(self, name: str, parent: Span | None, attributes: dict[str, Any]) -> None:
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.start_unix_ns = time.time_ns()
+        self.attributes = attributes
+        self.status = "ok"
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_ms": round(self.start_unix_ns / 1e6, 3),
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000, 2),
+            "status": self.status,
+            "attributes": {k: v for k, v in self.attributes.items() if v is not None},
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        return
+
+
+_NOOP = _NoopSpan()
+
+
+class JsonlSpanExporter:
+    """Appends one JSON object per finished span; flushed whenever a root span ends."""
+
+    def __init__(self, path: str | Path) -> None:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self.path = p
+        self._f = p.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, rec: dict[str, Any]) -> None:
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+            if rec["parent_span_id"] is None:
+                self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+_exporter: JsonlSpanExporter | None = None
+_current: ContextVar[Span | None] = ContextVar("privacy_dataset_span", default=None)
+
+
+def configure(exporter: JsonlSpanExporter | None) -> None:
+    """Install (or with None, remove) the process-wide exporter. Tracing is off without one."""
+    global _exporter
+    _exporter = exporter
+
+
+def shutdown() -> None:
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+    _exporter = None
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if tracing."""
+    s = _current.get()
+    if s is not None:
+        s.attributes.update(attributes)
+
+
+def current() -> Span | None:
+    """The current span, to hand to work that runs in another task (see `use`)."""
+    return _current.get()
+
+
+@contextmanager
+def use(parent: Span | None) -> Iterator[None]:
+    """
+    Make `parent` the current span for the enclosed block, so spans opened in
+    a long-lived worker task nest under the item's own trace.
+    """
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """
+    Time the enclosed block as a child of the current span (per asyncio task,
+    via contextvars). A no-op unless an exporter is configured.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield _NOOP
+        return
+    s = Span(name, _current.get(), attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes["error"] = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        _current.reset(token)
+        exporter.export(s.to_record())
+
+
+# ---------------------------
+# trace-report
+# ---------------------------
+
+# Start times are wall clock, durations perf_counter; allow for the skew.
+_CLOCK_SLACK_MS = 1.0
+
+
+def _end(s: dict[str, Any]) -> float:
+    return s["start_ms"] + s["duration_ms"]
+
+
+def _describe(s: dict[str, Any]) -> str:
+    a = s.get("attributes") or {}
+    bits = [s["name"]]
+    for k in ("tier", "attempt", "source", "status_code", "bytes", "error_class"):
+        if a.get(k) is not None:
+            bits.append(f"{k}={a[k]}")
+    if a.get("url") or a.get("site"):
+        bits.append(str(a.get("url") or a.get("site")))
+    return " ".join(bits)
+
+
+def load_traces(path: str | Path) -> dict[str, list[dict[str, Any]]]:
+    traces: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for rec in iter_jsonl(path):
+        if "trace_id" in rec and "span_id" in rec:
+            traces[rec["trace_id"]].append(rec)
+    return dict(traces)
+
+
+def _root(spans: list[dict[str, Any]]) -> dict[str, Any] | None:
+    roots = [s for s in spans if not s.get("parent_span_id")]
+    return max(roots, key=lambda s: s["duration_ms"]) if roots else None
+
+
+def critical_path(spans: list[dict[str, Any]]) -> list[tuple[int, dict[str, Any]]]:
+    """
+    (depth, span) pairs on the critical path of one trace: from the root,
+    repeatedly take the child that finished last, then the latest child that
+    finished before it started, and so on; recurse into each.
+    """
+    root = _root(spans)
+    if root is None:
+        return []
+    children: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        if s.get("parent_span_id"):
+            children[s["parent_span_id"]].append(s)
+
+    out: list[tuple[int, dict[str, Any]]] = []
+
+    def walk(s: dict[str, Any], depth: int) -> None:
+        out.append((depth, s))
+        chain = []
+        limit = _end(s)
+        for c in sorted(children.get(s["span_id"], []), key=_end, reverse=True):
+            if _end(c) <= limit + _CLOCK_SLACK_MS:
+                chain.append(c)
+                limit = c["start_ms"]
+        for c in reversed(chain):
+            walk(c, depth + 1)
+
+    walk(root, 0)
+    return out
+
+
+def trace_report(
+    traces: dict[str, list[dict[str, Any]]],
+    *,
+    top: int = 20,
+    name: str | None = None,
+    sites: int = 5,
+    site: str | None = None,
+) -> dict[str, Any]:
+    site_of: dict[str, str] = {}
+    for tid, spans in traces.items():
+        root = _root(spans)
+        if root is not None:
+            site_of[tid] = str((root.get("attributes") or {}).get("site") or "")
+
+    all_spans = [s for spans in traces.values() for s in spans if s.get("parent_span_id")]
+    if name:
+        all_spans = [s for s in all_spans if s["name"] == name]
+    slowest = sorted(all_spans, key=lambda s: s["duration_ms"], reverse=True)[:top]
+
+    roots = [(tid, _root(spans)) for tid, spans in traces.items()]
+    roots = [(tid, r) for tid, r in roots if r is not None and (not site or site in site_of.get(tid, ""))]
+    roots.sort(key=lambda x: x[1]["duration_ms"], reverse=True)
+
+    return {
+        "traces": len(traces),
+        "spans": sum(len(v) for v in traces.values()),
+        "slowest_spans": [
+            {
+                "site": site_of.get(s["trace_id"]),
+                "name": s["name"],
+                "duration_ms": s["duration_ms"],
+                "status": s.get("status"),
+                "attributes": s.get("attributes") or {},
+            }
+            for s in slowest
+        ],
+        "critical_paths": [
+            {
+                "site": site_of.get(tid),
+                "duration_ms": r["duration_ms"],
+                "path": [
+                    {
+                        "depth": depth,
+                        "name": s["name"],
+                        "offset_ms": s["start_ms"] - r["start_ms"],
+                        "duration_ms": s["duration_ms"],
+                        "status": s.get("status"),
+                        "attributes": s.get("attributes") or {},
+                    }
+                    for depth, s in critical_path(traces[tid])
+                ],
+            }
+            for tid, r in roots[: max(0, sites)]
+        ],
+    }
+
+
+def format_trace_report(report: dict[str, Any]) -> str:
+    lines = [f"{report['traces']} traces, {report['spans']} spans", "", "Slowest spans:"]
+    for s in report["slowest_spans"]:
+        desc = _describe(s)
+        err = "" if s.get("status") == "ok" else "  [error]"
+        lines.append(f"  {s['duration_ms']:>10.0f} ms  {s.get('site') or '-':<30} {desc}{err}")
+    for cp in report["critical_paths"]:
+        lines += ["", f"Critical path: {cp['site']} ({cp['duration_ms']:.0f} ms)"]
+        for step in cp["path"]:
+            indent = "  " * step["depth"]
+            err = "" if step.get("status") == "ok" else "  [error]"
+            lines.append(f"  +{step['offset_ms']:>8.0f} {step['duration_ms']:>9.0f} ms  {indent}{_describe(step)}{err}")
+    return "\n".join(lines)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="privacy-dataset trace-report",
+        description="Slowest spans and per-site critical paths from a crawl's --trace-out file.",
+    )
+    p.add_argument("--traces", type=str, required=True, help="Span JSONL written by --trace-out.")
+    p.add_argument("--top", type=int, default=20, help="Slowest spans to list. Default: 20")
+    p.add_argument("--name", type=str, default=None, help="Only rank spans with this name (e.g. fetch, policy_candidate).")
+    p.add_argument("--sites", type=int, default=5, help="Critical paths to print, slowest sites first. Default: 5")
+    p.add_argument("--site", type=str, default=None, help="Only show critical paths for sites containing this substring.")
+    p.add_argument("--out", type=str, default=None, help="Also write the report as JSON here.")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    traces = load_traces(args.traces)
+    report = trace_report(traces, top=args.top, name=args.name, sites=args.sites, site=args.site)
+    if args.out:
+        write_json(args.out, report)
+        log(f"Trace report -> {args.out}")
+    print(format_trace_report(report))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import re
+
+# Ordered: first match wins. Messages come from aiohttp, Playwright/Crawl4AI
+# and our own status strings ("http_status_503", "non_html_content_type:...").
+# Patterns match specific error tokens, not bare words like "ssl" or "dns":
+# those show up in host names and in aiohttp's "ssl:default" boilerplate.
+# Connect/refused/reset come before dns/tls because aiohttp prefixes every
+# connection failure with "Cannot connect to host ... ssl:...".
+_ERROR_CLASSES: list[tuple[str, re.Pattern[str]]] = [
+    ("circuit_open", re.compile(r"\bhost_circuit_open\b", re.I)),
+    ("timeout", re.compile(r"timeout|timed[ _]out|\bdeadline exceeded\b", re.I)),
+    ("connection_refused", re.compile(
+        r"err_connection_refused|connection refused|connect call failed|\berrno 111\b", re.I,
+    )),
+    ("connection_reset", re.compile(
+        r"err_connection_(?:reset|closed|aborted)|connection (?:reset|aborted)|server disconnected"
+        r"|err_empty_response|\berrno 104\b",
+        re.I,
+    )),
+    ("dns", re.compile(
+        r"err_name_not_resolved|err_name_resolution_failed|\bgetaddrinfo\b|name or service not known"
+        r"|nodename nor servname|temporary failure in name resolution|no address associated with hostname",
+        re.I,
+    )),
+    ("tls", re.compile(
+        r"err_cert_\w+|err_ssl_\w+|\b\w*ssl\w*error\b|\w*certificateerror\b|\[ssl: \w+\]"
+        r"|certificate verify failed|\btlsv1[\d.]* alert\b|wrong version number",
+        re.I,
+    )),
+    ("http_4xx", re.compile(r"\bhttp_status_4\d\d\b", re.I)),
+    ("http_5xx", re.compile(r"\bhttp_status_5\d\d\b", re.I)),
+    ("non_html", re.compile(r"\bnon_html_content_type\b|\bhtml_marker_missing\b", re.I)),
+    ("empty_body", re.compile(r"\bempty_body\b|\bempty output\b", re.I)),
+    ("browser_crash", re.compile(
+        r"target (?:page, context or browser )?(?:has been )?closed|browser has disconnected|\bcrash(?:ed)?\b"
+        r"|err_crashed",
+        re.I,
+    )),
+    ("navigation", re.compile(r"net::err_|\bnavigation\b|err_aborted|err_too_many_redirects|too many redirects", re.I)),
+]
+
+# Parts of a message that name the target rather than the failure: URLs, the
+# host in aiohttp's "Cannot connect to host example.com:443" and its
+# "ssl:default" / "ssl:True" / "ssl:<SSLContext ...>" connector setting.
+_NOISE = re.compile(r"\b[a-z][a-z0-9+.-]*://[^\s'\"<>()\[\]]+|\bto host \S+|\bssl:(?:<[^>]*>|\S+)", re.I)
+
+
+def classify_error(message: str | None) -> str:
+    """Map a free-form fetch error message to a small, stable error class."""
+    if not message:
+        return "none"
+    message = _NOISE.sub(" ", message)
+    for name, pattern in _ERROR_CLASSES:
+        if pattern.search(message):
+            return name
+    return "other"
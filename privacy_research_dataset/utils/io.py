@@ -1,7 +1,11 @@
 from __future__ import annotations
 import json
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
+
+def safe_dirname(s: str) -> str:
+    """Directory name used for a site (or third party) under the artifacts dir."""
+    return "".join(ch if ch.isalnum() or ch in ("-", "_", ".") else "_" for ch in s)[:200]
 
 def write_jsonl(path: str | Path, records: Iterable[dict[str, Any]]) -> None:
     p = Path(path)
@@ -20,3 +24,17 @@ def write_json(path: str | Path, obj: Any) -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+
+def iter_jsonl(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Stream records from a JSONL file, skipping blank or malformed lines."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict):
+                yield rec
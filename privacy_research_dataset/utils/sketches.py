@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from typing import Any, Iterable, Mapping
+
+
+class CountMinSketch:
+    """Count-min sketch over strings; estimates never undercount, overcount <= e/width * N."""
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        self.width = int(width)
+        self.depth = int(depth)
+        self.rows: list[list[int]] = [[0] * self.width for _ in range(self.depth)]
+
+    def _cells(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item: str, n: int = 1) -> int:
+        est = None
+        for row, cell in zip(self.rows, self._cells(item)):
+            row[cell] += n
+            est = row[cell] if est is None else min(est, row[cell])
+        return int(est or 0)
+
+    def estimate(self, item: str) -> int:
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(item)))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Cannot merge count-min sketches with different dimensions.")
+        for mine, theirs in zip(self.rows, other.rows):
+            for i, v in enumerate(theirs):
+                if v:
+                    mine[i] += v
+
+    def to_state(self) -> dict[str, Any]:
+        return {"width": self.width, "depth": self.depth, "rows": self.rows}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "CountMinSketch":
+        cms = cls(width=int(state["width"]), depth=int(state["depth"]))
+        cms.rows = [list(map(int, row)) for row in state["rows"]]
+        return cms
+
+
+class HeavyHitters:
+    """
+    Bounded top-K counter (space-saving style) backed by a count-min sketch.
+
+    At most `capacity` items are monitored. Their counts are read from the
+    sketch, so an item that is evicted and later re-admitted keeps its history
+    instead of restarting at the space-saving minimum. Mergeable: sketches add
+    up and the monitored sets are unioned and re-trimmed.
+
+    Exposes the subset of the `Counter` API that `SummaryBuilder` uses.
+    """
+
+    def __init__(self, capacity: int = 1000, *, width: int = 2048, depth: int = 4) -> None:
+        self.capacity = max(1, int(capacity))
+        self.sketch = CountMinSketch(width=width, depth=depth)
+        self.counts: dict[str, int] = {}
+        self._floor = 0  # lower bound of the smallest monitored count
+
+    def add(self, item: str, n: int = 1) -> None:
+        est = self.sketch.add(item, n)
+        if item in self.counts or len(self.counts) < self.capacity:
+            self.counts[item] = est
+            return
+        if est <= self._floor:
+            return
+        victim = min(self.counts, key=self.counts.__getitem__)
+        self._floor = self.counts[victim]
+        if est > self._floor:
+            del self.counts[victim]
+            self.counts[item] = est
+
+    def update(self, items: Iterable[str] | Mapping[str, int]) -> None:
+        if isinstance(items, Mapping):
+            for item, n in items.items():
+                self.add(item, int(n))
+        else:
+            for item in items:
+                self.add(item)
+
+    def get(self, item: str, default: Any = None) -> Any:
+        return self.counts.get(item, default)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def keys(self) -> Iterable[str]:
+        return self.counts.keys()
+
+    def items(self) -> Iterable[tuple[str, int]]:
+        return self.counts.items()
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        return Counter(self.counts).most_common(n)
+
+    def merge(self, other: "HeavyHitters | Mapping[str, int]") -> None:
+        if isinstance(other, HeavyHitters):
+            self.sketch.merge(other.sketch)
+            candidates = set(self.counts) | set(other.counts)
+        else:
+            for item, n in other.items():
+                self.sketch.add(item, int(n))
+            candidates = set(self.counts) | set(other.keys())
+        ranked = sorted(((self.sketch.estimate(c), c) for c in candidates), reverse=True)
+        self.counts = {c: est for est, c in ranked[: self.capacity]}
+        self._floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "sketch": self.sketch.to_state(),
+            "counts": self.counts,
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "HeavyHitters":
+        sketch = CountMinSketch.from_state(state["sketch"])
+        hh = cls(int(state["capacity"]), width=sketch.width, depth=sketch.depth)
+        hh.sketch = sketch
+        hh.counts = {str(k): int(v) for k, v in state["counts"].items()}
+        hh._floor = min(hh.counts.values()) if len(hh.counts) >= hh.capacity else 0
+        return hh
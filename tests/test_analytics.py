@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("scipy")
+
+from privacy_research_dataset.analytics import compute_analytics, load_matrices
+
+
+def _site(rank: int, status: str, entities: list[str]) -> dict:
+    return {
+        "rank": rank,
+        "site_etld1": f"site{rank}.com",
+        "status": status,
+        "third_parties": [
+            {"third_party_etld1": f"{e.lower()}.com", "entity": e, "categories": ["Ads" if e != "G" else "Analytics"]}
+            for e in entities
+        ],
+    }
+
+
+def test_analytics_counts_sites_not_domains():
+    results = [
+        _site(1, "ok", ["G", "G", "F"]),
+        _site(2, "ok", ["G", "F"]),
+        _site(3, "policy_not_found", ["G"]),
+        _site(5000, "ok", ["F"]),
+        _site(6, "home_fetch_failed", ["G"]),
+    ]
+    sm = load_matrices(results)
+    a = compute_analytics(sm, buckets=[10, 100], min_pair_sites=1)
+    assert a["sites"] == 4
+    assert a["entity_reach"][0] == {"entity": "G", "sites": 3, "share": 0.75}
+    assert {c["category"]: c["sites"] for c in a["category_reach"]} == {"Analytics": 3, "Ads": 3}
+    buckets = {b["bucket"]: b for b in a["rank_buckets"]}
+    assert buckets["1-10"]["sites"] == 3 and buckets[">100"]["sites"] == 1
+    assert buckets["1-10"]["entities"][0] == {"entity": "G", "sites": 3, "share": 1.0}
+    (pair,) = a["cooccurrence"]
+    assert {pair["a"], pair["b"]} == {"G", "F"} and pair["sites"] == 2
+    assert pair["jaccard"] == pytest.approx(0.5)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+
+from privacy_research_dataset.browser_pool import BrowserPool
+from privacy_research_dataset.crawl4ai_client import Crawl4AIResult
+
+
+class FakeClient:
+    instances: list["FakeClient"] = []
+
+    def __init__(self) -> None:
+        self.opened = self.closed = False
+        self.crash_next = False
+        self.fetched: list[str] = []
+        FakeClient.instances.append(self)
+
+    async def __aenter__(self) -> "FakeClient":
+        self.opened = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.closed = True
+
+    async def fetch(self, url: str, **kwargs) -> Crawl4AIResult:
+        await asyncio.sleep(0)
+        self.fetched.append(url)
+        if self.crash_next:
+            return Crawl4AIResult(url, False, None, None, None, None, None, "Target page, context or browser has been closed")
+        return Crawl4AIResult(url, True, 200, "<html></html>", None, "ok", None, None)
+
+
+def test_pool_retries_crashed_fetch_and_recycles():
+    FakeClient.instances = []
+
+    async def run() -> BrowserPool:
+        async with BrowserPool(FakeClient, size=2, recycle_pages=3) as pool:
+            a, b = FakeClient.instances[1:3]  # [0] is the attribute template
+            a.crash_next = True
+            res = await pool.fetch("https://a.com/")
+            assert res.success and b.fetched == ["https://a.com/"]
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+            assert a.closed and pool.restarts["crash"] == 1
+
+            for i in range(6):
+                assert (await pool.fetch(f"https://x{i}.com/")).success
+            await asyncio.sleep(0.01)
+            return pool
+
+    pool = asyncio.run(run())
+    assert pool.restarts.get("pages", 0) >= 1
+    assert all(c.closed for c in FakeClient.instances[1:] if c.opened)
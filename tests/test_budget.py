@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import re
+
+from privacy_research_dataset import budget, crawler
+from privacy_research_dataset.crawl4ai_client import Crawl4AIResult
+
+POLICY = "<html><body><h1>Privacy Policy</h1>" + (
+    "<p>This privacy policy explains how we collect, use and share personal data, your rights under the GDPR "
+    "and CCPA, cookies and tracking technologies, data retention and how to contact our data protection officer.</p>"
+) * 6 + "</body></html>"
+HOME = (
+    "<html><body><a href='/privacy'>Privacy Policy</a> <a href='/privacy-notice'>Privacy notice</a>"
+    " <a href='/cookies'>Cookie policy</a></body></html>"
+)
+
+
+class FakeClient:
+    user_agent = proxy = None
+    page_timeout_ms = 5000
+
+    def __init__(self, hang_after_home: bool = False, policy: str | None = None) -> None:
+        self.hang_after_home = hang_after_home
+        self.policy = policy
+        self.urls: list[str] = []
+
+    async def fetch(self, url: str, **kwargs) -> Crawl4AIResult:
+        self.urls.append(url)
+        if self.hang_after_home and len(self.urls) > 1:
+            await asyncio.sleep(30)
+        if len(self.urls) == 1:
+            html = HOME
+        elif self.policy is not None and url.endswith("/privacy"):
+            html = self.policy
+        else:
+            html = "<html><body>About us</body></html>"
+        budget.charge(len(html))
+        return Crawl4AIResult(url, True, 200, html, html, re.sub(r"<[^>]+>", " ", html), [], None)
+
+
+def _run(client: FakeClient, site_budget: budget.SiteBudget, tmp_path) -> dict:
+    return asyncio.run(crawler.process_site(
+        client, "site.test", rank=1, artifacts_dir=tmp_path, site_budget=site_budget,
+    ))
+
+
+def test_fetch_budget_stops_discovery_with_partial_results(tmp_path):
+    client = FakeClient()
+    res = _run(client, budget.SiteBudget(max_fetches=2), tmp_path)
+    assert res["status"] == "budget_exhausted"
+    assert res["budget_exhausted_reason"] == "fetches"
+    assert res["budget_usage"]["fetches"] == 2 and len(client.urls) == 2
+    assert res["final_url"] == "https://site.test" and res["third_parties"] == []
+
+    # Unlimited, the same site tries every candidate and ends as a normal miss.
+    client = FakeClient()
+    res = _run(client, budget.SiteBudget(), tmp_path)
+    assert res["status"] == "policy_not_found" and res["budget_exhausted_reason"] is None
+    assert len(client.urls) > 2
+
+
+def test_wall_time_budget_cancels_a_hung_stage(tmp_path):
+    res = _run(FakeClient(hang_after_home=True), budget.SiteBudget(max_wall_s=0.2), tmp_path)
+    assert res["status"] == "budget_exhausted"
+    assert res["budget_exhausted_reason"] == "wall_time"
+    assert res["home_status_code"] == 200  # the home page fetched before the hang is kept
+    assert res["total_ms"] < 5000
+
+
+def test_budget_used_up_exactly_is_not_exhausted(tmp_path):
+    # Home page + the first policy candidate: two fetches, nothing refused.
+    client = FakeClient(policy=POLICY)
+    res = _run(client, budget.SiteBudget(max_fetches=2), tmp_path)
+    assert len(client.urls) == 2
+    assert res["status"] == "ok" and res["first_party_policy"]
+    assert res["budget_exhausted_reason"] is None and res["budget_usage"]["fetches"] == 2
+
+    # A refused fetch after the policy was found is recorded, but doesn't downgrade "ok".
+    site_budget = budget.SiteBudget(max_fetches=2)
+    assert site_budget.check() is None
+    site_budget.charge()
+    site_budget.charge()
+    assert site_budget.check() == "fetches" and site_budget.reason is None
+    assert site_budget.exhausted() == "fetches" and site_budget.reason == "fetches"
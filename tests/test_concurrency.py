@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+
+from privacy_research_dataset.concurrency import AdaptiveLimiter, AimdController
+from privacy_research_dataset.metrics import MetricsRegistry, observe_fetch
+
+
+def test_aimd_increases_while_binding_and_cuts_on_overload():
+    registry = MetricsRegistry()
+    decisions: list[dict] = []
+
+    async def run() -> None:
+        limiter = AdaptiveLimiter(2)
+        ctl = AimdController(limiter, floor=1, ceiling=4, registry=registry, on_decision=decisions.append)
+
+        async def site(hold: asyncio.Event) -> None:
+            async with limiter:
+                await hold.wait()
+
+        hold = asyncio.Event()
+        tasks = [asyncio.create_task(site(hold)) for _ in range(6)]
+        await asyncio.sleep(0)
+        assert limiter.active == 2 and limiter.waiting == 4
+
+        def window(ms: float, timeouts: int = 0) -> None:
+            for i in range(10):
+                observe_fetch("browser", ms=ms, success=i >= timeouts, error_message="Timeout 30000ms exceeded", registry=registry)
+
+        window(400)
+        assert (await ctl.step())["to"] == 3
+        await asyncio.sleep(0)
+        assert limiter.active == 3  # a waiter was let in
+
+        window(420)
+        assert (await ctl.step())["to"] == 4
+        window(400)
+        assert await ctl.step() is None  # at the ceiling
+
+        window(400, timeouts=5)
+        d = await ctl.step()
+        assert d["action"] == "decrease" and d["to"] == 2 and d["reasons"] == ["errors"]
+        window(400)
+        assert await ctl.step() is None  # hold one window after a decrease
+
+        window(2000)
+        d = await ctl.step(loop_lag_ms=500)
+        assert d["to"] == 1 and d["reasons"] == ["latency", "loop_lag"]
+
+        hold.set()
+        await asyncio.gather(*tasks)
+        assert limiter.active == 0
+
+    asyncio.run(run())
+    assert [d["action"] for d in decisions] == ["increase", "increase", "decrease", "decrease"]
+
+
+def test_fast_failures_do_not_set_the_latency_baseline():
+    registry = MetricsRegistry()
+
+    async def run() -> list[dict]:
+        limiter = AdaptiveLimiter(4)
+        ctl = AimdController(limiter, floor=1, ceiling=4, registry=registry)
+
+        # A window of dead domains failing in a few ms (not overload errors), then normal renders.
+        for _ in range(10):
+            observe_fetch("browser", ms=15, success=False, error_message="net::ERR_NAME_NOT_RESOLVED at https://gone.test/", registry=registry)
+        observe_fetch("browser", ms=900, success=True, registry=registry)
+        decisions = [await ctl.step()]
+        for _ in range(6):
+            for _ in range(10):
+                observe_fetch("browser", ms=900, success=True, registry=registry)
+            decisions.append(await ctl.step())
+        assert limiter.limit == 4
+        assert 500 <= ctl.baseline_ms <= 1000  # bucket-interpolated median of the 900 ms renders
+
+        # The baseline is an EWMA: after a stretch of slower windows, it follows.
+        for _ in range(12):
+            for _ in range(10):
+                observe_fetch("browser", ms=1500, success=True, registry=registry)
+            await ctl.step()
+        assert ctl.baseline_ms > 1500
+        return decisions
+
+    assert asyncio.run(run()) == [None] * 7
@@ -0,0 +1,27 @@
+from privacy_research_dataset.consistency import build_automaton, site_matrix_row
+
+
+def test_mentions_matched_by_domain_entity_and_label():
+    result = {
+        "site_etld1": "shop.example",
+        "status": "ok",
+        "first_party_policy": {"url": "https://shop.example/privacy"},
+        "third_parties": [
+            {"third_party_etld1": "google-analytics.com", "entity": "Google LLC"},
+            {"third_party_etld1": "hotjar.com", "entity": "Hotjar Ltd"},
+            {"third_party_etld1": "criteo.net", "entity": "Criteo SA"},
+            {"third_party_etld1": "cdn.net", "entity": None},
+        ],
+    }
+    ac = build_automaton({tp["third_party_etld1"]: tp["entity"] for tp in result["third_parties"]})
+    policy = (
+        "We use Google Analytics to understand traffic. Session recordings are provided "
+        "by Hotjar. Our CDN provider does not receive personal data."
+    )
+
+    row = site_matrix_row(result, policy, ac)
+
+    assert row["third_parties"] == ["google-analytics.com", "hotjar.com", "criteo.net", "cdn.net"]
+    assert row["mentioned"] == [1, 1, 0, 0]
+    assert row["match"][0] in {"label", "entity"}
+    assert row["match"][1] == "entity"
@@ -0,0 +1,39 @@
+from privacy_research_dataset.content_store import ContentStore, content_sha256
+
+
+def test_identical_texts_stored_once(tmp_path):
+    store = ContentStore(tmp_path / "_content")
+    a = tmp_path / "site-a" / "third_party" / "google.com" / "policy.txt"
+    b = tmp_path / "site-b" / "third_party" / "google.com" / "policy.txt"
+
+    digest_a = store.write(a, "Google Privacy Policy")
+    digest_b = store.write(b, "Google Privacy Policy")
+
+    assert digest_a == digest_b == content_sha256("Google Privacy Policy")
+    assert a.read_text(encoding="utf-8") == b.read_text(encoding="utf-8") == "Google Privacy Policy"
+    blobs = [p for p in (tmp_path / "_content").rglob("*") if p.is_file()]
+    assert len(blobs) == 1
+    assert a.stat().st_ino == b.stat().st_ino
+
+
+def test_rewrite_replaces_existing_file(tmp_path):
+    store = ContentStore(tmp_path / "_content")
+    dest = tmp_path / "site" / "policy.txt"
+    store.write(dest, "old")
+    store.write(dest, "new")
+    assert dest.read_text(encoding="utf-8") == "new"
+    assert content_sha256("") is None
+
+
+def test_empty_text_has_no_digest_and_no_blob(tmp_path):
+    store = ContentStore(tmp_path / "_content")
+    dest = tmp_path / "site" / "policy.txt"
+    store.write(dest, "Shared policy")
+    shared = store.blob_path(content_sha256("Shared policy"))
+
+    assert store.write(dest, "") is None
+    assert store.put(None) is None
+    assert dest.read_text(encoding="utf-8") == ""
+    # The old hardlink was replaced, not truncated through to the shared blob.
+    assert shared.read_text(encoding="utf-8") == "Shared policy"
+    assert [p.name for p in (tmp_path / "_content").rglob("*") if p.is_file()] == [shared.name]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from privacy_research_dataset.records import (
+    POLICY_FETCH_COLUMNS,
+    SITE_COLUMNS,
+    THIRD_PARTY_COLUMNS,
+    policy_fetch_rows,
+    site_row,
+    third_party_rows,
+)
+
+RESULT = {
+    "rank": 1,
+    "input": "example.com",
+    "site_etld1": "example.com",
+    "status": "ok",
+    "run_id": "r1",
+    "first_party_policy": {"url": "https://example.com/privacy", "text_len": 1200, "text_sha256": "abc"},
+    "third_parties": [
+        {
+            "third_party_etld1": "google-analytics.com",
+            "entity": "Google LLC",
+            "categories": ["Analytics"],
+            "prevalence": 0.4,
+            "policy_url": "https://policies.google.com/privacy",
+            "tracker_radar_source_domain_file": "domains/US/google-analytics.com.json",
+        },
+        {"third_party_etld1": "cdn.example.net", "entity": None, "categories": []},
+    ],
+    "third_party_policy_fetches": [
+        {"third_party_etld1": "google-analytics.com", "policy_url": "https://policies.google.com/privacy", "fetch_success": True, "text_len": 900},
+    ],
+}
+
+
+def test_flatten_result():
+    site = site_row(RESULT)
+    tps = third_party_rows(RESULT)
+    fetches = policy_fetch_rows(RESULT)
+
+    assert tuple(site) == SITE_COLUMNS
+    assert site["policy_url"] == "https://example.com/privacy"
+    assert site["third_party_count"] == 2
+    assert [tuple(r) for r in tps] == [THIRD_PARTY_COLUMNS] * 2
+    assert tps[0]["mapping_source"] == "tracker_radar"
+    assert tps[1]["mapping_source"] is None
+    assert tuple(fetches[0]) == POLICY_FETCH_COLUMNS
+
+
+def test_export_parquet_tables(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from privacy_research_dataset.export import export_results
+
+    results = tmp_path / "results.jsonl"
+    results.write_text("\n".join(json.dumps(RESULT) for _ in range(3)) + "\n", encoding="utf-8")
+
+    counts = export_results(results, tmp_path / "out", batch_size=2)
+
+    assert counts == {"sites": 3, "site_third_parties": 6, "policy_fetches": 3}
+    tps = pq.read_table(tmp_path / "out" / "site_third_parties.parquet")
+    assert str(tps.schema.field("entity").type).startswith("dictionary")
+    assert tps.column("entity").to_pylist()[:2] == ["Google LLC", None]
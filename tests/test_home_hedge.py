@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+
+from privacy_research_dataset import crawler
+from privacy_research_dataset.crawl4ai_client import Crawl4AIResult
+
+
+def _page(url: str, network=None) -> Crawl4AIResult:
+    html = "<html><body>hi <a href='/privacy'>Privacy</a></body></html>"
+    return Crawl4AIResult(url, True, 200, html, html, "hi Privacy", network, None)
+
+
+class SlowBrowser:
+    user_agent = proxy = None
+    page_timeout_ms = 5000
+
+    async def fetch(self, url: str, **kwargs) -> Crawl4AIResult:
+        await asyncio.sleep(0.1)
+        return _page(url, [{"event_type": "request", "url": "https://tracker.test/t.js"}])
+
+
+def test_hedged_home_fetch_returns_http_first_and_keeps_capture(monkeypatch):
+    async def fast_http(url: str, **kwargs) -> Crawl4AIResult:
+        return _page(url)
+
+    monkeypatch.setattr(crawler, "_simple_http_fetch", fast_http)
+
+    async def run():
+        home, mode, _, errors, winner, capture = await crawler._fetch_home_with_retry(
+            SlowBrowser(), "https://site.test/", capture_network=True, hedge_delay_ms=0
+        )
+        assert (mode, winner, errors) == ("simple_http", "http", [])
+        assert home.network_requests is None and capture is not None
+        captured = await capture
+        assert captured.network_requests[0]["url"] == "https://tracker.test/t.js"
+
+        # The browser wins when it is done before the hedge delay.
+        home, mode, _, _, winner, capture = await crawler._fetch_home_with_retry(
+            SlowBrowser(), "https://site.test/", capture_network=True, hedge_delay_ms=500
+        )
+        assert (mode, winner, capture) == ("crawl4ai", "browser", None)
+
+    asyncio.run(run())
+
+
+def test_home_retry_policy_is_error_class_aware():
+    assert crawler.home_retry_delay_s("Timeout 15000ms exceeded", 1) == 0.8
+    assert crawler.home_retry_delay_s("http_status_503 | http_status_503", 2) == 1.6
+    assert crawler.home_retry_delay_s("http_status_503", 3) is None  # attempts exhausted
+    assert crawler.home_retry_delay_s("net::ERR_NAME_NOT_RESOLVED", 1) is None
+    assert crawler.home_retry_delay_s("http_status_404", 1) is None
+    assert crawler.home_retry_delay_s("http_status_429", 1) == 0.8
+    assert crawler.home_retry_delay_s("host_circuit_open: site.test (retry in 58.2s)", 1) is None
+
+
+def test_home_retry_classifies_the_browser_error_of_a_combined_message():
+    # What _fetch_home_with_retry records when the browser and the HTTP fallback both fail.
+    refused = crawler._combine_errors(
+        "net::ERR_CONNECTION_REFUSED at https://dnsimple.test/",
+        "Cannot connect to host dnsimple.test:443 ssl:default [Connect call failed ('127.0.0.1', 443)]",
+    )
+    assert crawler.home_error_class(refused) == "connection_refused"
+    assert crawler.home_retry_delay_s(refused, 1) == 0.8
+
+    reset = crawler._combine_errors(
+        "net::ERR_CONNECTION_RESET at https://site.test/",
+        "Cannot connect to host site.test:443 ssl:True [SSLCertVerificationError: (1, "
+        "'[SSL: CERTIFICATE_VERIFY_FAILED] certificate verify failed')]",
+    )
+    assert crawler.home_error_class(reset) == "connection_reset"
+    assert crawler.home_retry_delay_s(reset, 1) == 0.8
+
+    dead = crawler._combine_errors(
+        "net::ERR_NAME_NOT_RESOLVED at https://nx.test/",
+        "Cannot connect to host nx.test:443 ssl:default [Name or service not known]",
+    )
+    assert crawler.home_retry_delay_s(dead, 1) is None
+
+
+def test_link_less_http_shell_does_not_beat_the_render(monkeypatch):
+    shell = "<html><head><script src='/app.js'></script></head><body><div id='root'></div></body></html>"
+    rendered = "<html><body><footer><a href='/privacy'>Privacy Policy</a></footer></body></html>"
+
+    async def shell_http(url: str, **kwargs) -> Crawl4AIResult:
+        return Crawl4AIResult(url, True, 200, shell, shell, "", None, None)
+
+    class RenderingBrowser:
+        user_agent = proxy = None
+        page_timeout_ms = 5000
+
+        def __init__(self, ok: bool = True) -> None:
+            self.ok = ok
+
+        async def fetch(self, url: str, **kwargs) -> Crawl4AIResult:
+            await asyncio.sleep(0.05)
+            if not self.ok:
+                return Crawl4AIResult(url, False, None, None, None, None, None, "Timeout 5000ms exceeded.")
+            return Crawl4AIResult(url, True, 200, rendered, rendered, "Privacy Policy", [], None)
+
+    monkeypatch.setattr(crawler, "_simple_http_fetch", shell_http)
+
+    async def run():
+        home, mode, _, _, winner, capture = await crawler._fetch_home_with_retry(
+            RenderingBrowser(), "https://spa.test/", capture_network=True, hedge_delay_ms=0
+        )
+        assert (mode, winner, capture) == ("crawl4ai", "browser", None)
+        assert "/privacy" in home.cleaned_html
+
+        # The shell is still better than nothing when the render fails.
+        home, mode, _, errors, winner, _ = await crawler._fetch_home_with_retry(
+            RenderingBrowser(ok=False), "https://spa.test/", capture_network=True, hedge_delay_ms=0
+        )
+        assert (mode, winner, errors) == ("simple_http", "http", [])
+        assert home.cleaned_html == shell
+
+    asyncio.run(run())
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from privacy_research_dataset.host_scheduler import HostCircuitOpen, HostScheduler
+from privacy_research_dataset.utils.errors import classify_error
+
+
+def test_breaker_opens_fails_fast_and_probes():
+    sched = HostScheduler(max_concurrent=2, breaker_errors=3, breaker_cooldown_s=0.05)
+    url = "https://slow.example/"
+
+    async def run() -> None:
+        for _ in range(3):
+            async with sched.slot(url) as permit:
+                permit.record("Timeout 30000ms exceeded")
+        assert sched.state("slow.example") == "open"
+
+        # Other hosts are unaffected; a 404 doesn't count against a host.
+        async with sched.slot("https://ok.example/x") as permit:
+            permit.record("http_status_404")
+        assert sched.open_hosts() == ["slow.example"]
+
+        with pytest.raises(HostCircuitOpen) as exc:
+            async with sched.slot(url):
+                pass
+        assert classify_error(str(exc.value)) == "circuit_open"
+
+        # Half-open: one probe; a failed probe reopens with a doubled cooldown.
+        await asyncio.sleep(0.06)
+        async with sched.slot(url) as permit:
+            with pytest.raises(HostCircuitOpen):
+                async with sched.slot(url):
+                    pass
+            permit.record(status_code=503)
+        assert sched.state("slow.example") == "open"
+        assert sched._hosts["slow.example"].cooldown_s == pytest.approx(0.1)
+
+        await asyncio.sleep(0.11)
+        async with sched.slot(url) as permit:
+            permit.record(status_code=200)
+        assert sched.state("slow.example") == "closed"
+
+    asyncio.run(run())
+
+
+def test_token_bucket_and_concurrency_cap():
+    sched = HostScheduler(rate_per_s=20, burst=2, max_concurrent=1)
+    active = 0
+    peak = 0
+
+    async def one() -> None:
+        nonlocal active, peak
+        async with sched.slot("https://a.example/"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0)
+            active -= 1
+
+    async def run() -> float:
+        t0 = time.monotonic()
+        await asyncio.gather(*(one() for _ in range(6)))
+        return time.monotonic() - t0
+
+    elapsed = asyncio.run(run())
+    # 2 from the burst, then 4 more at 20/s.
+    assert elapsed >= 0.18
+    assert peak == 1
+
+
+def test_breaker_counts_real_connection_errors():
+    refused = [
+        "Cannot connect to host tlsfoo.example:443 ssl:default [Connect call failed ('203.0.113.7', 443)]",
+        "net::ERR_CONNECTION_REFUSED at https://tlsfoo.example/",
+        "Cannot connect to host tlsfoo.example:80 ssl:default [Connection reset by peer]",
+    ]
+    cert = (
+        "Cannot connect to host dnsfoo.example:443 ssl:True [SSLCertVerificationError: (1, "
+        "'[SSL: CERTIFICATE_VERIFY_FAILED] certificate verify failed: self-signed certificate (_ssl.c:1006)')]"
+    )
+    sched = HostScheduler(breaker_errors=3, breaker_cooldown_s=60)
+
+    async def run() -> None:
+        for msg in refused:
+            async with sched.slot("https://tlsfoo.example/") as permit:
+                permit.record(msg)
+        assert sched.state("tlsfoo.example") == "open"
+
+        # A bad certificate is the site's problem, not a sign the host is down.
+        for _ in range(3):
+            async with sched.slot("https://dnsfoo.example/") as permit:
+                permit.record(cert)
+            async with sched.slot("https://dnsfoo.example/") as permit:
+                permit.record("net::ERR_CERT_AUTHORITY_INVALID at https://dnsfoo.example/")
+        assert sched.state("dnsfoo.example") == "closed"
+
+    asyncio.run(run())
+
+
+def test_cancelled_probe_keeps_the_breaker_open():
+    sched = HostScheduler(max_concurrent=1, breaker_errors=2, breaker_cooldown_s=0.05)
+    url = "https://down.example/"
+
+    async def fetch(started: asyncio.Event) -> None:
+        async with sched.slot(url):
+            started.set()
+            await asyncio.sleep(10)
+
+    async def run() -> None:
+        async with sched.slot(url) as permit:
+            permit.record("Timeout 30000ms exceeded")
+        # A cancelled fetch is neither a success nor a failure.
+        started = asyncio.Event()
+        task = asyncio.create_task(fetch(started))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        h = sched._hosts["down.example"]
+        assert h.failures == 1
+
+        async with sched.slot(url) as permit:
+            permit.record("Timeout 30000ms exceeded")
+        assert sched.state("down.example") == "open"
+
+        # Cancelling the half-open probe leaves the breaker open, frees the
+        # probe and the concurrency slot, and the next probe decides.
+        await asyncio.sleep(0.06)
+        started = asyncio.Event()
+        task = asyncio.create_task(fetch(started))
+        await started.wait()
+        assert h.probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert sched.state("down.example") == "half_open"
+        assert not h.probing and h.failures == 2
+        async with sched.slot(url) as permit:
+            permit.record(status_code=503)
+        assert sched.state("down.example") == "open"
+
+    asyncio.run(run())
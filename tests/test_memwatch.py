@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import tracemalloc
+
+from privacy_research_dataset.memwatch import MemoryWatch, RestartGate
+
+
+def test_samples_high_water_and_tracemalloc():
+    watch = MemoryWatch(high_water_mb=1.0)
+    sample = watch.sample()
+    assert sample["rss_mb"] > 0 and "gc_objects" not in sample  # the heap walk is opt-in
+    assert watch.over_high_water(sample) and watch.restart_allowed()
+    entry = watch.record_action("browser_restart", sample)
+    assert entry["total_mb_before"] == round(watch.total_mb(sample), 1)
+    assert not watch.restart_allowed()  # cooldown
+    assert MemoryWatch(count_objects=True).sample()["gc_objects"] > 0
+
+    was_tracing = tracemalloc.is_tracing()
+    watch = MemoryWatch(tracemalloc_every=2)
+    try:
+        assert tracemalloc.is_tracing()
+        assert watch.tracemalloc_due(4) and not watch.tracemalloc_due(3)
+        watch.tracemalloc_diff(2)
+        keep = [bytearray(1024) for _ in range(200)]
+        top = watch.tracemalloc_diff(4)["top"]
+        assert top and top[0]["size_diff_kb"] is not None
+        del keep
+    finally:
+        watch.close()
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_restart_gate_drains_in_flight_sites_before_restarting():
+    events: list[str] = []
+
+    async def run() -> None:
+        async def restart() -> None:
+            events.append("restart")
+
+        gate = RestartGate(restart)
+        await gate.enter()
+        await gate.enter()
+        await gate.request()
+        assert events == []  # two sites still in flight
+
+        async def late_site() -> None:
+            await gate.enter()
+            events.append("late_site")
+            await gate.leave()
+
+        late = asyncio.create_task(late_site())
+        await asyncio.sleep(0)
+        assert events == []  # new sites wait while the restart is pending
+        await gate.leave()
+        await gate.leave()
+        await late
+        assert events == ["restart", "late_site"] and gate.restarts == 1
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from privacy_research_dataset.metrics import MetricsRegistry, observe_fetch, observe_site
+from privacy_research_dataset.utils.errors import classify_error
+
+
+def test_histogram_quantiles_and_prometheus_text():
+    reg = MetricsRegistry()
+    for ms in range(1, 1001):
+        reg.observe("fetch_ms", ms, tier="http")
+    observe_fetch("browser", ms=30_000, success=False, error_message="Timeout 30000ms exceeded.", registry=reg)
+    observe_site({"status": "ok", "home_fetch_ms": 120, "total_ms": 900, "third_parties": [{}, {}]}, registry=reg)
+
+    h = reg.summary()["histograms"]["fetch_ms"]["tier=http"]
+    assert h["count"] == 1000
+    assert 400 <= h["p50"] <= 600 and 900 <= h["p99"] <= 1000
+
+    text = reg.render_prometheus()
+    assert 'privacy_dataset_fetch_ms_bucket{tier="http",le="+Inf"} 1000' in text
+    assert 'privacy_dataset_fetches_total{error_class="timeout",outcome="error",tier="browser"} 1' in text
+    assert 'privacy_dataset_site_stage_ms_count{stage="total",status="ok"} 1' in text
+    assert "privacy_dataset_third_parties_total 2" in text
+
+
+def test_classify_error():
+    assert classify_error(None) == "none"
+    assert classify_error("net::ERR_NAME_NOT_RESOLVED at https://x") == "dns"
+    assert classify_error("http_status_503") == "http_5xx"
+    assert classify_error("something odd") == "other"
+
+
+def test_classify_error_ignores_host_names_and_aiohttp_boilerplate():
+    # Host names that contain "dns"/"tls" don't decide the class.
+    assert classify_error("net::ERR_CONNECTION_REFUSED at https://dnsimple.com/") == "connection_refused"
+    assert classify_error("net::ERR_CONNECTION_CLOSED at https://tlsfoo.org/") == "connection_reset"
+    # aiohttp puts "ssl:default" in every connector error, even for http:// URLs.
+    assert classify_error(
+        "Cannot connect to host example.com:80 ssl:default [Connect call failed ('93.184.216.34', 80)]"
+    ) == "connection_refused"
+    assert classify_error(
+        "Cannot connect to host nx.invalid:443 ssl:default [Name or service not known]"
+    ) == "dns"
+    assert classify_error(
+        "Cannot connect to host expired.badssl.com:443 ssl:True [SSLCertVerificationError: (1, "
+        "'[SSL: CERTIFICATE_VERIFY_FAILED] certificate verify failed: certificate has expired (_ssl.c:1006)')]"
+    ) == "tls"
+    assert classify_error("net::ERR_CERT_AUTHORITY_INVALID at https://self-signed.example/") == "tls"
+    assert classify_error("Server disconnected") == "connection_reset"
@@ -0,0 +1,76 @@
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from privacy_research_dataset import near_dup
+from privacy_research_dataset.near_dup import build_near_duplicate_clusters
+
+TEMPLATE = (
+    "This Privacy Policy describes how {name} collects, uses and shares personal information "
+    "when you visit our website. We collect information you provide directly to us, such as "
+    "your name, email address and payment details. We use cookies and similar technologies to "
+    "analyse traffic and personalise content. You may contact {name} to exercise your rights "
+    "to access, correct or delete your personal data under applicable law. "
+)
+
+
+def test_template_policies_cluster_together(tmp_path):
+    for site, text in {
+        "acme.com": TEMPLATE.format(name="Acme Inc") * 3,
+        "globex.com": TEMPLATE.format(name="Globex Corp") * 3,
+        "other.org": "Completely different document about shipping rates, returns and warranty terms. " * 20,
+    }.items():
+        d = tmp_path / site
+        d.mkdir()
+        (d / "policy.txt").write_text(text, encoding="utf-8")
+    (tmp_path / "_content").mkdir()
+
+    records = {r["site"]: r for r in build_near_duplicate_clusters(tmp_path, threshold=0.5, workers=1)}
+
+    assert set(records) == {"acme.com", "globex.com", "other.org"}
+    assert records["acme.com"]["cluster_id"] == records["globex.com"]["cluster_id"]
+    assert records["acme.com"]["cluster_size"] == 2
+    assert records["other.org"]["cluster_size"] == 1
+
+
+def test_worker_pool_keeps_a_bounded_window_of_batches(tmp_path, monkeypatch):
+    for i in range(20):
+        d = tmp_path / f"site{i}.com"
+        d.mkdir()
+        (d / "policy.txt").write_text(TEMPLATE.format(name=f"Site {i}"), encoding="utf-8")
+
+    in_flight: list[Future] = []
+    peak = [0]
+
+    class InlinePool:
+        def __init__(self, max_workers: int) -> None:
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+        def submit(self, fn, *args) -> Future:
+            fut: Future = Future()
+            fut.set_result(fn(*args))
+            in_flight.append(fut)
+            peak[0] = max(peak[0], sum(1 for f in in_flight if not getattr(f, "collected", False)))
+            real_result = fut.result
+
+            def result(timeout=None):
+                fut.collected = True
+                return real_result(timeout)
+
+            fut.result = result
+            return fut
+
+    monkeypatch.setattr(near_dup, "ProcessPoolExecutor", InlinePool)
+    records = build_near_duplicate_clusters(tmp_path, threshold=0.5, workers=2, batch_size=1)
+
+    assert len(records) == 20
+    assert len(in_flight) == 20
+    assert peak[0] <= 4  # workers * 2
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from privacy_research_dataset.pipeline import SitePipeline
+
+
+def test_home_stage_keeps_flowing_while_discovery_is_slow():
+    log: list[tuple[str, int]] = []
+    release = asyncio.Event()
+
+    async def home(item: dict) -> bool:
+        log.append(("home", item["id"]))
+        return item["id"] != 3  # site 3 fails its home fetch and finishes early
+
+    async def discovery(item: dict) -> bool:
+        await release.wait()
+        if item["id"] == 5:
+            raise RuntimeError("boom")
+        log.append(("discovery", item["id"]))
+        return True
+
+    async def third_party(item: dict) -> bool:
+        item["done"] = True
+        return True
+
+    async def run() -> None:
+        pipeline = SitePipeline([("home", 2, home), ("discovery", 1, discovery), ("third_party", 1, third_party)], buffer=2)
+        async with pipeline:
+            jobs = [asyncio.create_task(pipeline.run({"id": i})) for i in range(6)]
+            await asyncio.sleep(0.01)
+            # Discovery is stuck on site 0; homes ran for every site that fits in front of it.
+            homes = [i for stage, i in log if stage == "home"]
+            assert homes == [0, 1, 2, 3, 4, 5]
+            stats = pipeline.stats()
+            assert stats["discovery"]["busy"] == 1 and stats["discovery"]["queued"] == 2
+            assert stats["home"]["blocked"] == 2  # sites 4 and 5 wait for room in the discovery queue
+            assert (await jobs[3]) == {"id": 3}
+
+            release.set()
+            done = await asyncio.gather(*jobs, return_exceptions=True)
+        assert isinstance(done[5], RuntimeError)
+        assert [d.get("done") for d in done if isinstance(d, dict)] == [True, True, True, None, True]
+        assert pipeline.capacity == (2 + 1 + 2 + 1 + 2) + 2
+
+    asyncio.run(run())
+
+
+def test_pipeline_needs_a_stage():
+    with pytest.raises(ValueError):
+        SitePipeline([])
+
+
+def test_cancelled_stage_and_close_resolve_every_caller():
+    gate = asyncio.Event()
+
+    async def home(item: dict) -> bool:
+        if item["id"] == 0:
+            raise asyncio.CancelledError  # e.g. a stage timeout that leaked out
+        return True
+
+    async def slow(item: dict) -> bool:
+        await gate.wait()
+        return True
+
+    async def run() -> None:
+        pipeline = SitePipeline([("home", 1, home), ("discovery", 1, slow)], buffer=1)
+        pipeline.start()
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await pipeline.run({"id": 0})
+        # The home worker survived; the next sites fill discovery and its queue.
+        jobs = [asyncio.create_task(pipeline.run({"id": i})) for i in range(1, 4)]
+        await asyncio.sleep(0.01)
+        assert pipeline.stats()["home"]["processed"] == 4
+        await asyncio.wait_for(pipeline.close(), 1)
+        done = await asyncio.wait_for(asyncio.gather(*jobs, return_exceptions=True), 1)
+        assert all(isinstance(d, asyncio.CancelledError) for d in done)
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from privacy_research_dataset.policy_index import PolicyIndex
+
+SHARED = "We share data with Google Analytics to measure traffic. You may opt out at any time."
+
+
+def _write_policy(d, text: str, url: str) -> None:
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "policy.txt").write_text(text, encoding="utf-8")
+    (d / "policy.url.txt").write_text(url, encoding="utf-8")
+
+
+def test_search_dedupes_documents_and_filters_by_kind(tmp_path):
+    with PolicyIndex(tmp_path / "index.sqlite") as idx:
+        # One shared third-party text on many sites, plus short vendor texts that all
+        # rank ahead of the long first-party policy.
+        for i in range(5):
+            idx.add(site_etld1=f"site{i}.com", kind="third_party", third_party_etld1="google.com", text=SHARED)
+            idx.add(site_etld1=f"site{i}.com", kind="third_party", third_party_etld1=f"vendor{i}.com",
+                    text=f"Vendor {i} uses Google Analytics.")
+        filler = "We describe how we handle orders, returns and shipping. " * 20
+        idx.add(site_etld1="shop.com", kind="first_party", text=f"{filler} Our shop uses Google Analytics cookies.")
+        idx.commit()
+        assert idx.conn.execute("SELECT COUNT(*) FROM policy_docs").fetchone()[0] == 7
+
+        hits = idx.search('"google analytics"', limit=3, kind="first_party")
+        assert [(h["site"], h["kind"]) for h in hits] == [("shop.com", "first_party")]
+        assert "[Google Analytics]" in hits[0]["snippet"]
+
+        hits = idx.search('"google analytics"', limit=3, kind="third_party")
+        assert len(hits) == 3 and {h["kind"] for h in hits} == {"third_party"}
+        assert len(idx.search("analytics", limit=20)) == 11
+
+        with pytest.raises(ValueError):
+            idx.search('"unterminated')
+
+
+def test_reindexing_artifacts_replaces_occurrences(tmp_path):
+    art = tmp_path / "artifacts"
+    _write_policy(art / "a.com", "Privacy policy of a.com. We never sell data.", "https://a.com/privacy")
+    _write_policy(art / "a.com" / "third_party" / "google.com", SHARED, "https://policies.google.com/privacy")
+
+    with PolicyIndex(tmp_path / "index.sqlite") as idx:
+        assert idx.index_artifacts(art) == 2
+        assert idx.index_artifacts(art) == 2
+        assert len(idx.search("sell")) == 1 and len(idx.search("analytics")) == 1
+
+        # The site's policy changed: its old text no longer matches.
+        _write_policy(art / "a.com", "Privacy policy of a.com. We may rent data to partners.", "https://a.com/privacy")
+        idx.index_artifacts(art)
+        assert idx.search("sell") == []
+        assert [h["url"] for h in idx.search("rent")] == ["https://a.com/privacy"]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import pstats
+import time
+
+from privacy_research_dataset.profiling import IDLE, SamplingProfiler, format_stage_table
+
+
+def _busy(seconds: float) -> int:
+    n = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def test_samples_are_charged_to_site_stages_and_written(tmp_path):
+    profiler = SamplingProfiler(interval_s=0.001, slowest_sites=1)
+
+    async def site(name: str, seconds: float) -> None:
+        profiler.set_stage(name, "policy_discovery")
+        _busy(seconds)
+        profiler.site_finished(name, seconds * 1000)
+
+    async def run() -> None:
+        profiler.start()
+        try:
+            await site("fast.test", 0.05)
+            await site("slow.test", 0.2)
+            await asyncio.sleep(0.05)  # nothing runs: idle
+        finally:
+            profiler.stop()
+
+    asyncio.run(run())
+    report = profiler.write(tmp_path / "profile")
+
+    stages = report["stages"]
+    assert stages["policy_discovery"]["samples"] > 0 and stages[IDLE]["samples"] > 0
+    assert stages["policy_discovery"]["top_self"][0]["function"].endswith(":_busy")
+    assert abs(sum(v["share"] for v in stages.values()) - 1) < 0.01
+    assert [s["site"] for s in report["slowest_sites"]] == ["slow.test"]
+
+    out = tmp_path / "profile"
+    assert json.loads((out / "profile.stages.json").read_text())["samples"] == report["samples"]
+    assert pstats.Stats(str(out / "profile.pstats")).total_calls > 0
+    assert (out / "profile.collapsed.txt").read_text().startswith("stage:")
+    assert (out / "sites" / "slow.test" / "profile.collapsed.txt").is_file()
+
+    table = format_stage_table(report).splitlines()
+    assert table[0].split()[:3] == ["stage", "seconds", "share"]
+    rows = {line.split()[0]: line for line in table[1:]}
+    assert set(rows) == set(stages) and rows["policy_discovery"].endswith(":_busy")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from privacy_research_dataset.crawl4ai_client import Crawl4AIClient, ResourceBlocker
+
+
+class FakeIndex:
+    def __init__(self, data: dict[str, list[str]]) -> None:
+        self.data = data
+
+    def lookup(self, etld1: str):
+        cats = self.data.get(etld1)
+        return SimpleNamespace(categories=cats) if cats is not None else None
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str, navigation: bool = False) -> None:
+        self.request = SimpleNamespace(url=url, resource_type=resource_type, is_navigation_request=lambda: navigation)
+        self.outcome: str | None = None
+
+    async def abort(self, reason: str = "failed") -> None:
+        self.outcome = "abort"
+
+    async def continue_(self) -> None:
+        self.outcome = "continue"
+
+
+class FakePage:
+    def __init__(self) -> None:
+        self.handler = None
+        self.listeners: dict[str, object] = {}
+
+    async def route(self, pattern: str, handler) -> None:
+        self.handler = handler
+
+    def on(self, event: str, fn) -> None:
+        self.listeners[event] = fn
+
+
+def test_text_only_render_aborts_heavy_and_tracker_requests():
+    index = FakeIndex({"ads.test": ["Advertising"], "cdn.test": ["CDN"], "cookielaw.org": ["Third-Party Analytics Marketing"]})
+    client = Crawl4AIClient(resource_blocker=ResourceBlocker(indexes=(index, None)))
+    stats = {"url": "https://www.site.test/privacy", "block": True, "blocked": {}, "bytes": 0}
+    page = FakePage()
+    config = SimpleNamespace(shared_data={"resource_blocking": stats})
+
+    routes = {
+        "doc": FakeRoute("https://www.site.test/privacy", "document", navigation=True),
+        "own_css": FakeRoute("https://www.site.test/a.css", "stylesheet"),
+        "own_js": FakeRoute("https://www.site.test/app.js", "script"),
+        "img": FakeRoute("https://cdn.test/logo.png", "image"),
+        "font": FakeRoute("https://cdn.test/f.woff2", "font"),
+        "cdn_js": FakeRoute("https://cdn.test/app.js", "script"),
+        "ad_js": FakeRoute("https://ads.test/tag.js", "script"),
+        "onetrust": FakeRoute("https://cdn.cookielaw.org/notice.js", "script"),
+    }
+
+    async def run() -> None:
+        await client._on_page_context_created(page, context=None, config=config)
+        for r in routes.values():
+            await page.handler(r)
+        page.listeners["response"](SimpleNamespace(headers={"content-length": "1200"}))
+
+    asyncio.run(run())
+    outcome = {k: r.outcome for k, r in routes.items()}
+    assert outcome == {
+        "doc": "continue",
+        "own_css": "abort",
+        "own_js": "continue",
+        "img": "abort",
+        "font": "abort",
+        "cdn_js": "continue",
+        "ad_js": "abort",
+        "onetrust": "continue",
+    }
+    assert stats["blocked"] == {"stylesheet": 1, "image": 1, "font": 1, "tracker": 1}
+    assert stats["bytes"] == 1200
+
+    # Home fetches only count bytes; nothing is intercepted.
+    full = {"url": "https://www.site.test/", "block": False, "blocked": {}, "bytes": 0}
+    page2 = FakePage()
+    asyncio.run(client._on_page_context_created(page2, config=SimpleNamespace(shared_data={"resource_blocking": full})))
+    assert page2.handler is None and "response" in page2.listeners
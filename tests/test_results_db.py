@@ -0,0 +1,35 @@
+import json
+
+from privacy_research_dataset.results_db import ResultsDB
+
+
+def _result(site: str, rank: int, status: str, entity: str | None) -> dict:
+    tps = []
+    if entity:
+        tps.append({"third_party_etld1": "tracker.net", "entity": entity, "categories": ["Analytics"]})
+    return {"run_id": "r1", "site_etld1": site, "input": site, "rank": rank, "status": status, "third_parties": tps}
+
+
+def test_incremental_ingest_and_filters(tmp_path):
+    results = tmp_path / "results.jsonl"
+    with results.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(_result("a.com", 1, "ok", "Google LLC")) + "\n")
+        f.write(json.dumps(_result("b.com", 2, "policy_not_found", None)) + "\n")
+
+    with ResultsDB(tmp_path / "results.sqlite", batch_size=1) as db:
+        assert db.ingest_jsonl(results) == 2
+        assert db.ingest_jsonl(results) == 0
+
+        with results.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(_result("c.com", 3, "ok", "Google LLC")) + "\n")
+            f.write(json.dumps(_result("a.com", 1, "ok", None)))  # partial line, not yet terminated
+        assert db.ingest_jsonl(results) == 1
+
+        assert db.status_counts() == {"ok": 2, "policy_not_found": 1}
+        assert [r["site_etld1"] for r in db.query_sites(entity="Google LLC")] == ["a.com", "c.com"]
+        assert [r["site_etld1"] for r in db.query_sites(category="Analytics", status="ok", limit=1)] == ["a.com"]
+
+        # Re-adding a site replaces its previous rows.
+        db.add(_result("a.com", 1, "ok", None))
+        db.flush()
+        assert [r["site_etld1"] for r in db.query_sites(entity="Google LLC")] == ["c.com"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from privacy_research_dataset.results_db import ResultsDB
+from privacy_research_dataset.serve import RunCache, _make_handler
+
+
+def _write_run(run_dir, n: int) -> None:
+    run_dir.mkdir(parents=True)
+    with (run_dir / "results.jsonl").open("w", encoding="utf-8") as f:
+        for i in range(1, n + 1):
+            f.write(json.dumps({
+                "run_id": run_dir.name, "site_etld1": f"s{i}.com", "input": f"s{i}.com", "rank": i,
+                "status": "ok" if i % 3 else "policy_not_found", "total_ms": 100 * (n - i), "third_parties": [],
+            }) + "\n")
+
+
+def test_page_sites_keyset_pagination(tmp_path):
+    _write_run(tmp_path / "run", 7)
+    with ResultsDB(tmp_path / "run" / "results.sqlite") as db:
+        db.ingest_jsonl(tmp_path / "run" / "results.jsonl")
+        seen, cursor = [], None
+        while True:
+            page, cursor = db.page_sites(sort="total_ms", descending=True, limit=3, after=cursor)
+            seen += [r["rank"] for r in page]
+            if cursor is None:
+                break
+        assert seen == [1, 2, 3, 4, 5, 6, 7]
+        page, cursor = db.page_sites(status="policy_not_found", limit=5)
+        assert [r["rank"] for r in page] == [3, 6] and cursor is None
+        with pytest.raises(ValueError):
+            db.page_sites(sort="nope")
+
+
+def _serve(cache: RunCache, **kwargs) -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(cache, **kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _get(url: str) -> tuple[dict, dict]:
+    try:
+        with urllib.request.urlopen(url) as resp:
+            return json.loads(resp.read()), dict(resp.headers)
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read()), dict(e.headers)
+
+
+def test_results_api_pages_and_sends_no_cors_by_default(tmp_path):
+    _write_run(tmp_path / "run1", 5)
+    cache = RunCache(tmp_path, refresh_s=0)
+    server, base = _serve(cache)
+    try:
+        body, headers = _get(f"{base}/api/runs")
+        assert [r["name"] for r in body["runs"]] == ["run1"]
+        assert "Access-Control-Allow-Origin" not in headers
+
+        body, _ = _get(f"{base}/api/runs/run1/results?limit=2&sort=-rank")
+        assert [r["rank"] for r in body["items"]] == [5, 4]
+        body, _ = _get(f"{base}/api/runs/run1/results?limit=2&sort=-rank&cursor={body['next_cursor']}")
+        assert [r["rank"] for r in body["items"]] == [3, 2]
+        body, _ = _get(f"{base}/api/runs/run1/status_counts")
+        assert body["status_counts"] == {"ok": 4, "policy_not_found": 1}
+        assert _get(f"{base}/api/runs/../results")[0] == {"error": "run_not_found"}
+        assert _get(f"{base}/api/runs/nope/results")[0] == {"error": "run_not_found"}
+        assert "error" in _get(f"{base}/api/runs/run1/results?cursor=zzz")[0]
+    finally:
+        server.shutdown()
+        server.server_close()
+        cache.close()
+
+    server, base = _serve(RunCache(tmp_path), allow_origin="http://localhost:3000")
+    try:
+        _, headers = _get(f"{base}/api/runs")
+        assert headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_evicted_run_index_stays_open_while_in_use(tmp_path):
+    for name in ("a", "b"):
+        _write_run(tmp_path / name, 2)
+    cache = RunCache(tmp_path, max_open=1, refresh_s=0)
+    with cache.use("a") as a:
+        with cache.use("b"):
+            pass  # evicts "a" while the outer request still queries it
+        assert a.evicted
+        with a.lock:
+            a.refresh()
+            assert a.db.status_counts() == {"ok": 2}
+    with pytest.raises(Exception):
+        a.db.status_counts()  # closed once released
+    cache.close()
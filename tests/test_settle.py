@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from privacy_research_dataset.crawl4ai_client import Crawl4AIClient, SettlePolicy, _pop_settle_ms
+
+
+def test_settle_policy_bounds_and_marker():
+    policy = SettlePolicy(min_ms=400, max_ms=5000, quiet_ms=300, capture_window_ms=6000)
+    assert "now < 400)" in policy.wait_for(capture_network=False)
+    assert "now < 6000)" in policy.wait_for(capture_network=True)
+    assert policy.timeout_ms(capture_network=False) == 5000
+    assert policy.timeout_ms(capture_network=True) == 6000
+
+    html, ms = _pop_settle_ms('<html lang="en" data-prd-settle-ms="1834"><body>x</body></html>')
+    assert ms == 1834 and html == '<html lang="en"><body>x</body></html>'
+    assert _pop_settle_ms("<html><body>x</body></html>") == ("<html><body>x</body></html>", None)
+
+
+class FakeCrawler:
+    def __init__(self, html: str) -> None:
+        self.html = html
+        self.configs: list = []
+
+    async def arun(self, url: str, config):
+        self.configs.append(config)
+        return SimpleNamespace(success=True, status_code=200, html=self.html, cleaned_html=self.html, url=url, error_message=None)
+
+
+def test_fetch_applies_settle_bounds_and_reads_back_settle_time():
+    pytest.importorskip("crawl4ai")
+    policy = SettlePolicy(min_ms=400, max_ms=5000, quiet_ms=300, capture_window_ms=6000)
+    client = Crawl4AIClient(settle=policy)
+    client._crawler = FakeCrawler('<html data-prd-settle-ms="950"><body><p>Privacy policy text.</p></body></html>')
+
+    async def run() -> None:
+        res = await client.fetch("https://site.test/privacy")
+        cfg = client._crawler.configs[-1]
+        assert cfg.wait_for == policy.wait_for(capture_network=False) and cfg.wait_for_timeout == 5000
+        assert res.settle_ms == 950 and "data-prd-settle-ms" not in res.raw_html
+
+        await client.fetch("https://site.test/", capture_network=True)
+        cfg = client._crawler.configs[-1]
+        assert cfg.wait_for == policy.wait_for(capture_network=True) and cfg.wait_for_timeout == 6000
+
+        # A caller's own wait condition replaces the settle predicate.
+        await client.fetch("https://site.test/x", wait_for="css:#app", wait_for_timeout_ms=1000)
+        cfg = client._crawler.configs[-1]
+        assert (cfg.wait_for, cfg.wait_for_timeout) == ("css:#app", 1000)
+
+    asyncio.run(run())
+
+
+# Drives the predicate with a fake clock, DOM and Resource Timing buffer.
+_NODE_HARNESS = """
+let t = 0, mutate = null;
+const entries = [], attrs = {};
+globalThis.window = globalThis;
+globalThis.performance = {now: () => t, setResourceTimingBufferSize() {}, getEntriesByType: () => entries};
+globalThis.document = {readyState: "loading", documentElement: {setAttribute(k, v) { attrs[k] = v; }}};
+globalThis.MutationObserver = class { constructor(cb) { mutate = cb; } observe() {} };
+const settled = (%s);
+const out = [];
+const poll = (at) => { t = at; out.push([at, settled()]); };
+poll(100);                                // still parsing
+document.readyState = "interactive";
+poll(200);                                // before min_ms
+t = 450; mutate();                        // DOM still changing
+poll(500);
+entries.push({}); poll(700);              // a subresource finished
+poll(900);                                // DOM quiet 450 ms, network only 200 ms
+poll(1000);                               // both quiet for quiet_ms
+console.log(JSON.stringify({polls: out, attrs}));
+"""
+
+
+def test_settle_predicate_waits_for_min_and_quiet_window():
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    policy = SettlePolicy(min_ms=400, max_ms=5000, quiet_ms=300)
+    js = policy.wait_for(capture_network=False).removeprefix("js:")
+    proc = subprocess.run([node, "-e", _NODE_HARNESS % js], capture_output=True, text=True, timeout=30, check=True)
+    out = json.loads(proc.stdout)
+    assert out["polls"] == [[100, False], [200, False], [500, False], [700, False], [900, False], [1000, True]]
+    assert out["attrs"] == {"data-prd-settle-ms": "1000"}
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+
+from privacy_research_dataset.summary import SummaryBuilder
+
+
+def _result(i: int) -> dict:
+    tps = [
+        {"third_party_etld1": "google-analytics.com", "entity": "Google LLC", "categories": ["Analytics"], "prevalence": 0.5},
+        {"third_party_etld1": f"tail{i}.example", "entity": f"Tail {i}", "categories": ["Advertising"], "prevalence": 0.01},
+        {"third_party_etld1": "mystery.net"},
+        {"third_party_etld1": f"unknown{i}.net"},
+    ]
+    return {"status": "ok" if i % 3 else "home_fetch_failed", "third_parties": tps}
+
+
+def test_merge_matches_single_pass():
+    whole = SummaryBuilder(run_id="r", total_sites=60)
+    a = SummaryBuilder(run_id="r", total_sites=30)
+    b = SummaryBuilder(run_id="r", total_sites=30)
+    for i in range(60):
+        whole.update(_result(i))
+        (a if i < 30 else b).update(_result(i))
+    merged = a.merge(SummaryBuilder.from_state(json.loads(json.dumps(b.to_state()))))
+    got, want = merged.to_summary(), whole.to_summary()
+    for key in ("processed_sites", "status_counts", "third_party", "categories", "entities", "unmapped_domains"):
+        assert got[key] == want[key]
+    assert want["unmapped_domains"][0] == {"name": "mystery.net", "count": 60}
+
+
+def test_approx_mode_is_bounded_and_keeps_heavy_hitters():
+    b = SummaryBuilder(run_id="r", total_sites=5000, approx_top_k=16)
+    for i in range(5000):
+        b.update(_result(i))
+    assert len(b.entity_counts) <= 16 and len(b.unmapped_domain_counts) <= 16
+    assert len(b.entity_prevalence_sum) <= 32
+    s = SummaryBuilder.from_state(json.loads(json.dumps(b.to_state()))).to_summary()
+    assert s["entities"][0]["name"] == "Google LLC"
+    assert s["entities"][0]["count"] >= 5000
+    assert s["entities"][0]["prevalence_max"] == 0.5
+    assert s["unmapped_domains"][0]["name"] == "mystery.net"
+    assert s["approximate"] is True
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+from privacy_research_dataset import tracing
+
+
+def test_spans_nest_per_task_and_report_critical_path(tmp_path):
+    path = tmp_path / "spans.jsonl"
+
+    async def site(name: str, delay: float) -> None:
+        with tracing.span("site", site=name):
+            with tracing.span("home_fetch_attempt", attempt=1):
+                with tracing.span("fetch", tier="browser", url=f"https://{name}/") as s:
+                    await asyncio.sleep(delay)
+                    s.set(status_code=200)
+            with tracing.span("policy_candidate", url=f"https://{name}/privacy"):
+                await asyncio.sleep(delay)
+
+    async def run() -> None:
+        await asyncio.gather(site("a.com", 0.01), site("b.com", 0.03))
+
+    tracing.configure(tracing.JsonlSpanExporter(path))
+    try:
+        asyncio.run(run())
+    finally:
+        tracing.shutdown()
+
+    traces = tracing.load_traces(path)
+    assert len(traces) == 2 and all(len(v) == 4 for v in traces.values())
+
+    report = tracing.trace_report(traces, top=3, sites=1)
+    assert report["slowest_spans"][0]["site"] == "b.com"
+    path_names = [(p["depth"], p["name"]) for p in report["critical_paths"][0]["path"]]
+    assert path_names == [(0, "site"), (1, "home_fetch_attempt"), (2, "fetch"), (1, "policy_candidate")]
+
+    with tracing.span("untraced") as s:
+        s.set(x=1)  # no exporter -> no-op
+
+
+def test_worker_spans_nest_under_the_items_trace(tmp_path):
+    path = tmp_path / "spans.jsonl"
+
+    async def run() -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def worker() -> None:  # long-lived, like a pipeline stage worker
+            while True:
+                parent, done = await queue.get()
+                with tracing.use(parent), tracing.span("pipeline_stage"):
+                    with tracing.span("fetch"):
+                        await asyncio.sleep(0)
+                done.set()
+
+        task = asyncio.create_task(worker())
+        for name in ("a.com", "b.com"):
+            with tracing.span("site", site=name):
+                done = asyncio.Event()
+                await queue.put((tracing.current(), done))
+                await done.wait()
+        task.cancel()
+
+    tracing.configure(tracing.JsonlSpanExporter(path))
+    try:
+        asyncio.run(run())
+    finally:
+        tracing.shutdown()
+
+    traces = tracing.load_traces(path)
+    assert len(traces) == 2
+    for spans in traces.values():
+        path_names = [(p[0], p[1]["name"]) for p in tracing.critical_path(spans)]
+        assert path_names == [(0, "site"), (1, "pipeline_stage"), (2, "fetch")]